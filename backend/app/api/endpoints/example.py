@@ -2,53 +2,101 @@
 Example endpoint handler demonstrating FastAPI best practices.
 
 This shows how to structure endpoints using models from the models module,
-proper error handling, and API documentation.
+proper error handling, and API documentation. Storage goes through a
+repository (app.users), so handlers never scan a list: lookups use the id
+and email indexes, and lists are paginated by keyset (`after_id`). Users
+come back from the repository already validated, so responses are encoded
+directly (`rows_response`) rather than validated again against
+UserResponse.
 """
 
-from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+
+from app.api.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.api.responses import rows_response
+from app.api.streaming import stream_rows
 
 # Import models from the models module
 from app.models import UserCreate, UserResponse, UserStatus, UserUpdate
+from app.users import EmailTakenError, get_user_repository
 
 # Create router for this module
 router = APIRouter()
 
 
-# Mock data storage (replace with database later)
-fake_users_db: List[dict] = [
-    {
-        "id": 1,
-        "name": "John Doe",
-        "email": "john@example.com",
-        "age": 25,
-        "status": UserStatus.ACTIVE,
-        "created_at": datetime.now(),
-        "updated_at": None,
-    },
-    {
-        "id": 2,
-        "name": "Jane Smith",
-        "email": "jane@example.com",
-        "age": 30,
-        "status": UserStatus.ACTIVE,
-        "created_at": datetime.now(),
-        "updated_at": None,
-    },
-]
-
-
 # API Endpoints
 @router.get("/users", response_model=List[UserResponse])
-def get_users():
+def get_users(
+    after_id: int = Query(0, ge=0, description="Return users with a larger id"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    """
+    Get users, in id order.
+
+    Returns one page of users; pass the last id as `after_id` for the next.
+    """
+    users = get_user_repository().search(after_id=after_id, limit=limit)
+    return rows_response(users, UserResponse)
+
+
+# Declared before /users/{user_id}, which would otherwise match these paths
+@router.get("/users/export")
+def export_users(
+    fmt: str = Query("ndjson", alias="format", pattern="^(ndjson|json)$"),
+):
     """
-    Get all users.
+    Stream every user, in id order, as NDJSON or a JSON array.
 
-    Returns a list of all users in the system.
+    Users are read one keyset page at a time, so memory use does not grow
+    with the number of users.
     """
-    return fake_users_db
+    repository = get_user_repository()
+
+    def pages():
+        after_id = 0
+        while page := repository.search(after_id=after_id, limit=MAX_PAGE_SIZE):
+            yield page
+            after_id = page[-1]["id"]
+
+    return stream_rows(pages(), fmt)
+
+
+@router.get("/users/search", response_model=List[UserResponse])
+def search_users(
+    name: Optional[str] = None,
+    min_age: Optional[int] = None,
+    max_age: Optional[int] = None,
+    status: Optional[UserStatus] = None,
+    active_only: bool = True,
+    after_id: int = Query(0, ge=0, description="Return users with a larger id"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    """
+    Search users with filters.
+
+    Args:
+        name: Filter by name (partial match)
+        min_age: Minimum age filter
+        max_age: Maximum age filter
+        status: Filter by user status (active, inactive, suspended)
+        active_only: Only return active users (overrides status filter)
+        after_id: Keyset cursor, the last id of the previous page
+        limit: Maximum users returned
+
+    Returns:
+        One page of matching users, in id order
+    """
+    users = get_user_repository().search(
+        name=name,
+        min_age=min_age,
+        max_age=max_age,
+        status=UserStatus.ACTIVE if active_only else status,
+        after_id=after_id,
+        limit=limit,
+    )
+    return rows_response(users, UserResponse)
 
 
 @router.get("/users/{user_id}", response_model=UserResponse)
@@ -65,10 +113,10 @@ def get_user(user_id: int):
     Raises:
         HTTPException: 404 if user not found
     """
-    user = next((user for user in fake_users_db if user["id"] == user_id), None)
+    user = get_user_repository().get(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
+    return rows_response(user, UserResponse)
 
 
 @router.post("/users", response_model=UserResponse)
@@ -81,24 +129,21 @@ def create_user(user_data: UserCreate):
 
     Returns:
         Created user information
+
+    Raises:
+        HTTPException: 400 if the email is already registered
     """
-    # Check if email already exists
-    if any(user["email"] == user_data.email for user in fake_users_db):
+    # In a real app, you'd hash and store the password
+    try:
+        user = get_user_repository().create(
+            name=user_data.name,
+            email=user_data.email,
+            age=user_data.age,
+            status=user_data.status,
+        )
+    except EmailTakenError:
         raise HTTPException(status_code=400, detail="Email already registered")
-
-    # Create new user (in a real app, you'd hash the password)
-    new_user = {
-        "id": len(fake_users_db) + 1,
-        "name": user_data.name,
-        "email": user_data.email,
-        "age": user_data.age,
-        "status": user_data.status,
-        "created_at": datetime.now(),
-        "updated_at": None,
-    }
-
-    fake_users_db.append(new_user)
-    return new_user
+    return rows_response(user, UserResponse)
 
 
 @router.put("/users/{user_id}", response_model=UserResponse)
@@ -114,18 +159,18 @@ def update_user(user_id: int, user_data: UserUpdate):
         Updated user information
 
     Raises:
-        HTTPException: 404 if user not found
+        HTTPException: 404 if user not found, 400 if the new email is taken
     """
-    user = next((user for user in fake_users_db if user["id"] == user_id), None)
+    # Update only provided fields
+    try:
+        user = get_user_repository().update(
+            user_id, user_data.model_dump(exclude_unset=True)
+        )
+    except EmailTakenError:
+        raise HTTPException(status_code=400, detail="Email already registered")
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-
-    # Update only provided fields
-    update_data = user_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        user[field] = value
-
-    return user
+    return rows_response(user, UserResponse)
 
 
 @router.delete("/users/{user_id}")
@@ -142,65 +187,7 @@ def delete_user(user_id: int):
     Raises:
         HTTPException: 404 if user not found
     """
-    user_index = next(
-        (i for i, user in enumerate(fake_users_db) if user["id"] == user_id), None
-    )
-    if user_index is None:
+    deleted_user = get_user_repository().delete(user_id)
+    if deleted_user is None:
         raise HTTPException(status_code=404, detail="User not found")
-
-    deleted_user = fake_users_db.pop(user_index)
     return {"message": f"User '{deleted_user['name']}' deleted successfully"}
-
-
-# Additional example endpoint with query parameters
-@router.get("/users/search", response_model=List[UserResponse])
-def search_users(
-    name: Optional[str] = None,
-    min_age: Optional[int] = None,
-    max_age: Optional[int] = None,
-    status: Optional[UserStatus] = None,
-    active_only: bool = True,
-):
-    """
-    Search users with filters.
-
-    Args:
-        name: Filter by name (partial match)
-        min_age: Minimum age filter
-        max_age: Maximum age filter
-        status: Filter by user status (active, inactive, suspended)
-        active_only: Only return active users (overrides status filter)
-
-    Returns:
-        Filtered list of users
-    """
-    filtered_users = fake_users_db.copy()
-
-    # Apply filters
-    if active_only:
-        filtered_users = [
-            user for user in filtered_users if user["status"] == UserStatus.ACTIVE
-        ]
-    elif status:
-        filtered_users = [user for user in filtered_users if user["status"] == status]
-
-    if name:
-        filtered_users = [
-            user for user in filtered_users if name.lower() in user["name"].lower()
-        ]
-
-    if min_age is not None:
-        filtered_users = [
-            user
-            for user in filtered_users
-            if user.get("age") and user["age"] >= min_age
-        ]
-
-    if max_age is not None:
-        filtered_users = [
-            user
-            for user in filtered_users
-            if user.get("age") and user["age"] <= max_age
-        ]
-
-    return filtered_users
@@ -2,24 +2,170 @@
 LLM API endpoint for text generation.
 """
 
-from fastapi import APIRouter, HTTPException
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, List, Optional, Tuple
+from uuid import UUID
 
-from app.models import QueryRequest, QueryResponse
-from app.textGeneration import get_llm_response
+import anyio
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from app.api.responses import dumps, rows_response
+from app.api.streaming import NDJSON_MEDIA_TYPE
+from app.core.config import settings
+from app.core.metrics import REGISTRY, timer
+from app.core.observability import request_elapsed_ms
+from app.core.query_log import get_query_log_sink, record_query_log
+from app.core.rate_limit import (
+    RateLimitExceeded,
+    get_rate_limiter,
+    retry_after_header,
+)
+from app.ingestion.chunking import count_tokens
+from app.models import (
+    BatchQueryRequest,
+    BatchQueryResult,
+    QueryRequest,
+    QueryResponse,
+    SummaryResponse,
+)
+from app.textGeneration import (
+    abatch_llm_responses,
+    aget_llm_response,
+    astream_llm_response,
+    get_model_registry,
+)
+from app.textGeneration.cache import get_response_cache, query_hash
+from app.textGeneration.client import get_llm_client
+from app.textGeneration.llm_service import flights, upstream_retry_after
+from app.textGeneration.resilience import CircuitOpenError
+from app.textGeneration.summary import get_summary_service
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+SERIALIZATION_SECONDS = REGISTRY.histogram(
+    "http_serialization_seconds", "Time rendering a response body"
+)
+
+
+def _sse_event(data: dict, event: str = None) -> str:
+    """Format a Server-Sent Events frame."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+def _caller_key(http_request: Request) -> str:
+    """
+    Rate-limit key: the authenticated principal, or else the client address.
+
+    Never the body's user_id, which the client controls. The principal is
+    the `user` an authentication middleware puts in the ASGI scope; the
+    address is the peer, or the X-Forwarded-For client when the peer is a
+    trusted proxy (uvicorn's proxy_headers).
+    """
+    user = http_request.scope.get("user")
+    if user is not None and user.is_authenticated:
+        return f"principal:{user.display_name}"
+    client = http_request.client
+    return f"ip:{client.host if client else 'unknown'}"
+
+
+def _reserved_tokens(request: QueryRequest) -> int:
+    """LLM tokens a batched query reserves from the caller's budget up front."""
+    return count_tokens(request.query) + settings.LLM_BATCH_RESERVE_TOKENS
+
+
+async def _admit(
+    caller: str,
+    thread_id: Optional[UUID] = None,
+    batch: Optional[BatchQueryRequest] = None,
+) -> None:
+    """
+    Apply rate limits, answering 429 with a Retry-After hint when exceeded.
+
+    A batch is admitted as one request per query, each reserving its
+    estimated tokens (see _reserved_tokens), or not at all.
+    """
+    limiter = get_rate_limiter()
+    try:
+        if batch is None:
+            await limiter.acquire(caller, thread_id)
+        else:
+            await limiter.acquire_many(
+                caller,
+                [
+                    (request.thread_id, _reserved_tokens(request))
+                    for request in batch.queries
+                ],
+            )
+    except RateLimitExceeded as e:
+        raise HTTPException(
+            status_code=429, detail=str(e), headers=retry_after_header(e.retry_after)
+        )
+
+
+def _log_query(
+    request: QueryRequest,
+    answer: str,
+    model: str,
+    sources: Optional[List[dict]] = None,
+    duration_ms: Optional[float] = None,
+    cached: bool = False,
+) -> None:
+    """Queue the answered query, cached or not, for the batched query_logs writer."""
+    if request.user_id and request.thread_id:
+        record_query_log(
+            user_id=request.user_id,
+            thread_id=request.thread_id,
+            query_text=request.query,
+            query_response=answer,
+            query_hash=query_hash(request.query),
+            results=sources,
+            duration_ms=duration_ms or request_elapsed_ms(),
+            model=model,
+            cached=cached,
+        )
+
 
 @router.post("/query", response_model=QueryResponse)
-async def generate_llm_response(request: QueryRequest):
+async def generate_llm_response(request: QueryRequest, http_request: Request):
     """Generate an LLM response to a user query."""
+    caller = _caller_key(http_request)
+    await _admit(caller, request.thread_id)
+
     try:
-        response = get_llm_response(request.query)
+        response = await aget_llm_response(request.query, request.thread_id)
+        await get_rate_limiter().record_tokens(
+            caller, request.thread_id, response.total_tokens
+        )
+
+        _log_query(
+            request,
+            response.content,
+            response.model,
+            response.sources,
+            cached=response.cached,
+        )
 
-        return QueryResponse(
-            query=request.query,
-            response=response.content,
-            model=response.model,
+        with timer(SERIALIZATION_SECONDS.labels(route="/llm/query")):
+            return rows_response(
+                {
+                    "query": request.query,
+                    "response": response.content,
+                    "model": response.model,
+                    "cached": response.cached,
+                },
+                QueryResponse,
+            )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="LLM response timed out")
+    except CircuitOpenError as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers=retry_after_header(e.retry_after)
         )
     except Exception as e:
         raise HTTPException(
@@ -28,14 +174,236 @@ async def generate_llm_response(request: QueryRequest):
         )
 
 
+async def _stream_events(request: QueryRequest, caller: str) -> AsyncIterator[str]:
+    """
+    Relay streamed tokens as SSE frames, ending with a done or error event.
+
+    The tokens generated are charged to the caller however the stream ends:
+    completed, failed upstream, or cut off by a disconnect.
+    """
+    fragments, starts = [], []
+    try:
+        async for token in astream_llm_response(
+            request.query, request.thread_id, on_start=starts.append
+        ):
+            fragments.append(token)
+            yield _sse_event({"token": token})
+        info = starts[-1]
+        _log_query(
+            request, "".join(fragments), info.model, info.sources, cached=info.cached
+        )
+        yield _sse_event({"model": info.model}, event="done")
+    except asyncio.CancelledError:
+        logger.info("Client disconnected, cancelled upstream generation")
+        raise
+    except Exception as e:
+        yield _sse_event(
+            {"detail": f"Failed to generate response: {str(e)}"}, event="error"
+        )
+    finally:
+        # Cached answers cost nothing upstream, as on /query
+        if not (starts and starts[-1].cached):
+            # Streams carry no usage report, so estimate what was generated.
+            # Shielded so the charge survives the cancellation of the stream
+            with anyio.CancelScope(shield=True):
+                await get_rate_limiter().record_tokens(
+                    caller,
+                    request.thread_id,
+                    count_tokens(request.query) + count_tokens("".join(fragments)),
+                )
+
+
+@router.post("/query/stream")
+async def stream_llm_response(request: QueryRequest, http_request: Request):
+    """
+    Stream an LLM response to a user query as Server-Sent Events.
+
+    Each token arrives as a `data: {"token": ...}` frame, followed by a final
+    `done` event carrying the model name, or an `error` event on failure.
+    Disconnecting cancels the upstream generation.
+    """
+    caller = _caller_key(http_request)
+    await _admit(caller, request.thread_id)
+
+    # Fail fast with a status code while one can still be sent, but only if
+    # neither the models this query may be routed to nor the fallback can
+    # take it
+    retry_after = upstream_retry_after(request.query)
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=503,
+            detail="LLM upstream unavailable",
+            headers=retry_after_header(retry_after),
+        )
+
+    return StreamingResponse(
+        _stream_events(request, caller),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _batch_error(e: Exception) -> Tuple[int, str]:
+    """Status code and message a failed query of a batch is reported with."""
+    if isinstance(e, asyncio.TimeoutError):
+        return 504, "LLM response timed out"
+    if isinstance(e, CircuitOpenError):
+        return 503, str(e)
+    return 500, f"Failed to generate response: {str(e)}"
+
+
+async def _batch_results(batch: BatchQueryRequest, caller: str) -> AsyncIterator[bytes]:
+    """
+    Answer a batch, yielding one NDJSON line per query as it completes.
+
+    Each query's token reservation is settled with its actual usage as it
+    completes; reservations of queries that never ran are given back.
+    """
+    limiter = get_rate_limiter()
+    queries = [(request.query, request.thread_id) for request in batch.queries]
+    unsettled = set(range(len(queries)))
+    try:
+        async for index, result in abatch_llm_responses(queries):
+            request = batch.queries[index]
+            used = 0 if isinstance(result, Exception) else result.total_tokens
+            unsettled.discard(index)
+            await limiter.record_tokens(
+                caller, request.thread_id, used - _reserved_tokens(request)
+            )
+            line = {"index": index, "query": request.query}
+            if isinstance(result, Exception):
+                line["status_code"], line["error"] = _batch_error(result)
+            else:
+                _log_query(
+                    request,
+                    result.content,
+                    result.model,
+                    result.sources,
+                    result.duration_ms,
+                    cached=result.cached,
+                )
+                line.update(
+                    response=result.content, model=result.model, cached=result.cached
+                )
+            yield dumps(BatchQueryResult(**line).model_dump()) + b"\n"
+    except asyncio.CancelledError:
+        logger.info("Client disconnected, cancelled the rest of the batch")
+        raise
+    finally:
+        # Shielded so the refund survives the cancellation of the stream
+        with anyio.CancelScope(shield=True):
+            for index in unsettled:
+                request = batch.queries[index]
+                await limiter.record_tokens(
+                    caller, request.thread_id, -_reserved_tokens(request)
+                )
+
+
+@router.post(
+    "/query/batch",
+    response_model=BatchQueryResult,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}},
+)
+async def batch_llm_responses(batch: BatchQueryRequest, http_request: Request):
+    """
+    Answer many queries in one call, streaming results as they complete.
+
+    The response is NDJSON: one BatchQueryResult line per query, in completion
+    order (use `index` to match them to the request). Up to
+    settings.LLM_BATCH_CONCURRENCY queries run at once through the shared
+    client; a failed query is reported on its line with the status code it
+    would have got alone, and the others continue. Each query counts as one
+    request against the caller's and its thread's limits and reserves its
+    estimated tokens up front; if the whole batch does not fit, it is
+    rejected with 429. Disconnecting cancels the queries not yet answered.
+    """
+    if len(batch.queries) > settings.LLM_BATCH_MAX_QUERIES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.LLM_BATCH_MAX_QUERIES} queries per batch",
+        )
+    caller = _caller_key(http_request)
+    await _admit(caller, batch=batch)
+    return StreamingResponse(
+        _batch_results(batch, caller), media_type=NDJSON_MEDIA_TYPE
+    )
+
+
+@router.get(
+    "/summary/{thread_id}",
+    response_model=SummaryResponse,
+    responses={
+        202: {
+            "model": SummaryResponse,
+            "description": "No summary yet; one is being generated",
+        }
+    },
+)
+async def get_summary(thread_id: UUID, post_id: Optional[UUID] = None):
+    """
+    Get the precomputed summary of a post, or of a whole thread.
+
+    Never waits for generation. A stale summary is returned (status "stale")
+    while a refresh runs in the background; if none exists yet, the answer is
+    202 with status "pending" and the caller should retry shortly.
+    """
+    try:
+        summary = await get_summary_service().get(thread_id, post_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to load summary: {str(e)}")
+
+    if summary is None:
+        return rows_response(
+            {
+                "thread_id": thread_id,
+                "post_id": post_id,
+                "status": "pending",
+                "summary": None,
+                "computed_at": None,
+                "sources": [],
+            },
+            SummaryResponse,
+            status_code=202,
+        )
+
+    return rows_response(
+        {
+            "thread_id": thread_id,
+            "post_id": post_id,
+            "status": "stale" if summary.stale else "fresh",
+            "summary": summary.text,
+            "computed_at": summary.computed_at,
+            "sources": summary.source_chunks,
+        },
+        SummaryResponse,
+    )
+
+
+@router.get("/cache/stats")
+async def llm_cache_stats():
+    """Report cache, coalescing, query log, routing and summary counters."""
+    cache = get_response_cache()
+    return {
+        "entries": len(cache),
+        **cache.stats.as_dict(),
+        "coalescing": flights.stats.as_dict(),
+        "query_log": get_query_log_sink().stats.as_dict(),
+        "circuit": get_llm_client().breaker.as_dict(),
+        "routing": get_model_registry().stats.as_dict(),
+        "summaries": get_summary_service().stats.as_dict(),
+    }
+
+
 @router.get("/health")
 async def llm_health_check():
-    """Check if the LLM service is configured."""
+    """Check if the LLM service is configured, and report its models by role."""
     import os
 
     api_key = os.getenv("GROQ_API_KEY")
+    registry = get_model_registry()
     return {
         "status": "healthy" if api_key else "unhealthy",
-        "model": "openai/gpt-oss-120b",
+        "model": registry.default.model,
+        "models": registry.as_dict(),
         "configured": bool(api_key),
     }
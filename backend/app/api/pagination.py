@@ -0,0 +1,13 @@
+"""
+Keyset pagination for list endpoints.
+
+A page is requested with `limit` and the sort key of the last row of the
+previous page (e.g. `after_id`); the next page is the rows after that key
+(`WHERE id > $1 ORDER BY id LIMIT $2`). Unlike OFFSET, this reads only the
+rows returned, so deep pages cost the same as the first, and rows inserted
+meanwhile do not shift later pages.
+"""
+
+# Page size limits for keyset-paginated endpoints
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
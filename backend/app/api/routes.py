@@ -30,3 +30,12 @@ api_router.include_router(llm.router, prefix="/llm", tags=["llm"])
 def health_check():
     """Health check endpoint example."""
     return MessageResponse(message="Backend is running", status="healthy")
+
+
+@api_router.get("/health/db")
+def database_pool_health():
+    """Connection pool counters: in use, waiting and acquire latency."""
+    from app.core.database import get_pool_stats
+
+    stats = get_pool_stats()
+    return {"status": "healthy" if stats else "uninitialized", "pool": stats}
@@ -0,0 +1,78 @@
+"""
+Streaming responses for large result sets.
+
+Rows arrive in batches (e.g. from `stream_query` in app.core.database or
+app.core.async_database) and are serialized and sent batch by batch, so
+memory stays flat however many rows there are. NDJSON (one JSON object per
+line) is the default; a JSON array is available for clients that need one.
+"""
+
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, List, Union
+
+from fastapi.responses import StreamingResponse
+
+from app.api.responses import dumps
+
+Batches = Union[Iterable[List[dict]], AsyncIterable[List[dict]]]
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _ndjson(batch: List[dict]) -> bytes:
+    return b"".join(dumps(row) + b"\n" for row in batch)
+
+
+def _array(batch: List[dict]) -> bytes:
+    return b",".join(dumps(row) for row in batch)
+
+
+def _sync_chunks(batches: Iterable[List[dict]], fmt: str) -> Iterator[bytes]:
+    if fmt == "ndjson":
+        for batch in batches:
+            yield _ndjson(batch)
+        return
+    separator = b"["
+    for batch in batches:
+        if batch:
+            yield separator + _array(batch)
+            separator = b","
+    yield b"[]" if separator == b"[" else b"]"
+
+
+async def _async_chunks(
+    batches: AsyncIterable[List[dict]], fmt: str
+) -> AsyncIterator[bytes]:
+    if fmt == "ndjson":
+        async for batch in batches:
+            yield _ndjson(batch)
+        return
+    separator = b"["
+    async for batch in batches:
+        if batch:
+            yield separator + _array(batch)
+            separator = b","
+    yield b"[]" if separator == b"[" else b"]"
+
+
+def stream_rows(batches: Batches, fmt: str = "ndjson") -> StreamingResponse:
+    """
+    Stream batches of rows as NDJSON or as one JSON array.
+
+    Sync iterables (e.g. a psycopg2 named cursor) are consumed in the
+    threadpool, so they do not block the event loop.
+
+    Args:
+        batches: Iterable or async iterable of row lists
+        fmt: "ndjson" or "json"
+
+    Returns:
+        StreamingResponse
+    """
+    if fmt not in ("ndjson", "json"):
+        raise ValueError(f"Unknown stream format: {fmt}")
+    if hasattr(batches, "__aiter__"):
+        content = _async_chunks(batches, fmt)
+    else:
+        content = _sync_chunks(batches, fmt)
+    media_type = NDJSON_MEDIA_TYPE if fmt == "ndjson" else "application/json"
+    return StreamingResponse(content, media_type=media_type)
@@ -0,0 +1,343 @@
+"""
+Async database connection management.
+
+This module provides an asyncpg connection pool for use from async FastAPI
+handlers, with the same helper surface as `app.core.database` so queries do
+not block the event loop.
+
+Note:
+    asyncpg uses numbered placeholders (`$1`, `$2`, ...) rather than psycopg2's
+    `%s`, and takes query arguments positionally.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator, Iterable, List, Optional, Sequence
+
+import asyncpg
+
+from app.core.config import settings
+from app.core.metrics import REGISTRY, timer
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Shared with app.core.database; the registry returns the same families
+DB_POOL_ACQUIRE_SECONDS = REGISTRY.histogram(
+    "db_pool_acquire_seconds", "Time waiting for a pooled database connection"
+)
+DB_QUERY_SECONDS = REGISTRY.histogram(
+    "db_query_seconds", "Database query time, including commit"
+)
+
+# Global async connection pool
+_async_pool: Optional[asyncpg.Pool] = None
+# Serializes lazy creation, so concurrent first callers share one pool
+_async_pool_lock = asyncio.Lock()
+
+
+async def _init_connection(connection: asyncpg.Connection) -> None:
+    """Decode JSON columns to Python objects, matching the psycopg2 helpers."""
+    for type_name in ("json", "jsonb"):
+        await connection.set_type_codec(
+            type_name, encoder=json.dumps, decoder=json.loads, schema="pg_catalog"
+        )
+
+
+async def init_async_pool(
+    min_size: Optional[int] = None, max_size: Optional[int] = None
+) -> None:
+    """
+    Initialize the async database connection pool.
+
+    Args:
+        min_size: Minimum number of connections, defaults to settings.DB_ASYNC_POOL_MIN_SIZE
+        max_size: Maximum number of connections, defaults to settings.DB_ASYNC_POOL_MAX_SIZE
+    """
+    global _async_pool
+
+    min_size = settings.DB_ASYNC_POOL_MIN_SIZE if min_size is None else min_size
+    max_size = settings.DB_ASYNC_POOL_MAX_SIZE if max_size is None else max_size
+
+    try:
+        _async_pool = await asyncpg.create_pool(
+            settings.DATABASE_URL,
+            min_size=min_size,
+            max_size=max_size,
+            # Prepared statements are cached per connection; set to 0 behind a
+            # transaction-mode pooler (e.g. Supabase's pgbouncer port)
+            statement_cache_size=settings.DB_STATEMENT_CACHE_SIZE,
+            command_timeout=settings.DB_COMMAND_TIMEOUT,
+            init=_init_connection,
+        )
+        logger.info(
+            f"Async database pool initialized with {min_size}-{max_size} connections"
+        )
+    except Exception as e:
+        logger.error(f"Failed to initialize async database pool: {e}")
+        raise
+
+
+async def get_async_pool() -> asyncpg.Pool:
+    """
+    Get the async connection pool, initializing it on first use.
+
+    Returns:
+        asyncpg.Pool: The shared pool
+    """
+    global _async_pool
+
+    if _async_pool is None:
+        async with _async_pool_lock:
+            # Another caller may have created it while this one waited
+            if _async_pool is None:
+                await init_async_pool()
+    return _async_pool
+
+
+@asynccontextmanager
+async def get_async_db() -> AsyncGenerator[asyncpg.Connection, None]:
+    """
+    Async context manager for database connections.
+
+    Acquires a pooled connection and wraps the block in a transaction that
+    commits on success and rolls back on error.
+
+    Usage:
+        async with get_async_db() as db:
+            rows = await db.fetch("SELECT * FROM threads WHERE id = $1", thread_id)
+
+    Yields:
+        asyncpg.Connection: Database connection
+    """
+    pool = await get_async_pool()
+    start = time.perf_counter()
+    async with pool.acquire() as connection:
+        DB_POOL_ACQUIRE_SECONDS.labels(pool="async").observe(
+            time.perf_counter() - start
+        )
+        async with connection.transaction():
+            yield connection
+
+
+def _pool_in_use():
+    if _async_pool is None:
+        return None
+    in_use = _async_pool.get_size() - _async_pool.get_idle_size()
+    return {(("pool", "async"),): in_use}
+
+
+REGISTRY.gauge(
+    "db_async_pool_connections_in_use",
+    "Connections checked out of the async pool",
+    _pool_in_use,
+)
+
+
+async def close_async_pool() -> None:
+    """Close all connections in the async pool."""
+    global _async_pool
+
+    if _async_pool:
+        try:
+            await _async_pool.close()
+            _async_pool = None
+            logger.info("Async database pool closed")
+        except Exception as e:
+            logger.error(f"Error closing async database pool: {e}")
+
+
+async def test_async_connection() -> bool:
+    """
+    Test database connectivity through the async pool.
+
+    Returns:
+        bool: True if connection successful, False otherwise
+    """
+    try:
+        async with get_async_db() as db:
+            return await db.fetchval("SELECT 1") == 1
+    except Exception as e:
+        logger.error(f"Async database connection test failed: {e}")
+        return False
+
+
+# Helper functions for common database operations
+
+
+async def execute_statement(query: str, *args: Any) -> int:
+    """
+    Execute a non-SELECT statement (INSERT, UPDATE, DELETE).
+
+    Args:
+        query: SQL statement with $n placeholders
+        *args: Query parameters
+
+    Returns:
+        Number of affected rows
+
+    Example:
+        affected = await execute_statement("DELETE FROM example WHERE id = $1", 1)
+    """
+    with timer(DB_QUERY_SECONDS.labels(pool="async", operation="statement")):
+        async with get_async_db() as db:
+            status = await db.execute(query, *args)
+    # Status strings look like "UPDATE 3" or "INSERT 0 1"
+    count = status.rsplit(" ", 1)[-1]
+    return int(count) if count.isdigit() else 0
+
+
+async def execute_query(query: str, *args: Any, fetch_one: bool = False):
+    """
+    Execute a query and return results.
+
+    Args:
+        query: SQL query with $n placeholders
+        *args: Query parameters
+        fetch_one: If True, return only the first result
+
+    Returns:
+        Query results as dict or list of dicts
+
+    Example:
+        thread = await execute_query(
+            "SELECT * FROM threads WHERE id = $1", thread_id, fetch_one=True
+        )
+    """
+    with timer(DB_QUERY_SECONDS.labels(pool="async", operation="query")):
+        async with get_async_db() as db:
+            if fetch_one:
+                row = await db.fetchrow(query, *args)
+                return dict(row) if row else None
+            return [dict(row) for row in await db.fetch(query, *args)]
+
+
+async def stream_query(
+    query: str, *args: Any, batch_size: Optional[int] = None
+) -> AsyncGenerator[List[dict], None]:
+    """
+    Run a query with a server-side cursor and yield rows in batches.
+
+    Only one batch is held in memory at a time. The connection is checked out
+    until the generator is exhausted or closed.
+
+    Args:
+        query: SQL query with $n placeholders
+        *args: Query parameters
+        batch_size: Rows per batch, defaults to settings.DB_STREAM_BATCH_SIZE
+
+    Yields:
+        Lists of row dicts, each at most batch_size long
+
+    Example:
+        async for rows in stream_query("SELECT * FROM query_logs"):
+            ...
+    """
+    batch_size = batch_size or settings.DB_STREAM_BATCH_SIZE
+    with timer(DB_QUERY_SECONDS.labels(pool="async", operation="stream")):
+        async with get_async_db() as db:
+            cursor = await db.cursor(query, *args)
+            while True:
+                rows = await cursor.fetch(batch_size)
+                if not rows:
+                    break
+                yield [dict(row) for row in rows]
+
+
+async def execute_insert(query: str, *args: Any, return_id: bool = True):
+    """
+    Execute an INSERT query and optionally return the inserted ID.
+
+    Args:
+        query: INSERT SQL query, with RETURNING id if return_id is set
+        *args: Query parameters
+        return_id: If True, return the first column of the returned row
+
+    Returns:
+        Inserted row ID if return_id=True, otherwise None
+
+    Example:
+        new_id = await execute_insert(
+            "INSERT INTO threads (piazza_course_id) VALUES ($1) RETURNING id",
+            "cpsc110",
+        )
+    """
+    with timer(DB_QUERY_SECONDS.labels(pool="async", operation="insert")):
+        async with get_async_db() as db:
+            if return_id:
+                return await db.fetchval(query, *args)
+            await db.execute(query, *args)
+            return None
+
+
+# Bulk variants
+
+
+async def execute_many(query: str, args: Iterable[Sequence[Any]]) -> None:
+    """
+    Execute a statement once per parameter tuple, in one transaction.
+
+    The statement is prepared once and the rows are pipelined to the server.
+
+    Args:
+        query: SQL statement with $n placeholders
+        args: Iterable of parameter tuples
+
+    Example:
+        await execute_many(
+            "UPDATE documents SET indexed = $2 WHERE id = $1",
+            [(doc_id, True) for doc_id in doc_ids],
+        )
+    """
+    async with get_async_db() as db:
+        await db.executemany(query, args)
+
+
+async def execute_query_many(query: str, args: Iterable[Sequence[Any]]) -> List[dict]:
+    """
+    Run a query once per parameter tuple and return the concatenated rows.
+
+    Args:
+        query: SQL query with $n placeholders
+        args: Iterable of parameter tuples
+
+    Returns:
+        All result rows as dicts
+    """
+    results: List[dict] = []
+    async with get_async_db() as db:
+        statement = await db.prepare(query)
+        for params in args:
+            results.extend(dict(row) for row in await statement.fetch(*params))
+    return results
+
+
+async def copy_records(
+    table: str, records: Iterable[Sequence[Any]], columns: Sequence[str]
+) -> int:
+    """
+    Bulk-load rows with COPY, the fastest way to insert many rows.
+
+    Args:
+        table: Target table name
+        records: Iterable of row tuples, in `columns` order
+        columns: Column names to fill
+
+    Returns:
+        Number of rows copied
+
+    Example:
+        await copy_records(
+            "query_logs",
+            [(user_id, thread_id, "q", "a")],
+            columns=["user_id", "thread_id", "query_text", "query_response"],
+        )
+    """
+    async with get_async_db() as db:
+        status = await db.copy_records_to_table(
+            table, records=records, columns=list(columns)
+        )
+    return int(status.rsplit(" ", 1)[-1])
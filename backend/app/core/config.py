@@ -36,6 +36,137 @@ class Settings(BaseSettings):
     # Database Configuration
     DATABASE_URL: str
 
+    # Production server (app.core.server); pools below are per worker
+    SERVER_WORKERS: int = 0  # 0 = one per available CPU
+    SERVER_BACKLOG: int = 2048
+    SERVER_KEEPALIVE_TIMEOUT: int = 5
+    SERVER_GRACEFUL_TIMEOUT: float = 30.0  # drain in-flight requests on SIGTERM
+    SERVER_ACCESS_LOG: bool = False  # http_request_duration_seconds covers it
+
+    # Sync database pool (psycopg2)
+    DB_POOL_MIN_SIZE: int = 1
+    DB_POOL_MAX_SIZE: int = 10
+    DB_POOL_ACQUIRE_TIMEOUT: float = 10.0  # seconds to wait for a free connection
+    DB_POOL_MAX_LIFETIME: float = 1800.0  # recycle connections older than this
+    DB_POOL_VALIDATE_IDLE: float = 30.0  # ping connections idle longer; 0 = always
+
+    # Async database pool (asyncpg)
+    DB_ASYNC_POOL_MIN_SIZE: int = 1
+    DB_ASYNC_POOL_MAX_SIZE: int = 10
+    DB_STATEMENT_CACHE_SIZE: int = 100  # 0 behind transaction-mode pgbouncer
+    DB_COMMAND_TIMEOUT: float = 30.0
+    DB_STREAM_BATCH_SIZE: int = 1000  # rows per fetch from server-side cursors
+
+    # Query log sink (batched background writes to query_logs)
+    QUERY_LOG_ENABLED: bool = True
+    QUERY_LOG_QUEUE_SIZE: int = 10000  # rows buffered before dropping
+    QUERY_LOG_BATCH_SIZE: int = 500  # rows per INSERT
+    QUERY_LOG_FLUSH_INTERVAL: float = 1.0  # max seconds a row waits in a batch
+    QUERY_LOG_DROP_POLICY: str = "drop_newest"  # or "drop_oldest" when full
+    QUERY_LOG_SHUTDOWN_TIMEOUT: float = 10.0
+
+    # LLM Configuration
+    LLM_PROVIDER: str = "groq"  # "groq" or "fake" (offline stand-in)
+    LLM_MODEL: str = "openai/gpt-oss-120b"
+    LLM_TEMPERATURE: float = 0.7
+    LLM_MAX_TOKENS: int = 8192
+    LLM_MAX_RETRIES: int = 3
+    LLM_REQUEST_TIMEOUT: float = 60.0
+    LLM_MAX_CONCURRENCY: int = 256  # in-flight completions per worker
+    LLM_QUERY_TIMEOUT: float = 120.0  # per-request deadline, incl. queueing
+    LLM_BATCH_MAX_QUERIES: int = 500  # queries accepted by one /llm/query/batch
+    LLM_BATCH_CONCURRENCY: int = 16  # queries in flight per batch
+    LLM_BATCH_RESERVE_TOKENS: int = 1024  # per query on top of its own, held up front
+
+    # Model routing and fallback (app.textGeneration.routing); "" disables a role
+    LLM_ROUTING_ENABLED: bool = True
+    LLM_FAST_MODEL: str = "openai/gpt-oss-20b"
+    LLM_FAST_MAX_TOKENS: int = 2048
+    LLM_ROUTE_FAST_QUERY_TOKENS: int = 48  # queries up to this long...
+    LLM_ROUTE_FAST_CONTEXT_TOKENS: int = 512  # ...with this much retrieved context
+    LLM_FALLBACK_MODEL: str = "llama-3.3-70b-versatile"
+    LLM_FALLBACK_RETRIES: int = 1  # retries on the routed model before falling back
+    LLM_FALLBACK_TIMEOUT: float = 30.0  # seconds the routed model gets, incl. retries
+
+    # LLM retries (jittered exponential backoff) and circuit breaker
+    LLM_RETRY_BASE_DELAY: float = 0.5
+    LLM_RETRY_MAX_DELAY: float = 8.0
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 5  # consecutive failures to open
+    LLM_BREAKER_RESET_SECONDS: float = 30.0  # open time before a trial call
+
+    # Rate limiting (token buckets per user and per thread)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_STORE: str = "memory"  # or "postgres" to share across workers
+    RATE_LIMIT_USER_REQUESTS_PER_MIN: float = 20
+    RATE_LIMIT_USER_TOKENS_PER_MIN: float = 40000
+    RATE_LIMIT_THREAD_REQUESTS_PER_MIN: float = 300
+    RATE_LIMIT_THREAD_TOKENS_PER_MIN: float = 600000
+
+    # LLM HTTP connection pool (shared across requests)
+    LLM_POOL_MAX_CONNECTIONS: int = 256
+    LLM_POOL_MAX_KEEPALIVE: int = 20
+    LLM_POOL_KEEPALIVE_EXPIRY: float = 30.0
+
+    # Share one upstream call among concurrent identical queries
+    LLM_COALESCE_ENABLED: bool = True
+
+    # LLM response cache
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_ENTRIES: int = 1024
+    LLM_CACHE_TTL_SECONDS: float = 3600.0
+    LLM_CACHE_PERSISTENT: bool = False  # look up recent answers in query_logs
+    LLM_CACHE_SEMANTIC: bool = False  # match paraphrases by embedding similarity
+    LLM_CACHE_SEMANTIC_THRESHOLD: float = 0.95
+
+    # Embeddings
+    EMBEDDING_PROVIDER: str = "hashing"
+    EMBEDDING_DIMENSIONS: int = 384  # must match the embeddings.embedding column
+
+    # Ingestion
+    INGEST_BATCH_SIZE: int = 512  # chunks per embedding call and transaction
+    CHUNK_MAX_TOKENS: int = 256
+    CHUNK_OVERLAP_TOKENS: int = 32
+    INDEX_WATERMARK_LAG_SECONDS: float = 5.0  # skip rows newer than this
+
+    # Vector retrieval
+    VECTOR_ENGINE: str = "pgvector"  # "pgvector" or "memory"
+    VECTOR_HNSW_EF_SEARCH: int = 100
+    VECTOR_ITERATIVE_SCAN: bool = True  # needs pgvector >= 0.8
+
+    # Hybrid (lexical + vector) retrieval
+    HYBRID_CANDIDATES: int = 50  # candidates taken from each ranking
+    HYBRID_RRF_K: int = 60  # reciprocal-rank fusion damping constant
+
+    # Retrieval-augmented generation
+    RAG_ENABLED: bool = True  # ground answers for queries with a thread_id
+    RAG_TOP_K: int = 20  # chunks retrieved before packing
+    RAG_CONTEXT_TOKENS: int = 2048  # budget for retrieved chunks in the prompt
+
+    # Precomputed summaries (summary_cache), refreshed in the background
+    SUMMARY_STORE: str = "postgres"  # or "memory"
+    SUMMARY_WORKERS: int = 2  # concurrent refreshes per worker process
+    SUMMARY_QUEUE_SIZE: int = 1000  # pending refreshes before new ones are dropped
+    SUMMARY_CONTEXT_TOKENS: int = 4096  # budget for source chunks in the prompt
+    SUMMARY_RETRY_SECONDS: float = 60.0  # wait before retrying a failed refresh
+
+    # Example users API storage
+    EXAMPLE_USER_STORE: str = "memory"  # or "postgres" (example_users table)
+
+    # Background jobs (app.jobs)
+    JOB_QUEUE_BACKEND: str = "postgres"  # or "memory" (single process only)
+    JOB_WORKER_PROCESSES: int = 2
+    JOB_POLL_INTERVAL: float = 1.0  # seconds an idle worker waits between polls
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BASE_DELAY: float = 10.0  # doubled after each failed attempt
+    JOB_RETRY_MAX_DELAY: float = 600.0
+    JOB_VISIBILITY_TIMEOUT: float = 1800.0  # requeue running jobs locked longer
+    JOB_SHUTDOWN_TIMEOUT: float = 60.0  # wait for running jobs on SIGTERM
+
+    # Fake LLM provider (used when LLM_PROVIDER="fake")
+    FAKE_LLM_LATENCY_MS: float = 0.0
+    FAKE_LLM_FAILING_MODELS: List[str] = []  # models that always fail, as throttled
+    FAKE_LLM_FAILURE_STATUS: int = 429
+
     class Config:
         case_sensitive = True
 
@@ -6,36 +6,219 @@ for PostgreSQL/Supabase integration.
 """
 
 import logging
+import os
+import threading
+import time
+import uuid
 from contextlib import contextmanager
-from typing import Generator, Optional
+from typing import Dict, Generator, List, Optional
 
 import psycopg2
 from psycopg2.extras import RealDictCursor
-from psycopg2.pool import SimpleConnectionPool
+from psycopg2.pool import PoolError, ThreadedConnectionPool
 
 from app.core.config import settings
+from app.core.metrics import REGISTRY, timer
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Global connection pool
-_connection_pool: Optional[SimpleConnectionPool] = None
+DB_POOL_ACQUIRE_SECONDS = REGISTRY.histogram(
+    "db_pool_acquire_seconds", "Time waiting for a pooled database connection"
+)
+DB_QUERY_SECONDS = REGISTRY.histogram(
+    "db_query_seconds", "Database query time, including commit"
+)
 
 
-def init_database_pool(min_connections: int = 1, max_connections: int = 10) -> None:
+class PoolTimeoutError(PoolError):
+    """Raised when no connection becomes free within the acquire timeout."""
+
+
+class ManagedConnectionPool:
+    """
+    Thread-safe connection pool for sync endpoints run in the threadpool.
+
+    Wraps psycopg2's ThreadedConnectionPool with:
+    - bounded-wait acquire: callers block up to `acquire_timeout` seconds for a
+      free connection instead of failing as soon as the pool is exhausted
+    - validation on checkout: closed connections, and idle ones that fail a
+      `SELECT 1` (e.g. after a database restart), are replaced transparently
+    - a maximum connection lifetime, after which connections are recycled
+    - counters for connections in use, waiting callers and acquire latency
+    """
+
+    def __init__(
+        self,
+        min_connections: int,
+        max_connections: int,
+        dsn: str,
+        acquire_timeout: float,
+        max_lifetime: float,
+        validate_idle: float,
+    ):
+        self.max_connections = max_connections
+        self.acquire_timeout = acquire_timeout
+        self.max_lifetime = max_lifetime
+        self.validate_idle = validate_idle
+
+        self._pool = ThreadedConnectionPool(min_connections, max_connections, dsn)
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._lock = threading.Lock()
+        self._created_at: Dict[int, float] = {}
+        self._last_used: Dict[int, float] = {}
+
+        self.in_use = 0
+        self.waiting = 0
+        self.acquired = 0
+        self.timeouts = 0
+        self.discarded = 0
+        self.acquire_latency = DB_POOL_ACQUIRE_SECONDS.labels(pool="sync")
+
+    def getconn(self):
+        """
+        Check out a validated connection, waiting for one if necessary.
+
+        Raises:
+            PoolTimeoutError: If no connection is free within acquire_timeout
+            psycopg2.Error: If a new connection cannot be opened
+        """
+        start = time.perf_counter()
+        with self._lock:
+            self.waiting += 1
+        try:
+            acquired = self._slots.acquire(timeout=self.acquire_timeout)
+        finally:
+            with self._lock:
+                self.waiting -= 1
+
+        if not acquired:
+            with self._lock:
+                self.timeouts += 1
+            raise PoolTimeoutError(
+                f"No database connection available after {self.acquire_timeout}s"
+            )
+
+        try:
+            connection = self._checkout()
+        except Exception:
+            self._slots.release()
+            raise
+
+        self.acquire_latency.observe(time.perf_counter() - start)
+        with self._lock:
+            self.in_use += 1
+            self.acquired += 1
+        return connection
+
+    def putconn(self, connection, close: bool = False) -> None:
+        """Return a connection, closing it if broken, expired or asked to."""
+        with self._lock:
+            self.in_use -= 1
+        try:
+            if close or connection.closed or self._expired(connection):
+                self._discard(connection)
+            else:
+                self._last_used[id(connection)] = time.monotonic()
+                self._pool.putconn(connection)
+        finally:
+            self._slots.release()
+
+    def closeall(self) -> None:
+        self._pool.closeall()
+        self._created_at.clear()
+        self._last_used.clear()
+
+    def stats(self) -> dict:
+        """Snapshot of pool counters, suitable for health or metrics output."""
+        with self._lock:
+            counters = {
+                "max_size": self.max_connections,
+                "in_use": self.in_use,
+                "waiting": self.waiting,
+                "acquired_total": self.acquired,
+                "timeouts_total": self.timeouts,
+                "discarded_total": self.discarded,
+            }
+        counters["acquire_seconds"] = self.acquire_latency.snapshot()
+        return counters
+
+    def _checkout(self):
+        # Every slot could hold a dead connection after a restart, so allow
+        # one retry per slot before giving up
+        for _ in range(self.max_connections + 1):
+            connection = self._pool.getconn()
+            self._created_at.setdefault(id(connection), time.monotonic())
+            if self._usable(connection):
+                return connection
+            self._discard(connection)
+        raise psycopg2.OperationalError("Could not obtain a usable connection")
+
+    def _expired(self, connection) -> bool:
+        created_at = self._created_at.get(id(connection), time.monotonic())
+        return bool(self.max_lifetime) and (
+            time.monotonic() - created_at > self.max_lifetime
+        )
+
+    def _usable(self, connection) -> bool:
+        if connection.closed or self._expired(connection):
+            return False
+        last_used = self._last_used.get(id(connection))
+        if last_used is not None and time.monotonic() - last_used < self.validate_idle:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            connection.rollback()
+            return True
+        except psycopg2.Error as e:
+            logger.warning(f"Discarding stale database connection: {e}")
+            return False
+
+    def _discard(self, connection) -> None:
+        self._created_at.pop(id(connection), None)
+        self._last_used.pop(id(connection), None)
+        with self._lock:
+            self.discarded += 1
+        try:
+            self._pool.putconn(connection, close=True)
+        except Exception as e:
+            logger.debug(f"Error closing discarded connection: {e}")
+
+
+# Global connection pool, and the process that opened it
+_connection_pool: Optional[ManagedConnectionPool] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+
+
+def init_database_pool(
+    min_connections: Optional[int] = None, max_connections: Optional[int] = None
+) -> None:
     """
     Initialize the database connection pool.
 
     Args:
-        min_connections: Minimum number of connections in the pool
-        max_connections: Maximum number of connections in the pool
+        min_connections: Minimum number of connections, defaults to settings.DB_POOL_MIN_SIZE
+        max_connections: Maximum number of connections, defaults to settings.DB_POOL_MAX_SIZE
     """
-    global _connection_pool
+    global _connection_pool, _pool_pid
+
+    if min_connections is None:
+        min_connections = settings.DB_POOL_MIN_SIZE
+    if max_connections is None:
+        max_connections = settings.DB_POOL_MAX_SIZE
 
     try:
-        _connection_pool = SimpleConnectionPool(
-            min_connections, max_connections, settings.DATABASE_URL
+        _connection_pool = ManagedConnectionPool(
+            min_connections,
+            max_connections,
+            settings.DATABASE_URL,
+            acquire_timeout=settings.DB_POOL_ACQUIRE_TIMEOUT,
+            max_lifetime=settings.DB_POOL_MAX_LIFETIME,
+            validate_idle=settings.DB_POOL_VALIDATE_IDLE,
         )
+        _pool_pid = os.getpid()
         logger.info(
             f"Database pool initialized with {min_connections}-{max_connections} connections"
         )
@@ -48,17 +231,23 @@ def get_db_connection():
     """
     Get a database connection from the pool.
 
+    Waits up to settings.DB_POOL_ACQUIRE_TIMEOUT for a free connection.
+
     Returns:
         psycopg2.connection: Database connection with RealDictCursor
 
     Raises:
-        RuntimeError: If connection pool is not initialized
+        PoolTimeoutError: If no connection becomes free in time
         psycopg2.Error: If unable to get connection
     """
     global _connection_pool
 
-    if _connection_pool is None:
-        init_database_pool()
+    if _connection_pool is None or _pool_pid != os.getpid():
+        with _pool_lock:
+            # A pool inherited through fork shares its sockets with the parent,
+            # so a forked worker opens its own instead of using (or closing) it
+            if _connection_pool is None or _pool_pid != os.getpid():
+                init_database_pool()
 
     try:
         connection = _connection_pool.getconn()
@@ -71,23 +260,52 @@ def get_db_connection():
         raise
 
 
-def return_db_connection(connection) -> None:
+def return_db_connection(connection, close: bool = False) -> None:
     """
     Return a database connection to the pool.
 
     Args:
         connection: The connection to return to the pool
+        close: If True, close the connection instead of reusing it
     """
     global _connection_pool
 
     if _connection_pool and connection:
         try:
-            _connection_pool.putconn(connection)
+            _connection_pool.putconn(connection, close=close)
             logger.debug("Database connection returned to pool")
         except Exception as e:
             logger.error(f"Failed to return database connection: {e}")
 
 
+def get_pool_stats() -> Optional[dict]:
+    """
+    Get counters for the sync connection pool.
+
+    Returns:
+        dict with in_use, waiting, totals and an acquire latency histogram,
+        or None if the pool is not initialized
+    """
+    return _connection_pool.stats() if _connection_pool else None
+
+
+def _pool_gauge(field: str):
+    stats = get_pool_stats()
+    return {(("pool", "sync"),): stats[field]} if stats else None
+
+
+REGISTRY.gauge(
+    "db_pool_connections_in_use",
+    "Connections checked out of the sync pool",
+    lambda: _pool_gauge("in_use"),
+)
+REGISTRY.gauge(
+    "db_pool_waiting",
+    "Callers waiting for a sync pool connection",
+    lambda: _pool_gauge("waiting"),
+)
+
+
 @contextmanager
 def get_db() -> Generator[psycopg2.extensions.connection, None, None]:
     """
@@ -105,6 +323,7 @@ def get_db() -> Generator[psycopg2.extensions.connection, None, None]:
         psycopg2.connection: Database connection
     """
     connection = None
+    broken = False
     try:
         connection = get_db_connection()
         yield connection
@@ -112,12 +331,16 @@ def get_db() -> Generator[psycopg2.extensions.connection, None, None]:
         logger.debug("Database transaction committed")
     except Exception as e:
         if connection:
-            connection.rollback()
-            logger.warning(f"Database transaction rolled back due to error: {e}")
+            try:
+                connection.rollback()
+                logger.warning(f"Database transaction rolled back due to error: {e}")
+            except psycopg2.Error:
+                # The connection died mid-transaction; don't hand it out again
+                broken = True
         raise
     finally:
         if connection:
-            return_db_connection(connection)
+            return_db_connection(connection, close=broken)
 
 
 def get_direct_connection():
@@ -203,10 +426,11 @@ def execute_statement(query: str, params=None):
         # Update records
         affected = execute_statement("UPDATE example SET name = %s WHERE id = %s", ("New Name", 1))
     """
-    with get_db() as db:
-        cursor = db.cursor()
-        cursor.execute(query, params)
-        return cursor.rowcount
+    with timer(DB_QUERY_SECONDS.labels(pool="sync", operation="statement")):
+        with get_db() as db:
+            cursor = db.cursor()
+            cursor.execute(query, params)
+            return cursor.rowcount
 
 
 def execute_query(query: str, params=None, fetch_one: bool = False):
@@ -232,14 +456,56 @@ def execute_query(query: str, params=None, fetch_one: bool = False):
             fetch_one=True
         )
     """
-    with get_db() as db:
-        cursor = db.cursor()
-        cursor.execute(query, params)
+    with timer(DB_QUERY_SECONDS.labels(pool="sync", operation="query")):
+        with get_db() as db:
+            cursor = db.cursor()
+            cursor.execute(query, params)
 
-        if fetch_one:
-            return cursor.fetchone()
-        else:
-            return cursor.fetchall()
+            if fetch_one:
+                return cursor.fetchone()
+            else:
+                return cursor.fetchall()
+
+
+def stream_query(
+    query: str, params=None, batch_size: Optional[int] = None
+) -> Generator[List[dict], None, None]:
+    """
+    Run a query with a server-side (named) cursor and yield rows in batches.
+
+    Unlike execute_query, the result set stays on the server and only one
+    batch is held in memory at a time. The connection is checked out until
+    the generator is exhausted or closed, so consume it promptly.
+
+    Args:
+        query: SQL query to execute
+        params: Query parameters (optional)
+        batch_size: Rows per batch, defaults to settings.DB_STREAM_BATCH_SIZE
+
+    Yields:
+        Lists of row dicts, each at most batch_size long
+
+    Example:
+        for rows in stream_query("SELECT * FROM post_chunks WHERE thread_id = %s",
+                                 (thread_id,)):
+            process(rows)
+    """
+    batch_size = batch_size or settings.DB_STREAM_BATCH_SIZE
+    with timer(DB_QUERY_SECONDS.labels(pool="sync", operation="stream")):
+        with get_db() as db:
+            cursor = db.cursor(name=f"stream_{uuid.uuid4().hex}")
+            try:
+                cursor.itersize = batch_size
+                cursor.execute(query, params)
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield rows
+            finally:
+                # Closed early (e.g. client disconnected): the pool rolls back
+                # the open read transaction when the connection is returned
+                cursor.close()
 
 
 def execute_insert(query: str, params=None, return_id: bool = True):
@@ -261,20 +527,11 @@ def execute_insert(query: str, params=None, return_id: bool = True):
             ("My Title", "My Content")
         )
     """
-    with get_db() as db:
-        cursor = db.cursor()
-        cursor.execute(query, params)
-
-        if return_id:
-            result = cursor.fetchone()
-            return result[0] if result else None
-
+    with timer(DB_QUERY_SECONDS.labels(pool="sync", operation="insert")):
+        with get_db() as db:
+            cursor = db.cursor()
+            cursor.execute(query, params)
 
-# Initialize the connection pool when module is imported
-# This can be disabled by setting an environment variable if needed
-if not settings.ENVIRONMENT == "test":
-    try:
-        init_database_pool()
-    except Exception as e:
-        logger.warning(f"Failed to initialize database pool on import: {e}")
-        logger.warning("Database connections will be initialized on first use")
+            if return_id:
+                result = cursor.fetchone()
+                return result[0] if result else None
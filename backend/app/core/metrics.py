@@ -0,0 +1,211 @@
+"""
+Lightweight in-process metrics.
+
+Provides thread-safe histograms and gauges that hot paths record into, and a
+registry that renders them in the Prometheus text exposition format for the
+`/metrics` endpoint.
+
+Usage:
+    RETRIEVAL_SECONDS = REGISTRY.histogram(
+        "rag_retrieval_seconds", "Time spent retrieving context"
+    )
+
+    with timer(RETRIEVAL_SECONDS):
+        chunks = hybrid_search(query, thread_id)
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+# Default latency buckets in seconds
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+LabelValues = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative-bucket histogram, safe to observe from multiple threads."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """Record one measurement."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> Dict[str, object]:
+        """Return cumulative bucket counts, sum and count."""
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+
+        cumulative, running = {}, 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            running += bucket_count
+            cumulative[str(bound)] = running
+        cumulative["+Inf"] = count
+        return {"buckets": cumulative, "sum": total, "count": count}
+
+
+class HistogramFamily:
+    """A named histogram with one child per combination of label values."""
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self._children: Dict[LabelValues, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, **labels: str) -> Histogram:
+        """Get the child histogram for these label values."""
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, Histogram(self.buckets))
+        return child
+
+    def observe(self, value: float) -> None:
+        """Record into the unlabeled child."""
+        self.labels().observe(value)
+
+    def children(self) -> List[Tuple[LabelValues, Histogram]]:
+        with self._lock:
+            return list(self._children.items())
+
+
+class Gauge:
+    """A value read from a callback at scrape time."""
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        callback: Callable[[], Optional[Dict[LabelValues, float]]],
+    ):
+        self.name = name
+        self.description = description
+        self.callback = callback
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: LabelValues, extra: LabelValues = ()) -> str:
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+class MetricsRegistry:
+    """Holds every metric exported on /metrics."""
+
+    def __init__(self):
+        self._histograms: Dict[str, HistogramFamily] = {}
+        self._gauges: Dict[str, Gauge] = {}
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> HistogramFamily:
+        """Get or create a histogram family."""
+        if name not in self._histograms:
+            self._histograms[name] = HistogramFamily(name, description, buckets)
+        return self._histograms[name]
+
+    def gauge(
+        self,
+        name: str,
+        description: str,
+        callback: Callable[[], Optional[Dict[LabelValues, float]]],
+    ) -> None:
+        """
+        Register a gauge whose values are read at scrape time.
+
+        Args:
+            name: Metric name
+            description: Help text
+            callback: Returns {label values: value}, or None to omit the metric
+        """
+        self._gauges[name] = Gauge(name, description, callback)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for family in self._histograms.values():
+            lines.append(f"# HELP {family.name} {family.description}")
+            lines.append(f"# TYPE {family.name} histogram")
+            for labels, child in family.children():
+                snapshot = child.snapshot()
+                for bound, count in snapshot["buckets"].items():
+                    lines.append(
+                        f"{family.name}_bucket"
+                        f"{_format_labels(labels, (('le', bound),))} {count}"
+                    )
+                lines.append(
+                    f"{family.name}_sum{_format_labels(labels)} {snapshot['sum']}"
+                )
+                lines.append(
+                    f"{family.name}_count{_format_labels(labels)} {snapshot['count']}"
+                )
+
+        for gauge in self._gauges.values():
+            values = gauge.callback()
+            if values is None:
+                continue
+            lines.append(f"# HELP {gauge.name} {gauge.description}")
+            lines.append(f"# TYPE {gauge.name} gauge")
+            for labels, value in values.items():
+                lines.append(f"{gauge.name}{_format_labels(labels)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+# Global registry rendered by /metrics
+REGISTRY = MetricsRegistry()
+
+
+@contextmanager
+def timer(histogram: Union[Histogram, HistogramFamily]) -> Iterator[None]:
+    """Observe the wall-clock duration of a block, in seconds."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - start)
@@ -0,0 +1,130 @@
+"""
+Request tracing: request IDs, per-request timing and log correlation.
+
+`RequestContextMiddleware` assigns every request an ID (taken from the
+incoming `X-Request-ID` header when it is a short token of safe characters,
+so clients cannot inject text into log lines), echoes it on the response, and
+records the request's duration in the `http_request_duration_seconds`
+histogram. The ID and start time live in context variables, so log records
+and downstream timers (e.g. query_logs.duration_ms) can read them without
+threading the request object through every call.
+"""
+
+import contextvars
+import logging
+import re
+import time
+import uuid
+from typing import Optional
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import REGISTRY
+
+REQUEST_ID_HEADER = "X-Request-ID"
+# Incoming request IDs are used only if they match this
+REQUEST_ID_PATTERN = re.compile(r"[A-Za-z0-9._-]{1,64}")
+
+_request_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "request_id", default=None
+)
+_request_start: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "request_start", default=None
+)
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "Time from request received to response sent"
+)
+
+
+def current_request_id() -> Optional[str]:
+    """ID of the request being handled, or None outside a request."""
+    return _request_id.get()
+
+
+def request_elapsed_ms() -> Optional[float]:
+    """Milliseconds since the current request arrived, or None outside one."""
+    start = _request_start.get()
+    return (time.perf_counter() - start) * 1000 if start is not None else None
+
+
+class RequestIdLogFilter(logging.Filter):
+    """Adds `request_id` to log records ("-" outside a request)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = current_request_id() or "-"
+        return True
+
+
+def configure_logging(level: int = logging.INFO) -> None:
+    """
+    Log to stderr with the request ID on every line.
+
+    Safe to call more than once (e.g. on re-import under reload or tests):
+    the handler is only installed the first time, later calls set the level.
+    """
+    root = logging.getLogger()
+    root.setLevel(level)
+    if any(isinstance(f, RequestIdLogFilter) for h in root.handlers for f in h.filters):
+        return
+
+    handler = logging.StreamHandler()
+    handler.addFilter(RequestIdLogFilter())
+    handler.setFormatter(
+        logging.Formatter(
+            "%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s"
+        )
+    )
+    root.addHandler(handler)
+
+
+def _route_template(scope: Scope) -> str:
+    """Path template of the matched route, keeping metric labels low-cardinality."""
+    app = scope.get("app")
+    for route in getattr(getattr(app, "router", None), "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", scope["path"])
+    return "unmatched"
+
+
+class RequestContextMiddleware:
+    """Assigns request IDs and times every HTTP request."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        request_id = headers.get(REQUEST_ID_HEADER.lower().encode(), b"").decode(
+            "latin-1"
+        )
+        if not REQUEST_ID_PATTERN.fullmatch(request_id):
+            request_id = uuid.uuid4().hex
+        id_token = _request_id.set(request_id)
+        start_token = _request_start.set(time.perf_counter())
+        status = 500
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (REQUEST_ID_HEADER.encode(), request_id.encode("latin-1")),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            HTTP_REQUEST_SECONDS.labels(
+                method=scope["method"], route=_route_template(scope), status=status
+            ).observe(request_elapsed_ms() / 1000)
+            _request_start.reset(start_token)
+            _request_id.reset(id_token)
@@ -0,0 +1,269 @@
+"""
+Query log persistence.
+
+Every answered question with a known user and thread is recorded in
+`query_logs`, including answers served from the response cache (marked
+`cached`), so the logs count all traffic. Rows of generated answers double as
+the persistent tier of the LLM response cache.
+
+Writes go through `QueryLogSink`, a bounded in-memory queue drained by a
+background task that inserts rows in batches. Recording a log is a
+non-blocking enqueue, so it adds no database round trip to the request. When
+the queue is full, entries are dropped according to settings.QUERY_LOG_DROP_POLICY
+rather than slowing requests down, and the queue is flushed on shutdown.
+"""
+
+import asyncio
+import logging
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, List, Optional, Sequence
+
+from app.core.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# (user_id, thread_id, query_text, query_response, query_hash, results, duration_ms,
+#  model, cached)
+QueryLogRow = tuple
+RowWriter = Callable[[Sequence[QueryLogRow]], Awaitable[None]]
+
+
+@dataclass
+class QueryLogStats:
+    """Counters for the query log sink."""
+
+    enqueued: int = 0
+    written: int = 0
+    dropped: int = 0
+    failed: int = 0
+    batches: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+async def insert_query_logs(rows: Sequence[QueryLogRow]) -> None:
+    """
+    Insert query log rows with a single multi-row INSERT.
+
+    Args:
+        rows: QueryLogRow tuples
+    """
+    from app.core.async_database import execute_statement
+
+    columns = list(zip(*rows))
+    await execute_statement(
+        """
+        INSERT INTO query_logs
+            (user_id, thread_id, query_text, query_response, query_hash,
+             results, duration_ms, model, cached)
+        SELECT * FROM unnest(
+            $1::uuid[], $2::uuid[], $3::text[], $4::text[], $5::varchar[],
+            $6::jsonb[], $7::float8[], $8::varchar[], $9::bool[]
+        )
+        """,
+        *[list(values) for values in columns],
+    )
+
+
+class QueryLogSink:
+    """Bounded queue of query log rows, flushed in batches by a background task."""
+
+    def __init__(
+        self,
+        writer: Optional[RowWriter] = None,
+        max_queue: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        drop_policy: Optional[str] = None,
+    ):
+        self.writer = writer or insert_query_logs
+        self.batch_size = batch_size or settings.QUERY_LOG_BATCH_SIZE
+        self.flush_interval = (
+            settings.QUERY_LOG_FLUSH_INTERVAL
+            if flush_interval is None
+            else flush_interval
+        )
+        self.drop_policy = drop_policy or settings.QUERY_LOG_DROP_POLICY
+        if self.drop_policy not in ("drop_newest", "drop_oldest"):
+            raise ValueError(f"Unknown query log drop policy: {self.drop_policy}")
+
+        self.stats = QueryLogStats()
+        self._queue: asyncio.Queue = asyncio.Queue(
+            maxsize=max_queue or settings.QUERY_LOG_QUEUE_SIZE
+        )
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._closing = False
+        # Rows taken off the queue but not yet written
+        self._pending: List[QueryLogRow] = []
+
+    def __len__(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        """Start the flusher task on the running event loop."""
+        if self._task is None or self._task.done():
+            self._closing = False
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def put(self, row: QueryLogRow) -> bool:
+        """
+        Enqueue a row without waiting.
+
+        Returns:
+            bool: False if the row (or, with drop_oldest, an older one) was dropped
+        """
+        self.start()
+        self.stats.enqueued += 1
+        try:
+            self._queue.put_nowait(row)
+            accepted = True
+        except asyncio.QueueFull:
+            self.stats.dropped += 1
+            if self.drop_policy == "drop_oldest":
+                self._queue.get_nowait()
+                self._queue.put_nowait(row)
+            accepted = False
+
+        # Flush early once a full batch is waiting
+        if self._queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+        return accepted
+
+    async def _write_pending(self) -> None:
+        batch = self._pending
+        try:
+            await self.writer(batch)
+            self.stats.written += len(batch)
+            self.stats.batches += 1
+        except Exception as e:
+            self.stats.failed += len(batch)
+            logger.warning(f"Failed to write {len(batch)} query logs: {e}")
+        self._pending = []
+
+    async def flush(self) -> None:
+        """Write every queued row now, in batches of at most batch_size."""
+        while not self._queue.empty():
+            while not self._queue.empty() and len(self._pending) < self.batch_size:
+                self._pending.append(self._queue.get_nowait())
+            await self._write_pending()
+
+    async def _run(self) -> None:
+        # Rows wait at most flush_interval, or less once a full batch is queued
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+        await self.flush()
+
+    async def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the flusher after it writes out what is still queued.
+
+        Args:
+            timeout: Seconds to spend flushing, defaults to
+                settings.QUERY_LOG_SHUTDOWN_TIMEOUT
+        """
+        if self._task is None:
+            return
+
+        self._closing = True
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(
+                self._task, timeout or settings.QUERY_LOG_SHUTDOWN_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            lost = len(self._pending) + len(self)
+            self.stats.dropped += lost
+            logger.warning(f"Dropped {lost} query logs on shutdown")
+        self._task = None
+
+
+# Global query log sink
+_query_log_sink: Optional[QueryLogSink] = None
+
+
+def init_query_log_sink() -> QueryLogSink:
+    """Create the shared sink and start its flusher on the running loop."""
+    global _query_log_sink
+
+    _query_log_sink = QueryLogSink()
+    _query_log_sink.start()
+    logger.info("Query log sink started")
+    return _query_log_sink
+
+
+def get_query_log_sink() -> QueryLogSink:
+    """
+    Get the shared query log sink, creating it on first use.
+
+    Returns:
+        QueryLogSink: The shared sink
+    """
+    global _query_log_sink
+
+    if _query_log_sink is None:
+        _query_log_sink = QueryLogSink()
+    return _query_log_sink
+
+
+async def close_query_log_sink() -> None:
+    """Flush queued query logs and stop the sink."""
+    global _query_log_sink
+
+    if _query_log_sink is not None:
+        await _query_log_sink.close()
+        _query_log_sink = None
+        logger.info("Query log sink closed")
+
+
+def record_query_log(
+    user_id: str,
+    thread_id: str,
+    query_text: str,
+    query_response: str,
+    query_hash: Optional[str] = None,
+    results: Optional[List[dict[str, Any]]] = None,
+    duration_ms: Optional[float] = None,
+    model: Optional[str] = None,
+    cached: bool = False,
+) -> None:
+    """
+    Queue a row for query_logs.
+
+    Returns immediately; the row is written by the sink's next batch. Must be
+    called from the event loop thread.
+
+    Args:
+        user_id: User who asked the question
+        thread_id: Thread the question was asked in
+        query_text: The question
+        query_response: The generated answer
+        query_hash: Normalized query hash used for cache lookups
+        results: Retrieved sources, as [{source_type, source_id, score}]
+        duration_ms: End-to-end handling time
+        model: Model that produced the answer
+        cached: Whether the answer was served from the response cache
+    """
+    if not settings.QUERY_LOG_ENABLED:
+        return
+
+    get_query_log_sink().put(
+        (
+            user_id,
+            thread_id,
+            query_text,
+            query_response,
+            query_hash,
+            results,
+            duration_ms,
+            model,
+            cached,
+        )
+    )
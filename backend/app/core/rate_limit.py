@@ -0,0 +1,348 @@
+"""
+Token-bucket rate limiting for LLM endpoints.
+
+Each user and each thread (course) gets two buckets: one for requests and one
+for LLM tokens. A request must find a request token and a non-empty token
+bucket in every bucket that applies to it. Once the answer is known, its
+token usage is debited from the token buckets, which may go negative, so a
+caller who has just spent a large completion waits until the bucket refills.
+
+Buckets hold up to one minute of allowance (the burst) and refill
+continuously. State lives in-process by default; set
+RATE_LIMIT_STORE="postgres" to share buckets across workers and hosts.
+"""
+
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Protocol, Sequence, Tuple
+
+from app.core.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a caller is over one of its limits."""
+
+    def __init__(self, scope: str, retry_after: float):
+        self.scope = scope
+        self.retry_after = retry_after
+        super().__init__(
+            f"Rate limit exceeded for {scope}, retry in {retry_after:.1f}s"
+        )
+
+
+@dataclass
+class Limit:
+    """A bucket holding `per_minute` units that refills over a minute."""
+
+    key: str
+    per_minute: float
+
+    @property
+    def rate(self) -> float:
+        return self.per_minute / 60.0
+
+
+class RateLimitStore(Protocol):
+    """Atomic bucket operations."""
+
+    async def consume(
+        self, key: str, amount: float, capacity: float, rate: float
+    ) -> Tuple[bool, float]:
+        """Take `amount` if available; return (granted, tokens left after)."""
+        ...
+
+    async def debit(
+        self, key: str, amount: float, capacity: float, rate: float
+    ) -> None:
+        """
+        Take `amount` unconditionally, allowing a negative balance.
+
+        A negative amount gives units back, up to the bucket's capacity.
+        """
+        ...
+
+
+class InMemoryRateLimitStore:
+    """Buckets held in this process, safe across threads."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _refilled(self, key: str, capacity: float, rate: float, now: float) -> float:
+        tokens, updated = self._buckets.get(key, (capacity, now))
+        return min(capacity, tokens + (now - updated) * rate)
+
+    def _prune(self, now: float) -> None:
+        # Drop the least recently touched half; idle buckets have refilled
+        # anyway, so forgetting them only resets them to full
+        if len(self._buckets) < self.max_keys:
+            return
+        oldest = sorted(self._buckets, key=lambda key: self._buckets[key][1])
+        for key in oldest[: len(oldest) // 2]:
+            del self._buckets[key]
+
+    async def consume(
+        self, key: str, amount: float, capacity: float, rate: float
+    ) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens = self._refilled(key, capacity, rate, now)
+            granted = tokens >= amount
+            if granted:
+                tokens -= amount
+            self._prune(now)
+            self._buckets[key] = (tokens, now)
+        return granted, tokens
+
+    async def debit(
+        self, key: str, amount: float, capacity: float, rate: float
+    ) -> None:
+        now = time.monotonic()
+        with self._lock:
+            tokens = self._refilled(key, capacity, rate, now)
+            self._buckets[key] = (min(capacity, tokens - amount), now)
+
+
+class PostgresRateLimitStore:
+    """Buckets in the rate_limit_buckets table, shared by every worker."""
+
+    async def consume(
+        self, key: str, amount: float, capacity: float, rate: float
+    ) -> Tuple[bool, float]:
+        from app.core.async_database import execute_query
+
+        row = await execute_query(
+            """
+            INSERT INTO rate_limit_buckets AS b (key, tokens, granted, updated_at)
+            VALUES ($1, $2::float8 - $4::float8, $2 >= $4, clock_timestamp())
+            ON CONFLICT (key) DO UPDATE SET
+                granted = LEAST($2, b.tokens + $3::float8 * EXTRACT(EPOCH FROM
+                          clock_timestamp() - b.updated_at)) >= $4,
+                tokens = LEAST($2, b.tokens + $3 * EXTRACT(EPOCH FROM
+                         clock_timestamp() - b.updated_at))
+                         - CASE WHEN LEAST($2, b.tokens + $3 * EXTRACT(EPOCH FROM
+                                clock_timestamp() - b.updated_at)) >= $4
+                                THEN $4 ELSE 0 END,
+                updated_at = clock_timestamp()
+            RETURNING granted, tokens
+            """,
+            key,
+            float(capacity),
+            float(rate),
+            float(amount),
+            fetch_one=True,
+        )
+        return row["granted"], row["tokens"]
+
+    async def debit(
+        self, key: str, amount: float, capacity: float, rate: float
+    ) -> None:
+        from app.core.async_database import execute_statement
+
+        await execute_statement(
+            """
+            INSERT INTO rate_limit_buckets AS b (key, tokens, granted, updated_at)
+            VALUES ($1, LEAST($2, $2::float8 - $4::float8), TRUE, clock_timestamp())
+            ON CONFLICT (key) DO UPDATE SET
+                tokens = LEAST($2, LEAST($2, b.tokens + $3::float8 * EXTRACT(EPOCH
+                         FROM clock_timestamp() - b.updated_at)) - $4),
+                updated_at = clock_timestamp()
+            """,
+            key,
+            float(capacity),
+            float(rate),
+            float(amount),
+        )
+
+
+class RateLimiter:
+    """Per-user and per-thread request and LLM token limits."""
+
+    def __init__(self, store: Optional[RateLimitStore] = None):
+        if store is None:
+            if settings.RATE_LIMIT_STORE == "postgres":
+                store = PostgresRateLimitStore()
+            elif settings.RATE_LIMIT_STORE == "memory":
+                store = InMemoryRateLimitStore()
+            else:
+                raise ValueError(
+                    f"Unknown rate limit store: {settings.RATE_LIMIT_STORE}"
+                )
+        self.store = store
+
+    def _limits(
+        self, caller: str, thread_id: Optional[str]
+    ) -> Tuple[List[Limit], List[Limit]]:
+        requests = [
+            Limit(f"user:{caller}:requests", settings.RATE_LIMIT_USER_REQUESTS_PER_MIN)
+        ]
+        tokens = [
+            Limit(f"user:{caller}:tokens", settings.RATE_LIMIT_USER_TOKENS_PER_MIN)
+        ]
+        if thread_id:
+            requests.append(
+                Limit(
+                    f"thread:{thread_id}:requests",
+                    settings.RATE_LIMIT_THREAD_REQUESTS_PER_MIN,
+                )
+            )
+            tokens.append(
+                Limit(
+                    f"thread:{thread_id}:tokens",
+                    settings.RATE_LIMIT_THREAD_TOKENS_PER_MIN,
+                )
+            )
+        return requests, tokens
+
+    async def acquire(self, caller: str, thread_id: Optional[str] = None) -> None:
+        """
+        Admit one request, or raise if any bucket is exhausted.
+
+        Admission is all or nothing: request units taken from earlier buckets
+        are given back when a later bucket rejects the request. If the store
+        fails (e.g. the database is down), the request is admitted.
+
+        Args:
+            caller: Authenticated principal or client address (see the LLM
+                endpoints' _caller_key)
+            thread_id: Thread the request is for, if any
+
+        Raises:
+            RateLimitExceeded: With the scope and seconds until a retry can succeed
+        """
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+
+        requests, tokens = self._limits(caller, thread_id)
+        # Token buckets are checked for a positive balance, not consumed; the
+        # actual usage is debited by record_tokens once it is known
+        await self._take(
+            [(limit, 0) for limit in tokens] + [(limit, 1) for limit in requests]
+        )
+
+    async def acquire_many(
+        self, caller: str, requests: Sequence[Tuple[Optional[str], int]]
+    ) -> None:
+        """
+        Admit several requests at once (e.g. a batch), all or none.
+
+        Each request takes a request unit from the caller's bucket and its
+        thread's, and reserves its estimated LLM tokens from the token
+        buckets. Settle each reservation with record_tokens(actual - reserved)
+        once the answer is known, or give it back with record_tokens(-reserved)
+        if the request never runs.
+
+        Args:
+            caller: Authenticated principal or client address
+            requests: (thread_id, estimated tokens) per request
+
+        Raises:
+            RateLimitExceeded: If any bucket cannot cover the whole batch
+        """
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+
+        # Requests sharing a bucket are charged to it together
+        charges: Dict[str, Tuple[Limit, float]] = {}
+
+        def charge(limit: Limit, amount: float) -> None:
+            _, total = charges.get(limit.key, (limit, 0))
+            charges[limit.key] = (limit, total + amount)
+
+        for thread_id, estimated_tokens in requests:
+            request_limits, token_limits = self._limits(caller, thread_id)
+            for limit in token_limits:
+                charge(limit, estimated_tokens)
+            for limit in request_limits:
+                charge(limit, 1)
+        await self._take(list(charges.values()))
+
+    async def _take(self, charges: List[Tuple[Limit, float]]) -> None:
+        """
+        Take `amount` units from each limit's bucket, or none of them.
+
+        An amount of 0 only requires the bucket to hold at least one unit.
+
+        Raises:
+            RateLimitExceeded: For the first bucket that cannot cover its amount
+        """
+        taken: List[Tuple[Limit, float]] = []
+        try:
+            for limit, amount in charges:
+                granted, left = await self.store.consume(
+                    limit.key, amount, limit.per_minute, limit.rate
+                )
+                exhausted = left < 1 if amount == 0 else not granted
+                if exhausted:
+                    raise RateLimitExceeded(
+                        limit.key, (max(amount, 1) - left) / limit.rate
+                    )
+                if amount:
+                    taken.append((limit, amount))
+        except RateLimitExceeded:
+            await self._refund(taken)
+            raise
+        except Exception as e:
+            logger.warning(f"Rate limit store failed, admitting the request: {e}")
+
+    async def _refund(self, charges: List[Tuple[Limit, float]]) -> None:
+        """Give back units taken by a request that was not admitted."""
+        for limit, amount in charges:
+            try:
+                await self.store.debit(limit.key, -amount, limit.per_minute, limit.rate)
+            except Exception as e:
+                logger.warning(f"Failed to refund {limit.key}: {e}")
+
+    async def record_tokens(
+        self, caller: str, thread_id: Optional[str], token_count: int
+    ) -> None:
+        """
+        Debit LLM tokens used by a completed request.
+
+        A negative count gives back tokens reserved by acquire_many.
+        """
+        if not settings.RATE_LIMIT_ENABLED or token_count == 0:
+            return
+
+        _, tokens = self._limits(caller, thread_id)
+        for limit in tokens:
+            try:
+                await self.store.debit(
+                    limit.key, token_count, limit.per_minute, limit.rate
+                )
+            except Exception as e:
+                logger.warning(f"Failed to record token usage for {limit.key}: {e}")
+
+
+def retry_after_header(seconds: float) -> Dict[str, str]:
+    """Retry-After header value, rounded up to whole seconds."""
+    return {"Retry-After": str(max(1, math.ceil(seconds)))}
+
+
+# Global rate limiter
+_rate_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Get the shared rate limiter, creating it on first use.
+
+    Returns:
+        RateLimiter: The shared limiter
+    """
+    global _rate_limiter
+
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter()
+    return _rate_limiter
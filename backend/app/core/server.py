@@ -0,0 +1,221 @@
+"""
+Production server: a pre-forking supervisor around uvicorn.
+
+The parent process imports the app, plus the dependencies the app defers
+(LangChain, the provider SDK, database drivers), once, binds the listening
+socket, then forks
+settings.SERVER_WORKERS workers that share it. Forked workers start with the
+imports already done and share their memory pages copy-on-write, so startup
+is fast and memory use grows slowly with the worker count.
+
+Nothing stateful is created before the fork: database pools and LLM clients
+are opened by each worker's lifespan, so no connection is shared between
+processes. Per-worker limits (DB_POOL_MAX_SIZE, DB_ASYNC_POOL_MAX_SIZE,
+LLM_MAX_CONCURRENCY) multiply by the worker count.
+
+On SIGTERM or SIGINT, workers stop accepting connections, finish in-flight
+requests for up to settings.SERVER_GRACEFUL_TIMEOUT seconds, and run their
+lifespan shutdown (flushing query logs, closing pools). Workers that have not
+exited after that, plus SERVER_SHUTDOWN_GRACE for the lifespan shutdown, are
+killed. A worker that dies is replaced; if one fails during startup, the
+server exits instead of restarting it in a loop.
+
+Usage:
+    ENVIRONMENT=production python main.py
+"""
+
+import gc
+import importlib
+import logging
+import os
+import signal
+import sys
+import time
+from typing import Dict, Optional, Union
+
+import uvicorn
+
+from app.core.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Exit status of a worker whose lifespan startup failed (matches uvicorn)
+STARTUP_FAILURE = 3
+
+# Seconds allowed after the graceful timeout for lifespan shutdown
+SERVER_SHUTDOWN_GRACE = 15.0
+
+# The app defers these imports to first use or its lifespan hook, to keep
+# `import main` fast; the pre-fork parent imports them once so every worker
+# inherits them instead of importing them again at startup
+PRELOAD_MODULES = (
+    "app.core.async_database",
+    "app.core.database",
+    "app.retrieval.hybrid",
+    "app.textGeneration.embeddings",
+    "langchain_core.messages",
+)
+
+
+def preload() -> None:
+    """Import the app's deferred dependencies, including the LLM provider SDK."""
+    provider = (
+        "langchain_groq"
+        if settings.LLM_PROVIDER == "groq"
+        else "app.textGeneration.fake"
+    )
+    for module in (*PRELOAD_MODULES, provider):
+        importlib.import_module(module)
+
+
+def worker_count() -> int:
+    """settings.SERVER_WORKERS, or one per CPU available to this process."""
+    if settings.SERVER_WORKERS > 0:
+        return settings.SERVER_WORKERS
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _optional(module: str, choice: str) -> str:
+    """Use an optional accelerator if it is installed, else let uvicorn pick."""
+    try:
+        __import__(module)
+    except ImportError:
+        logger.warning(f"{module} is not installed, using the default {choice}")
+        return "auto"
+    return module
+
+
+def build_config(app: Union[str, object]) -> uvicorn.Config:
+    """uvicorn settings shared by every worker."""
+    return uvicorn.Config(
+        app,
+        host=settings.HOST,
+        port=settings.PORT,
+        loop=_optional("uvloop", "event loop"),
+        http=_optional("httptools", "HTTP parser"),
+        lifespan="on",
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEPALIVE_TIMEOUT,
+        timeout_graceful_shutdown=int(settings.SERVER_GRACEFUL_TIMEOUT),
+        access_log=settings.SERVER_ACCESS_LOG,
+        proxy_headers=True,
+    )
+
+
+def _run_worker(config: uvicorn.Config, sock) -> None:
+    """Serve in a forked worker; never returns."""
+    status = 0
+    try:
+        # Fresh signal handlers: uvicorn installs its own graceful ones
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, signal.SIG_DFL)
+        server = uvicorn.Server(config)
+        server.run(sockets=[sock])
+        if not server.started:
+            status = STARTUP_FAILURE
+    except BaseException:
+        logger.exception(f"Worker {os.getpid()} crashed")
+        status = 1
+    finally:
+        logging.shutdown()
+        os._exit(status)
+
+
+def serve(app: Union[str, object] = "main:app", workers: Optional[int] = None) -> None:
+    """
+    Run the app in pre-forked uvicorn workers until SIGTERM or SIGINT.
+
+    Args:
+        app: ASGI app, or its "module:attribute" import string
+        workers: Worker processes, defaults to worker_count()
+    """
+    workers = workers or worker_count()
+    config = build_config(app)
+    # Preload: import the app and its deferred dependencies before forking
+    config.load()
+    preload()
+    sock = config.bind_socket()
+
+    # Objects created so far live for the whole process; moving them out of
+    # the collector's view stops gc from touching (and un-sharing) their pages
+    gc.collect()
+    gc.freeze()
+
+    children: Dict[int, float] = {}
+    stopping = False
+
+    def spawn() -> None:
+        pid = os.fork()
+        if pid == 0:
+            _run_worker(config, sock)
+        children[pid] = time.monotonic()
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    logger.info(
+        f"Serving on {settings.HOST}:{settings.PORT} with {workers} workers "
+        f"(loop={config.loop}, http={config.http})"
+    )
+    for _ in range(workers):
+        spawn()
+
+    exit_status = 0
+    while not stopping:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            pid = 0
+        if pid == 0:
+            time.sleep(0.5)
+            continue
+
+        children.pop(pid, None)
+        code = os.waitstatus_to_exitcode(status)
+        if code == STARTUP_FAILURE:
+            logger.error(f"Worker {pid} failed to start, shutting down")
+            exit_status = STARTUP_FAILURE
+            break
+        logger.warning(f"Worker {pid} exited with {code}, starting a replacement")
+        spawn()
+
+    _drain(children)
+    sock.close()
+    sys.exit(exit_status)
+
+
+def _drain(children: Dict[int, float]) -> None:
+    """SIGTERM every worker, wait for them to finish, then kill stragglers."""
+    logger.info(f"Draining {len(children)} workers")
+    for pid in children:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    deadline = time.monotonic() + settings.SERVER_GRACEFUL_TIMEOUT
+    deadline += SERVER_SHUTDOWN_GRACE
+    while children and time.monotonic() < deadline:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid == 0:
+            time.sleep(0.1)
+        else:
+            children.pop(pid, None)
+
+    for pid in children:
+        logger.warning(f"Worker {pid} did not stop in time, killing it")
+        try:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        except (ProcessLookupError, ChildProcessError):
+            pass
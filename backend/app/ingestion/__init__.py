@@ -0,0 +1,35 @@
+"""
+Ingestion package for the Piazza AI backend.
+
+This package turns course content into searchable chunks and embeddings.
+"""
+
+from app.ingestion.chunking import TextChunk, chunk_text, count_tokens
+from app.ingestion.incremental import (
+    IncrementalIndexer,
+    PostgresChangeSource,
+    enqueue_reindex,
+)
+from app.ingestion.pipeline import (
+    IngestionStats,
+    InMemoryChunkWriter,
+    InMemoryPostSource,
+    PostgresChunkWriter,
+    PostgresPostSource,
+    PostIngestionPipeline,
+)
+
+__all__ = [
+    "IncrementalIndexer",
+    "InMemoryChunkWriter",
+    "InMemoryPostSource",
+    "IngestionStats",
+    "PostIngestionPipeline",
+    "PostgresChangeSource",
+    "PostgresChunkWriter",
+    "PostgresPostSource",
+    "TextChunk",
+    "chunk_text",
+    "count_tokens",
+    "enqueue_reindex",
+]
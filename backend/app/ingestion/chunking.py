@@ -0,0 +1,61 @@
+"""
+Token-based text chunking.
+
+Tokens are approximated by words and punctuation marks, which tracks LLM
+tokenizer counts closely enough for budgeting without loading a tokenizer.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Iterator
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+@dataclass
+class TextChunk:
+    """A contiguous slice of a source text."""
+
+    index: int
+    text: str
+    token_count: int
+
+
+def count_tokens(text: str) -> int:
+    """Approximate the number of LLM tokens in a text."""
+    return sum(1 for _ in _TOKEN_PATTERN.finditer(text))
+
+
+def chunk_text(
+    text: str, max_tokens: int = 256, overlap_tokens: int = 32
+) -> Iterator[TextChunk]:
+    """
+    Split text into overlapping chunks of at most max_tokens tokens.
+
+    Chunks are slices of the original text, so whitespace and formatting
+    inside a chunk are preserved.
+
+    Args:
+        text: Text to split
+        max_tokens: Maximum tokens per chunk
+        overlap_tokens: Tokens repeated at the start of the next chunk
+
+    Yields:
+        TextChunk objects in order
+    """
+    if overlap_tokens >= max_tokens:
+        raise ValueError("overlap_tokens must be smaller than max_tokens")
+
+    spans = [match.span() for match in _TOKEN_PATTERN.finditer(text)]
+    step = max_tokens - overlap_tokens
+    index = 0
+    for start in range(0, len(spans), step):
+        window = spans[start : start + max_tokens]
+        yield TextChunk(
+            index=index,
+            text=text[window[0][0] : window[-1][1]],
+            token_count=len(window),
+        )
+        index += 1
+        if start + max_tokens >= len(spans):
+            break
@@ -0,0 +1,341 @@
+"""
+Incremental re-indexing driven by updated_at.
+
+Instead of rebuilding a thread's index, each run only looks at rows whose
+`updated_at` moved past a stored watermark:
+
+- posts: re-chunked and re-embedded, unless the body hashes to the same value
+  as the indexed chunks (a no-op edit, e.g. a metadata-only update)
+- document_chunks: re-embedded, unless the text hashes to the same value as
+  the stored embedding
+
+Watermarks are (updated_at, id) pairs saved in ingestion_checkpoints with each
+batch, so the cost of a run is proportional to the rows changed since the last
+one. Rows updated within INDEX_WATERMARK_LAG_SECONDS are left for the next run
+so that transactions still in flight cannot commit behind the watermark.
+
+Runs are normally not made in-process: enqueue_reindex hands each thread to
+the job workers as an `index_thread` job (see app.jobs).
+"""
+
+import logging
+import time
+from datetime import datetime
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+)
+
+import numpy as np
+
+from app.core.config import settings
+from app.ingestion.pipeline import (
+    ChunkWriter,
+    DocumentChunkRow,
+    IngestionStats,
+    PostgresChunkWriter,
+    batched,
+    content_hash,
+)
+
+if TYPE_CHECKING:
+    from langchain_core.embeddings import Embeddings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+POSTS_PIPELINE = "incremental_posts"
+DOCUMENT_CHUNKS_PIPELINE = "incremental_document_chunks"
+
+Watermark = Tuple[datetime, str]
+
+
+def encode_watermark(row: dict) -> str:
+    """Serialize a row's (updated_at, id) position for ingestion_checkpoints."""
+    return f"{row['updated_at'].isoformat()}|{row['id']}"
+
+
+def decode_watermark(value: Optional[str]) -> Optional[Watermark]:
+    """Parse a stored watermark, or None if there is none yet."""
+    if not value:
+        return None
+    timestamp, row_id = value.split("|", 1)
+    return datetime.fromisoformat(timestamp), row_id
+
+
+class ChangeSource(Protocol):
+    """Yields rows changed after a watermark, ordered by (updated_at, id)."""
+
+    def indexable_threads(self) -> List[str]: ...
+
+    def iter_changed_posts(
+        self, thread_id: str, watermark: Optional[Watermark], page_size: int
+    ) -> Iterator[dict]: ...
+
+    def iter_changed_document_chunks(
+        self, thread_id: str, watermark: Optional[Watermark], page_size: int
+    ) -> Iterator[dict]: ...
+
+
+class PostgresChangeSource:
+    """Reads rows changed since a watermark with keyset pagination."""
+
+    def __init__(self, lag_seconds: Optional[float] = None):
+        self.lag_seconds = (
+            settings.INDEX_WATERMARK_LAG_SECONDS if lag_seconds is None else lag_seconds
+        )
+
+    def indexable_threads(self) -> List[str]:
+        from app.core.database import execute_query
+
+        rows = execute_query("SELECT id FROM threads WHERE is_indexable ORDER BY id")
+        return [str(row["id"]) for row in rows]
+
+    def _iter_changed(
+        self, query: str, thread_id: str, watermark: Optional[Watermark], size: int
+    ) -> Iterator[dict]:
+        from app.core.database import execute_query
+
+        while True:
+            since, after_id = watermark or (None, None)
+            rows = execute_query(
+                query,
+                {
+                    "thread_id": str(thread_id),
+                    "since": since,
+                    "after_id": after_id,
+                    "lag": self.lag_seconds,
+                    "limit": size,
+                },
+            )
+            yield from rows
+            if len(rows) < size:
+                return
+            watermark = (rows[-1]["updated_at"], str(rows[-1]["id"]))
+
+    def iter_changed_posts(
+        self, thread_id: str, watermark: Optional[Watermark], page_size: int
+    ) -> Iterator[dict]:
+        return self._iter_changed(
+            """
+            SELECT id, thread_id, body_text, updated_at FROM posts
+            WHERE thread_id = %(thread_id)s
+              AND (%(since)s::timestamptz IS NULL
+                   OR (updated_at, id) > (%(since)s, %(after_id)s::uuid))
+              AND updated_at <= NOW() - make_interval(secs => %(lag)s)
+            ORDER BY updated_at, id
+            LIMIT %(limit)s
+            """,
+            thread_id,
+            watermark,
+            page_size,
+        )
+
+    def iter_changed_document_chunks(
+        self, thread_id: str, watermark: Optional[Watermark], page_size: int
+    ) -> Iterator[dict]:
+        return self._iter_changed(
+            """
+            SELECT id, document_id, thread_id, text_chunk, updated_at
+            FROM document_chunks
+            WHERE thread_id = %(thread_id)s
+              AND (%(since)s::timestamptz IS NULL
+                   OR (updated_at, id) > (%(since)s, %(after_id)s::uuid))
+              AND updated_at <= NOW() - make_interval(secs => %(lag)s)
+            ORDER BY updated_at, id
+            LIMIT %(limit)s
+            """,
+            thread_id,
+            watermark,
+            page_size,
+        )
+
+
+class IncrementalIndexer:
+    """Keeps post and document chunk embeddings in sync with their sources."""
+
+    def __init__(
+        self,
+        source: Optional[ChangeSource] = None,
+        writer: Optional[ChunkWriter] = None,
+        embeddings: Optional["Embeddings"] = None,
+        batch_size: Optional[int] = None,
+    ):
+        if embeddings is None:
+            from app.textGeneration.embeddings import get_embeddings
+
+            embeddings = get_embeddings()
+
+        self.source = source or PostgresChangeSource()
+        self.writer = writer or PostgresChunkWriter()
+        self.embeddings = embeddings
+        self.batch_size = batch_size or settings.INGEST_BATCH_SIZE
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        vectors = self.embeddings.embed_documents(texts) if texts else []
+        return np.asarray(vectors, dtype=np.float32)
+
+    def _pages(self, rows: Iterator[dict]) -> Iterator[List[dict]]:
+        page: List[dict] = []
+        for row in rows:
+            page.append(row)
+            if len(page) >= self.batch_size:
+                yield page
+                page = []
+        if page:
+            yield page
+
+    def reindex_posts(self, thread_id: str) -> IngestionStats:
+        """
+        Re-chunk and re-embed posts of a thread changed since the last run.
+
+        Args:
+            thread_id: Thread to refresh
+
+        Returns:
+            IngestionStats, where `skipped` counts no-op edits
+        """
+        scope = str(thread_id)
+        watermark = decode_watermark(self.writer.load_checkpoint(POSTS_PIPELINE, scope))
+        stats = IngestionStats()
+        start = time.perf_counter()
+
+        changed = self.source.iter_changed_posts(scope, watermark, self.batch_size)
+        for page in self._pages(changed):
+            indexed = self.writer.indexed_hashes([str(post["id"]) for post in page])
+            batches = batched(
+                page,
+                self.batch_size,
+                settings.CHUNK_MAX_TOKENS,
+                settings.CHUNK_OVERLAP_TOKENS,
+                checkpoint_key=encode_watermark,
+                is_unchanged=lambda post: (
+                    indexed.get(str(post["id"])) == content_hash(post.get("body_text"))
+                ),
+            )
+            for batch in batches:
+                batch.vectors = self._embed([row.text_chunk for row in batch.rows])
+                self.writer.write(POSTS_PIPELINE, scope, batch)
+                stats.posts += len(batch.post_ids)
+                stats.skipped += batch.seen - len(batch.post_ids)
+                stats.chunks += len(batch.rows)
+                stats.batches += 1
+
+        stats.seconds = time.perf_counter() - start
+        return stats
+
+    def reindex_document_chunks(self, thread_id: str) -> IngestionStats:
+        """
+        Re-embed document chunks of a thread changed since the last run.
+
+        Args:
+            thread_id: Thread to refresh
+
+        Returns:
+            IngestionStats, where `posts` counts re-embedded chunks
+        """
+        scope = str(thread_id)
+        watermark = decode_watermark(
+            self.writer.load_checkpoint(DOCUMENT_CHUNKS_PIPELINE, scope)
+        )
+        stats = IngestionStats()
+        start = time.perf_counter()
+
+        changed = self.source.iter_changed_document_chunks(
+            scope, watermark, self.batch_size
+        )
+        for page in self._pages(changed):
+            indexed = self.writer.indexed_document_hashes(
+                [str(chunk["id"]) for chunk in page]
+            )
+            rows = []
+            for chunk in page:
+                digest = content_hash(chunk["text_chunk"])
+                if indexed.get(str(chunk["id"])) == digest:
+                    stats.skipped += 1
+                    continue
+                rows.append(
+                    DocumentChunkRow(
+                        id=str(chunk["id"]),
+                        document_id=str(chunk["document_id"]),
+                        thread_id=str(chunk["thread_id"]),
+                        text_chunk=chunk["text_chunk"],
+                        metadata={"content_hash": digest},
+                    )
+                )
+            vectors = self._embed([row.text_chunk for row in rows])
+            self.writer.write_document_embeddings(
+                DOCUMENT_CHUNKS_PIPELINE,
+                scope,
+                rows,
+                vectors,
+                encode_watermark(page[-1]),
+            )
+            stats.posts += len(rows)
+            stats.chunks += len(rows)
+            stats.batches += 1
+
+        stats.seconds = time.perf_counter() - start
+        return stats
+
+    def run(self, thread_ids: Optional[Sequence[str]] = None) -> Dict[str, dict]:
+        """
+        Refresh every indexable thread (or the given ones).
+
+        Args:
+            thread_ids: Threads to refresh, defaults to threads.is_indexable
+
+        Returns:
+            Per-thread stats for posts and document chunks
+        """
+        results = {}
+        for thread_id in thread_ids or self.source.indexable_threads():
+            posts = self.reindex_posts(thread_id)
+            documents = self.reindex_document_chunks(thread_id)
+            results[str(thread_id)] = {"posts": posts, "document_chunks": documents}
+            logger.info(
+                f"Thread {thread_id}: re-indexed {posts.posts} posts "
+                f"({posts.skipped} unchanged), {documents.chunks} document chunks "
+                f"({documents.skipped} unchanged)"
+            )
+        return results
+
+
+def enqueue_reindex(
+    thread_ids: Optional[Sequence[str]] = None, source: Optional[ChangeSource] = None
+) -> int:
+    """
+    Queue an `index_thread` job per thread for the job workers.
+
+    A thread whose job is still queued is not queued again, so this can run
+    on a schedule however long the workers take.
+
+    Args:
+        thread_ids: Threads to refresh, defaults to threads.is_indexable
+        source: Where to list indexable threads, defaults to Postgres
+
+    Returns:
+        Number of jobs queued
+    """
+    from app.jobs import enqueue
+
+    if thread_ids is None:
+        thread_ids = (source or PostgresChangeSource()).indexable_threads()
+
+    queued = 0
+    for thread_id in thread_ids:
+        job_id = enqueue(
+            "index_thread",
+            {"thread_id": str(thread_id)},
+            dedupe_key=f"index_thread:{thread_id}",
+        )
+        if job_id is not None:
+            queued += 1
+    logger.info(f"Queued {queued} of {len(thread_ids)} threads for re-indexing")
+    return queued
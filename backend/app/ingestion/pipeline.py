@@ -0,0 +1,538 @@
+"""
+Batched ingestion of posts into post_chunks and embeddings.
+
+The pipeline is a chain of generators, so only one batch is held in memory:
+
+    posts (keyset pages) -> chunks -> batches -> embeddings -> bulk write
+
+Each batch is written in a single transaction together with the checkpoint
+of the last post it contains, so an interrupted run resumes after the last
+committed batch without duplicating or skipping chunks.
+"""
+
+import hashlib
+import json
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Protocol,
+    Sequence,
+)
+
+import numpy as np
+
+from app.core.config import settings
+from app.ingestion.chunking import chunk_text
+
+if TYPE_CHECKING:
+    from langchain_core.embeddings import Embeddings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+PIPELINE_NAME = "post_chunks"
+
+
+def content_hash(text: Optional[str]) -> str:
+    """Hash of the indexed text, stored with chunks to detect no-op edits."""
+    return hashlib.sha256((text or "").strip().encode()).hexdigest()
+
+
+@dataclass
+class PostChunkRow:
+    """A post_chunks row ready to insert."""
+
+    id: str
+    post_id: str
+    thread_id: str
+    chunk_index: int
+    text_chunk: str
+    token_count: int
+    metadata: dict = field(default_factory=dict)
+
+
+@dataclass
+class DocumentChunkRow:
+    """A document chunk whose embedding is being refreshed."""
+
+    id: str
+    document_id: str
+    thread_id: str
+    text_chunk: str
+    metadata: dict = field(default_factory=dict)
+
+
+@dataclass
+class ChunkBatch:
+    """Chunks of whole posts, written in one transaction."""
+
+    post_ids: List[str] = field(default_factory=list)
+    rows: List[PostChunkRow] = field(default_factory=list)
+    vectors: Optional[np.ndarray] = None
+    checkpoint: Optional[str] = None
+    seen: int = 0
+
+
+@dataclass
+class IngestionStats:
+    """Counters reported at the end of a run."""
+
+    posts: int = 0
+    skipped: int = 0
+    chunks: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.seconds if self.seconds else 0.0
+
+
+class PostSource(Protocol):
+    """Yields posts of a thread in a stable order, starting after a post id."""
+
+    def iter_posts(
+        self, thread_id: str, after_id: Optional[str], page_size: int
+    ) -> Iterator[dict]: ...
+
+
+class ChunkWriter(Protocol):
+    """Persists chunk batches and the checkpoint that goes with them."""
+
+    def load_checkpoint(self, pipeline: str, scope: str) -> Optional[str]: ...
+
+    def clear_checkpoint(self, pipeline: str, scope: str) -> None: ...
+
+    def write(self, pipeline: str, scope: str, batch: ChunkBatch) -> None: ...
+
+    def indexed_hashes(self, post_ids: Sequence[str]) -> Dict[str, str]: ...
+
+    def indexed_document_hashes(self, chunk_ids: Sequence[str]) -> Dict[str, str]: ...
+
+    def write_document_embeddings(
+        self,
+        pipeline: str,
+        scope: str,
+        rows: Sequence[DocumentChunkRow],
+        vectors: np.ndarray,
+        checkpoint: str,
+    ) -> None: ...
+
+
+class PostgresPostSource:
+    """Reads posts with keyset pagination on id."""
+
+    def iter_posts(
+        self, thread_id: str, after_id: Optional[str], page_size: int
+    ) -> Iterator[dict]:
+        from app.core.database import execute_query
+
+        while True:
+            rows = execute_query(
+                """
+                SELECT id, thread_id, body_text FROM posts
+                WHERE thread_id = %s AND (%s::uuid IS NULL OR id > %s::uuid)
+                ORDER BY id
+                LIMIT %s
+                """,
+                (str(thread_id), after_id, after_id, page_size),
+            )
+            yield from rows
+            if len(rows) < page_size:
+                return
+            after_id = str(rows[-1]["id"])
+
+
+class PostgresChunkWriter:
+    """Bulk-writes chunks and embeddings with execute_values, one transaction per batch."""
+
+    def load_checkpoint(self, pipeline: str, scope: str) -> Optional[str]:
+        from app.core.database import execute_query
+
+        row = execute_query(
+            """
+            SELECT last_key FROM ingestion_checkpoints
+            WHERE pipeline = %s AND scope = %s
+            """,
+            (pipeline, scope),
+            fetch_one=True,
+        )
+        return row["last_key"] if row else None
+
+    def clear_checkpoint(self, pipeline: str, scope: str) -> None:
+        from app.core.database import execute_statement
+
+        execute_statement(
+            "DELETE FROM ingestion_checkpoints WHERE pipeline = %s AND scope = %s",
+            (pipeline, scope),
+        )
+
+    def indexed_hashes(self, post_ids: Sequence[str]) -> Dict[str, str]:
+        from app.core.database import execute_query
+
+        rows = execute_query(
+            """
+            SELECT DISTINCT ON (post_id) post_id, metadata->>'content_hash' AS hash
+            FROM post_chunks
+            WHERE post_id = ANY(%s::uuid[])
+            """,
+            (list(post_ids),),
+        )
+        return {str(row["post_id"]): row["hash"] for row in rows}
+
+    def indexed_document_hashes(self, chunk_ids: Sequence[str]) -> Dict[str, str]:
+        from app.core.database import execute_query
+
+        rows = execute_query(
+            """
+            SELECT source_id, metadata->>'content_hash' AS hash
+            FROM embeddings_doc_chunks
+            WHERE source_id = ANY(%s::uuid[])
+            """,
+            (list(chunk_ids),),
+        )
+        return {str(row["source_id"]): row["hash"] for row in rows}
+
+    def write(self, pipeline: str, scope: str, batch: ChunkBatch) -> None:
+        from psycopg2.extras import execute_values
+
+        from app.core.database import get_db
+        from app.retrieval.vector import to_pgvector
+
+        with get_db() as db:
+            cursor = db.cursor()
+            # Replace any chunks left by an earlier run over the same posts
+            cursor.execute(
+                """
+                DELETE FROM embeddings
+                WHERE source_type = 'post_chunk' AND source_id IN (
+                    SELECT id FROM post_chunks WHERE post_id = ANY(%s::uuid[])
+                )
+                """,
+                (batch.post_ids,),
+            )
+            cursor.execute(
+                "DELETE FROM post_chunks WHERE post_id = ANY(%s::uuid[])",
+                (batch.post_ids,),
+            )
+            if batch.rows:
+                execute_values(
+                    cursor,
+                    """
+                    INSERT INTO post_chunks
+                        (id, post_id, thread_id, chunk_index, text_chunk,
+                         token_count, metadata)
+                    VALUES %s
+                    """,
+                    [
+                        (
+                            r.id,
+                            r.post_id,
+                            r.thread_id,
+                            r.chunk_index,
+                            r.text_chunk,
+                            r.token_count,
+                            json.dumps(r.metadata),
+                        )
+                        for r in batch.rows
+                    ],
+                    page_size=len(batch.rows),
+                )
+                execute_values(
+                    cursor,
+                    """
+                    INSERT INTO embeddings (source_type, source_id, thread_id, embedding)
+                    VALUES %s
+                    """,
+                    [
+                        (r.id, r.thread_id, to_pgvector(vector))
+                        for r, vector in zip(batch.rows, batch.vectors)
+                    ],
+                    template="('post_chunk'::source_type_enum, %s, %s, %s::vector)",
+                    page_size=len(batch.rows),
+                )
+            self._save_checkpoint(cursor, pipeline, scope, batch.checkpoint)
+
+    def write_document_embeddings(
+        self,
+        pipeline: str,
+        scope: str,
+        rows: Sequence[DocumentChunkRow],
+        vectors: np.ndarray,
+        checkpoint: str,
+    ) -> None:
+        """Replace embeddings for document chunks and mark their documents indexed."""
+        from psycopg2.extras import execute_values
+
+        from app.core.database import get_db
+        from app.retrieval.vector import to_pgvector
+
+        with get_db() as db:
+            cursor = db.cursor()
+            if rows:
+                cursor.execute(
+                    """
+                    DELETE FROM embeddings_doc_chunks
+                    WHERE source_id = ANY(%s::uuid[])
+                    """,
+                    ([row.id for row in rows],),
+                )
+                execute_values(
+                    cursor,
+                    """
+                    INSERT INTO embeddings
+                        (source_type, source_id, thread_id, embedding, metadata)
+                    VALUES %s
+                    """,
+                    [
+                        (r.id, r.thread_id, to_pgvector(vector), json.dumps(r.metadata))
+                        for r, vector in zip(rows, vectors)
+                    ],
+                    template=(
+                        "('doc_chunk'::source_type_enum, %s, %s, %s::vector, %s::jsonb)"
+                    ),
+                    page_size=len(rows),
+                )
+                cursor.execute(
+                    """
+                    UPDATE documents SET indexed = TRUE
+                    WHERE id = ANY(%s::uuid[]) AND NOT indexed
+                    """,
+                    (list({row.document_id for row in rows}),),
+                )
+            self._save_checkpoint(cursor, pipeline, scope, checkpoint)
+
+    @staticmethod
+    def _save_checkpoint(cursor, pipeline: str, scope: str, last_key: str) -> None:
+        cursor.execute(
+            """
+            INSERT INTO ingestion_checkpoints (pipeline, scope, last_key)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (pipeline, scope)
+            DO UPDATE SET last_key = EXCLUDED.last_key, updated_at = NOW()
+            """,
+            (pipeline, scope, last_key),
+        )
+
+
+class InMemoryPostSource:
+    """Serves posts and document chunks from lists, for tests and benchmarks."""
+
+    def __init__(self, posts: Sequence[dict], document_chunks: Sequence[dict] = ()):
+        self.posts = sorted(posts, key=lambda post: str(post["id"]))
+        self.document_chunks = list(document_chunks)
+
+    def indexable_threads(self) -> List[str]:
+        return sorted({str(post["thread_id"]) for post in self.posts})
+
+    @staticmethod
+    def _changed(rows: Sequence[dict], thread_id: str, watermark) -> List[dict]:
+        rows = [r for r in rows if str(r["thread_id"]) == str(thread_id)]
+        rows.sort(key=lambda r: (r["updated_at"], str(r["id"])))
+        if watermark:
+            rows = [r for r in rows if (r["updated_at"], str(r["id"])) > watermark]
+        return rows
+
+    def iter_changed_posts(
+        self, thread_id: str, watermark, page_size: int
+    ) -> Iterator[dict]:
+        return iter(self._changed(self.posts, thread_id, watermark))
+
+    def iter_changed_document_chunks(
+        self, thread_id: str, watermark, page_size: int
+    ) -> Iterator[dict]:
+        return iter(self._changed(self.document_chunks, thread_id, watermark))
+
+    def iter_posts(
+        self, thread_id: str, after_id: Optional[str], page_size: int
+    ) -> Iterator[dict]:
+        for post in self.posts:
+            if str(post["thread_id"]) != str(thread_id):
+                continue
+            if after_id is None or str(post["id"]) > after_id:
+                yield post
+
+
+class InMemoryChunkWriter:
+    """Keeps written chunks in memory, optionally simulating commit latency."""
+
+    def __init__(self, commit_latency_ms: float = 0.0):
+        self.commit_latency_ms = commit_latency_ms
+        self.chunks: Dict[str, List[PostChunkRow]] = {}
+        self.vectors: Dict[str, np.ndarray] = {}
+        self.checkpoints: Dict[tuple, str] = {}
+        self.document_hashes: Dict[str, str] = {}
+
+    def load_checkpoint(self, pipeline: str, scope: str) -> Optional[str]:
+        return self.checkpoints.get((pipeline, scope))
+
+    def clear_checkpoint(self, pipeline: str, scope: str) -> None:
+        self.checkpoints.pop((pipeline, scope), None)
+
+    def indexed_hashes(self, post_ids: Sequence[str]) -> Dict[str, str]:
+        return {
+            post_id: self.chunks[post_id][0].metadata.get("content_hash")
+            for post_id in post_ids
+            if self.chunks.get(post_id)
+        }
+
+    def indexed_document_hashes(self, chunk_ids: Sequence[str]) -> Dict[str, str]:
+        return {
+            chunk_id: self.document_hashes[chunk_id]
+            for chunk_id in chunk_ids
+            if chunk_id in self.document_hashes
+        }
+
+    def write(self, pipeline: str, scope: str, batch: ChunkBatch) -> None:
+        time.sleep(self.commit_latency_ms / 1000)
+        for post_id in batch.post_ids:
+            for row in self.chunks.pop(post_id, []):
+                self.vectors.pop(row.id, None)
+        for row, vector in zip(batch.rows, batch.vectors):
+            self.chunks.setdefault(row.post_id, []).append(row)
+            self.vectors[row.id] = vector
+        self.checkpoints[(pipeline, scope)] = batch.checkpoint
+
+    def write_document_embeddings(
+        self,
+        pipeline: str,
+        scope: str,
+        rows: Sequence[DocumentChunkRow],
+        vectors: np.ndarray,
+        checkpoint: str,
+    ) -> None:
+        time.sleep(self.commit_latency_ms / 1000)
+        for row, vector in zip(rows, vectors):
+            self.vectors[row.id] = vector
+            self.document_hashes[row.id] = row.metadata.get("content_hash")
+        self.checkpoints[(pipeline, scope)] = checkpoint
+
+
+def batched(
+    posts: Iterable[dict],
+    batch_size: int,
+    max_tokens: int,
+    overlap_tokens: int,
+    checkpoint_key: Callable[[dict], str] = lambda post: str(post["id"]),
+    is_unchanged: Optional[Callable[[dict], bool]] = None,
+) -> Iterator[ChunkBatch]:
+    """
+    Chunk posts and group them into batches of about batch_size chunks.
+
+    Batches always end on a post boundary so checkpoints never split a post.
+    Posts for which is_unchanged returns True still advance the checkpoint but
+    are not re-chunked.
+    """
+    batch = ChunkBatch()
+    for post in posts:
+        batch.checkpoint = checkpoint_key(post)
+        batch.seen += 1
+        if is_unchanged and is_unchanged(post):
+            if batch.seen >= batch_size:
+                yield batch
+                batch = ChunkBatch()
+            continue
+
+        post_id = str(post["id"])
+        body_text = post.get("body_text") or ""
+        metadata = {"content_hash": content_hash(body_text)}
+        batch.post_ids.append(post_id)
+        for chunk in chunk_text(body_text, max_tokens, overlap_tokens):
+            batch.rows.append(
+                PostChunkRow(
+                    id=str(uuid.uuid4()),
+                    post_id=post_id,
+                    thread_id=str(post["thread_id"]),
+                    chunk_index=chunk.index,
+                    text_chunk=chunk.text,
+                    token_count=chunk.token_count,
+                    metadata=metadata,
+                )
+            )
+        if len(batch.rows) >= batch_size or batch.seen >= batch_size:
+            yield batch
+            batch = ChunkBatch()
+    if batch.seen:
+        yield batch
+
+
+class PostIngestionPipeline:
+    """Chunks, embeds and writes every post in a thread, resuming from checkpoints."""
+
+    def __init__(
+        self,
+        source: Optional[PostSource] = None,
+        writer: Optional[ChunkWriter] = None,
+        embeddings: Optional["Embeddings"] = None,
+        batch_size: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        overlap_tokens: Optional[int] = None,
+    ):
+        if embeddings is None:
+            from app.textGeneration.embeddings import get_embeddings
+
+            embeddings = get_embeddings()
+
+        self.source = source or PostgresPostSource()
+        self.writer = writer or PostgresChunkWriter()
+        self.embeddings = embeddings
+        self.batch_size = batch_size or settings.INGEST_BATCH_SIZE
+        self.max_tokens = max_tokens or settings.CHUNK_MAX_TOKENS
+        self.overlap_tokens = (
+            settings.CHUNK_OVERLAP_TOKENS if overlap_tokens is None else overlap_tokens
+        )
+
+    def embed(self, batches: Iterable[ChunkBatch]) -> Iterator[ChunkBatch]:
+        """Attach embeddings to each batch with one provider call per batch."""
+        for batch in batches:
+            texts = [row.text_chunk for row in batch.rows]
+            vectors = self.embeddings.embed_documents(texts) if texts else []
+            batch.vectors = np.asarray(vectors, dtype=np.float32)
+            yield batch
+
+    def run(self, thread_id: str, resume: bool = True) -> IngestionStats:
+        """
+        Ingest all posts of a thread.
+
+        Args:
+            thread_id: Thread whose posts to ingest
+            resume: Continue an interrupted run after its stored checkpoint
+                instead of starting over. A run that completes clears its
+                checkpoint, so the next run reads every post again (post ids
+                are random, so new posts can sort before the last one read).
+
+        Returns:
+            IngestionStats for this run
+        """
+        scope = str(thread_id)
+        after_id = self.writer.load_checkpoint(PIPELINE_NAME, scope) if resume else None
+        stats = IngestionStats()
+        start = time.perf_counter()
+
+        posts = self.source.iter_posts(scope, after_id, self.batch_size)
+        batches = batched(posts, self.batch_size, self.max_tokens, self.overlap_tokens)
+        for batch in self.embed(batches):
+            self.writer.write(PIPELINE_NAME, scope, batch)
+            stats.posts += len(batch.post_ids)
+            stats.chunks += len(batch.rows)
+            stats.batches += 1
+            logger.debug(
+                f"Ingested batch {stats.batches} up to post {batch.checkpoint}"
+            )
+        self.writer.clear_checkpoint(PIPELINE_NAME, scope)
+
+        stats.seconds = time.perf_counter() - start
+        logger.info(
+            f"Ingested {stats.posts} posts ({stats.chunks} chunks) for thread "
+            f"{scope} at {stats.chunks_per_second:.0f} chunks/s"
+        )
+        return stats
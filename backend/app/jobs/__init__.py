@@ -0,0 +1,34 @@
+"""
+Background jobs for the Piazza AI backend.
+
+Heavy work (chunking, embedding, summarization) is enqueued by the API and run
+by separate worker processes (`python -m app.jobs`, see app.jobs.worker).
+"""
+
+from app.jobs.handlers import JOB_HANDLERS, job_handler
+from app.jobs.queue import (
+    DEFAULT_QUEUE,
+    InMemoryJobQueue,
+    Job,
+    JobQueue,
+    PostgresJobQueue,
+    enqueue,
+    get_job_queue,
+    set_job_queue,
+)
+from app.jobs.worker import Worker, run_workers
+
+__all__ = [
+    "DEFAULT_QUEUE",
+    "InMemoryJobQueue",
+    "JOB_HANDLERS",
+    "Job",
+    "JobQueue",
+    "PostgresJobQueue",
+    "Worker",
+    "enqueue",
+    "get_job_queue",
+    "job_handler",
+    "run_workers",
+    "set_job_queue",
+]
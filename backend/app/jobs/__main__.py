@@ -0,0 +1,6 @@
+"""Run background job workers: python -m app.jobs --help"""
+
+from app.jobs.worker import main
+
+if __name__ == "__main__":
+    main()
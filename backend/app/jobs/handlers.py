@@ -0,0 +1,62 @@
+"""
+Job handlers.
+
+Handlers are registered by kind and called with the job's payload as keyword
+arguments. They may be plain functions or coroutine functions; workers run
+coroutines on one event loop per process, so async clients and pools are
+reused across jobs.
+
+Usage:
+    @job_handler("index_thread", queue="indexing")
+    def index_thread(thread_id: str) -> None:
+        ...
+
+    enqueue("index_thread", {"thread_id": thread_id}, queue="indexing")
+"""
+
+import logging
+from typing import Callable, Dict, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Registered handlers, by job kind
+JOB_HANDLERS: Dict[str, Callable] = {}
+
+
+def job_handler(kind: str, queue: Optional[str] = None) -> Callable:
+    """
+    Register a function as the handler for a job kind.
+
+    Args:
+        kind: Job kind the handler runs
+        queue: Queue these jobs are normally enqueued on, for documentation
+            and `enqueue` defaults
+    """
+
+    def register(fn: Callable) -> Callable:
+        if kind in JOB_HANDLERS:
+            raise ValueError(f"Duplicate job handler: {kind}")
+        fn.job_queue = queue
+        JOB_HANDLERS[kind] = fn
+        return fn
+
+    return register
+
+
+@job_handler("index_thread", queue="indexing")
+def index_thread(thread_id: str) -> None:
+    """Re-chunk and re-embed a thread's changed posts and document chunks."""
+    from app.ingestion.incremental import IncrementalIndexer
+
+    IncrementalIndexer().run([thread_id])
+
+
+@job_handler("refresh_summary", queue="summaries")
+async def refresh_summary(thread_id: str, post_id: Optional[str] = None) -> None:
+    """Recompute a post or thread summary in summary_cache."""
+    from app.textGeneration.summary import SummaryService
+
+    summary = await SummaryService().refresh(thread_id, post_id)
+    if summary is None:
+        logger.info(f"No chunks to summarize for thread {thread_id} post {post_id}")
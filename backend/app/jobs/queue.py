@@ -0,0 +1,394 @@
+"""
+Job queue backends.
+
+A job is a handler name (`kind`) plus a JSON payload of keyword arguments.
+Workers claim the highest-priority due job, run it, and mark it succeeded or
+failed. Failed jobs are retried with exponential backoff until they run out
+of attempts. A job whose worker dies stays locked until
+settings.JOB_VISIBILITY_TIMEOUT passes, then is queued again, so handlers
+must be idempotent.
+"""
+
+import itertools
+import json
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Protocol, Sequence
+
+from app.core.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE = "default"
+
+
+@dataclass
+class Job:
+    """A claimed job."""
+
+    id: str
+    kind: str
+    payload: dict = field(default_factory=dict)
+    queue: str = DEFAULT_QUEUE
+    priority: int = 0
+    attempts: int = 0
+    max_attempts: int = 1
+
+    @property
+    def retries_left(self) -> bool:
+        return self.attempts < self.max_attempts
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds before retrying a job that has failed `attempts` times."""
+    return min(
+        settings.JOB_RETRY_MAX_DELAY,
+        settings.JOB_RETRY_BASE_DELAY * 2 ** max(attempts - 1, 0),
+    )
+
+
+class JobQueue(Protocol):
+    """Durable, concurrently claimable job storage."""
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: Optional[dict] = None,
+        queue: str = DEFAULT_QUEUE,
+        priority: int = 0,
+        delay: float = 0.0,
+        max_attempts: Optional[int] = None,
+        dedupe_key: Optional[str] = None,
+    ) -> Optional[str]:
+        """Add a job; return its id, or None if an equal job is already queued."""
+        ...
+
+    def claim(self, worker_id: str, queues: Sequence[str]) -> Optional[Job]:
+        """Lock and return the next due job, highest priority first."""
+        ...
+
+    def complete(self, job: Job) -> None: ...
+
+    def fail(self, job: Job, error: str) -> bool:
+        """Record a failure; return True if the job will be retried."""
+        ...
+
+    def requeue_expired(self, timeout: float) -> int:
+        """Release jobs locked longer than `timeout` seconds."""
+        ...
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs in each status."""
+        ...
+
+
+class PostgresJobQueue:
+    """Jobs in the `jobs` table, claimed with FOR UPDATE SKIP LOCKED."""
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: Optional[dict] = None,
+        queue: str = DEFAULT_QUEUE,
+        priority: int = 0,
+        delay: float = 0.0,
+        max_attempts: Optional[int] = None,
+        dedupe_key: Optional[str] = None,
+    ) -> Optional[str]:
+        from app.core.database import execute_query
+
+        row = execute_query(
+            """
+            INSERT INTO jobs
+                (queue, kind, payload, priority, max_attempts, run_at, dedupe_key)
+            VALUES (%s, %s, %s::jsonb, %s, %s,
+                    NOW() + make_interval(secs => %s), %s)
+            ON CONFLICT (dedupe_key) WHERE status = 'queued' DO NOTHING
+            RETURNING id
+            """,
+            (
+                queue,
+                kind,
+                json.dumps(payload or {}),
+                priority,
+                max_attempts or settings.JOB_MAX_ATTEMPTS,
+                delay,
+                dedupe_key,
+            ),
+            fetch_one=True,
+        )
+        return str(row["id"]) if row else None
+
+    def claim(self, worker_id: str, queues: Sequence[str]) -> Optional[Job]:
+        from app.core.database import execute_query
+
+        row = execute_query(
+            """
+            UPDATE jobs j
+            SET status = 'running', attempts = j.attempts + 1,
+                locked_by = %(worker)s, locked_at = NOW()
+            FROM (
+                SELECT id FROM jobs
+                WHERE status = 'queued' AND queue = ANY(%(queues)s)
+                  AND run_at <= NOW()
+                ORDER BY priority DESC, run_at
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            ) next
+            WHERE j.id = next.id
+            RETURNING j.id, j.kind, j.payload, j.queue, j.priority, j.attempts,
+                      j.max_attempts
+            """,
+            {"worker": worker_id, "queues": list(queues)},
+            fetch_one=True,
+        )
+        if row is None:
+            return None
+        return Job(
+            id=str(row["id"]),
+            kind=row["kind"],
+            payload=row["payload"] or {},
+            queue=row["queue"],
+            priority=row["priority"],
+            attempts=row["attempts"],
+            max_attempts=row["max_attempts"],
+        )
+
+    def complete(self, job: Job) -> None:
+        from app.core.database import execute_statement
+
+        execute_statement(
+            """
+            UPDATE jobs SET status = 'succeeded', locked_by = NULL, locked_at = NULL
+            WHERE id = %s
+            """,
+            (job.id,),
+        )
+
+    def fail(self, job: Job, error: str) -> bool:
+        from app.core.database import execute_query
+
+        # A retry is dropped if an equal job has been queued meanwhile; that
+        # job does the same work
+        row = execute_query(
+            """
+            UPDATE jobs j
+            SET status = CASE
+                    WHEN j.attempts < j.max_attempts AND NOT EXISTS (
+                        SELECT 1 FROM jobs d
+                        WHERE d.dedupe_key = j.dedupe_key AND d.status = 'queued'
+                    ) THEN 'queued'
+                    ELSE 'failed'
+                END::job_status_enum,
+                run_at = NOW() + make_interval(secs => %s),
+                last_error = %s, locked_by = NULL, locked_at = NULL
+            WHERE j.id = %s
+            RETURNING j.status::text AS status
+            """,
+            (retry_delay(job.attempts), error, job.id),
+            fetch_one=True,
+        )
+        return bool(row) and row["status"] == "queued"
+
+    def requeue_expired(self, timeout: float) -> int:
+        from app.core.database import execute_statement
+
+        return execute_statement(
+            """
+            UPDATE jobs j
+            SET status = CASE
+                    WHEN j.attempts < j.max_attempts AND NOT EXISTS (
+                        SELECT 1 FROM jobs d
+                        WHERE d.dedupe_key = j.dedupe_key AND d.status = 'queued'
+                    ) THEN 'queued'
+                    ELSE 'failed'
+                END::job_status_enum,
+                last_error = 'worker lost: lock expired',
+                locked_by = NULL, locked_at = NULL
+            WHERE j.status = 'running'
+              AND j.locked_at < NOW() - make_interval(secs => %s)
+            """,
+            (timeout,),
+        )
+
+    def counts(self) -> Dict[str, int]:
+        from app.core.database import execute_query
+
+        rows = execute_query(
+            "SELECT status::text AS status, COUNT(*) AS jobs FROM jobs GROUP BY status"
+        )
+        return {row["status"]: row["jobs"] for row in rows}
+
+
+@dataclass
+class _Entry:
+    job: Job
+    run_at: float
+    seq: int
+    status: str = "queued"
+    dedupe_key: Optional[str] = None
+    locked_at: Optional[float] = None
+    last_error: Optional[str] = None
+
+
+class InMemoryJobQueue:
+    """Jobs held in this process, for tests and single-process development."""
+
+    def __init__(self):
+        self._entries: Dict[str, _Entry] = {}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(1 for entry in self._entries.values() if entry.status == "queued")
+
+    def get(self, job_id: str) -> Optional[_Entry]:
+        return self._entries.get(job_id)
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: Optional[dict] = None,
+        queue: str = DEFAULT_QUEUE,
+        priority: int = 0,
+        delay: float = 0.0,
+        max_attempts: Optional[int] = None,
+        dedupe_key: Optional[str] = None,
+    ) -> Optional[str]:
+        with self._lock:
+            if dedupe_key is not None and any(
+                entry.dedupe_key == dedupe_key and entry.status == "queued"
+                for entry in self._entries.values()
+            ):
+                return None
+            job = Job(
+                id=str(uuid.uuid4()),
+                kind=kind,
+                # Round-trip through JSON, as the Postgres backend does
+                payload=json.loads(json.dumps(payload or {})),
+                queue=queue,
+                priority=priority,
+                max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+            )
+            self._entries[job.id] = _Entry(
+                job, time.monotonic() + delay, next(self._seq), dedupe_key=dedupe_key
+            )
+        return job.id
+
+    def claim(self, worker_id: str, queues: Sequence[str]) -> Optional[Job]:
+        now = time.monotonic()
+        with self._lock:
+            due = [
+                entry
+                for entry in self._entries.values()
+                if entry.status == "queued"
+                and entry.job.queue in queues
+                and entry.run_at <= now
+            ]
+            if not due:
+                return None
+            entry = min(due, key=lambda e: (-e.job.priority, e.run_at, e.seq))
+            entry.status = "running"
+            entry.locked_at = now
+            entry.job.attempts += 1
+            return Job(**vars(entry.job))
+
+    def complete(self, job: Job) -> None:
+        with self._lock:
+            entry = self._entries[job.id]
+            entry.status = "succeeded"
+            entry.locked_at = None
+
+    def _release(self, entry: _Entry, error: str, delay: float) -> bool:
+        superseded = entry.dedupe_key is not None and any(
+            other.dedupe_key == entry.dedupe_key and other.status == "queued"
+            for other in self._entries.values()
+        )
+        retry = entry.job.retries_left and not superseded
+        entry.status = "queued" if retry else "failed"
+        entry.run_at = time.monotonic() + delay
+        entry.locked_at = None
+        entry.last_error = error
+        return retry
+
+    def fail(self, job: Job, error: str) -> bool:
+        with self._lock:
+            entry = self._entries[job.id]
+            return self._release(entry, error, retry_delay(entry.job.attempts))
+
+    def requeue_expired(self, timeout: float) -> int:
+        cutoff = time.monotonic() - timeout
+        with self._lock:
+            expired = [
+                entry
+                for entry in self._entries.values()
+                if entry.status == "running" and entry.locked_at < cutoff
+            ]
+            for entry in expired:
+                self._release(entry, "worker lost: lock expired", 0.0)
+        return len(expired)
+
+    def counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        with self._lock:
+            for entry in self._entries.values():
+                counts[entry.status] = counts.get(entry.status, 0) + 1
+        return counts
+
+
+# Global job queue
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """
+    Get the configured job queue.
+
+    Returns:
+        JobQueue: Postgres-backed unless settings.JOB_QUEUE_BACKEND is "memory"
+    """
+    global _job_queue
+
+    if _job_queue is None:
+        if settings.JOB_QUEUE_BACKEND == "postgres":
+            _job_queue = PostgresJobQueue()
+        elif settings.JOB_QUEUE_BACKEND == "memory":
+            _job_queue = InMemoryJobQueue()
+        else:
+            raise ValueError(f"Unknown job queue backend: {settings.JOB_QUEUE_BACKEND}")
+    return _job_queue
+
+
+def set_job_queue(queue: JobQueue) -> None:
+    """Install a specific job queue (e.g. an in-memory one in tests)."""
+    global _job_queue
+
+    _job_queue = queue
+
+
+def enqueue(kind: str, payload: Optional[dict] = None, **options) -> Optional[str]:
+    """
+    Add a job to the configured queue.
+
+    Blocks on a database round trip with the Postgres backend; async callers
+    should run it in a thread.
+
+    Args:
+        kind: Registered handler name (see app.jobs.handlers)
+        payload: Keyword arguments for the handler, JSON-serializable
+        **options: queue (defaults to the handler's), priority, delay,
+            max_attempts or dedupe_key
+
+    Returns:
+        The job id, or None if a job with the same dedupe_key is already queued
+    """
+    if "queue" not in options:
+        from app.jobs.handlers import JOB_HANDLERS
+
+        handler = JOB_HANDLERS.get(kind)
+        options["queue"] = getattr(handler, "job_queue", None) or DEFAULT_QUEUE
+    return get_job_queue().enqueue(kind, payload, **options)
@@ -0,0 +1,260 @@
+"""
+Job workers.
+
+`Worker` claims and runs jobs in a loop. `run_workers` starts several worker
+processes and supervises them, so CPU-heavy jobs (chunking, embedding) use
+every core and scale independently of the API processes. Run it on as many
+hosts as needed; the Postgres queue hands each job to exactly one worker.
+
+On SIGTERM or SIGINT, workers finish their current job and exit; the
+supervisor waits up to settings.JOB_SHUTDOWN_TIMEOUT before killing them.
+
+Usage:
+    python -m app.jobs --processes 4 --queues indexing summaries
+    python -m app.jobs --enqueue-reindex  # e.g. from cron, then exit
+"""
+
+import argparse
+import asyncio
+import inspect
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Optional, Sequence
+
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+from app.jobs.handlers import JOB_HANDLERS
+from app.jobs.queue import DEFAULT_QUEUE, Job, JobQueue, get_job_queue
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Seconds between sweeps for jobs whose worker died
+REQUEUE_INTERVAL = 60.0
+
+JOB_SECONDS = REGISTRY.histogram(
+    "job_duration_seconds",
+    "Time running one job",
+    buckets=(0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 1800.0),
+)
+
+
+@dataclass
+class WorkerStats:
+    """Counters for one worker."""
+
+    succeeded: int = 0
+    retried: int = 0
+    failed: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class Worker:
+    """Claims jobs from the given queues and runs them one at a time."""
+
+    def __init__(
+        self,
+        queue: Optional[JobQueue] = None,
+        queues: Sequence[str] = (DEFAULT_QUEUE,),
+        handlers: Optional[Dict[str, Callable]] = None,
+        poll_interval: Optional[float] = None,
+        worker_id: Optional[str] = None,
+    ):
+        # An empty InMemoryJobQueue is falsy (len 0), so test for None
+        self.queue = queue if queue is not None else get_job_queue()
+        self.queues = list(queues)
+        self.handlers = JOB_HANDLERS if handlers is None else handlers
+        self.poll_interval = (
+            settings.JOB_POLL_INTERVAL if poll_interval is None else poll_interval
+        )
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.stats = WorkerStats()
+        self._stop = threading.Event()
+        # Async handlers share one loop, so their clients and pools persist
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def stop(self) -> None:
+        """Exit after the current job."""
+        self._stop.set()
+
+    def _call(self, handler: Callable, payload: dict) -> None:
+        result = handler(**payload)
+        if inspect.isawaitable(result):
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(result)
+
+    def execute(self, job: Job) -> bool:
+        """
+        Run a claimed job and record its outcome.
+
+        Returns:
+            bool: True if the job succeeded
+        """
+        handler = self.handlers.get(job.kind)
+        start = time.perf_counter()
+        try:
+            if handler is None:
+                raise LookupError(f"No handler for job kind {job.kind!r}")
+            self._call(handler, job.payload)
+        except Exception as e:
+            logger.exception(f"Job {job.id} ({job.kind}) attempt {job.attempts} failed")
+            if self.queue.fail(job, f"{e.__class__.__name__}: {e}"):
+                self.stats.retried += 1
+            else:
+                self.stats.failed += 1
+                logger.error(f"Job {job.id} ({job.kind}) failed permanently")
+            return False
+        finally:
+            JOB_SECONDS.labels(kind=job.kind).observe(time.perf_counter() - start)
+
+        self.queue.complete(job)
+        self.stats.succeeded += 1
+        return True
+
+    def run_once(self) -> bool:
+        """
+        Claim and run one job.
+
+        Returns:
+            bool: False if no job was due
+        """
+        job = self.queue.claim(self.worker_id, self.queues)
+        if job is None:
+            return False
+        self.execute(job)
+        return True
+
+    def run(self) -> None:
+        """Run jobs until stop() is called, polling while the queues are empty."""
+        logger.info(f"Worker {self.worker_id} polling {', '.join(self.queues)}")
+        next_requeue = 0.0
+        try:
+            while not self._stop.is_set():
+                try:
+                    if time.monotonic() >= next_requeue:
+                        released = self.queue.requeue_expired(
+                            settings.JOB_VISIBILITY_TIMEOUT
+                        )
+                        if released:
+                            logger.warning(f"Released {released} expired jobs")
+                        next_requeue = time.monotonic() + REQUEUE_INTERVAL
+                    if self.run_once():
+                        continue
+                except Exception as e:
+                    # e.g. the database is unreachable; back off and retry
+                    logger.error(f"Worker {self.worker_id} poll failed: {e}")
+                self._stop.wait(self.poll_interval)
+        finally:
+            self._close()
+        logger.info(f"Worker {self.worker_id} stopped: {self.stats.as_dict()}")
+
+    def _close(self) -> None:
+        if self._loop is None:
+            return
+        from app.core.async_database import close_async_pool
+
+        self._loop.run_until_complete(close_async_pool())
+        self._loop.close()
+        self._loop = None
+
+
+def _worker_process(queues: Sequence[str]) -> None:
+    """Entry point of a worker process."""
+    from app.core.observability import configure_logging
+
+    configure_logging(logging.DEBUG if settings.DEBUG else logging.INFO)
+    worker = Worker(queues=queues)
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: worker.stop())
+    worker.run()
+
+
+def run_workers(
+    processes: Optional[int] = None, queues: Sequence[str] = (DEFAULT_QUEUE,)
+) -> None:
+    """
+    Run and supervise worker processes until SIGTERM or SIGINT.
+
+    Workers are spawned rather than forked, so each opens its own database
+    connections. A worker that exits unexpectedly is restarted.
+
+    Args:
+        processes: Worker processes, defaults to settings.JOB_WORKER_PROCESSES
+        queues: Queues the workers poll
+    """
+    processes = processes or settings.JOB_WORKER_PROCESSES
+    if settings.JOB_QUEUE_BACKEND != "postgres":
+        raise ValueError("Worker processes need a shared (postgres) job queue")
+
+    context = multiprocessing.get_context("spawn")
+    stopping = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stopping.set())
+
+    def start() -> multiprocessing.Process:
+        process = context.Process(target=_worker_process, args=(list(queues),))
+        process.start()
+        return process
+
+    children = [start() for _ in range(processes)]
+    logger.info(f"Started {processes} job workers for {', '.join(queues)}")
+
+    while not stopping.is_set():
+        for i, process in enumerate(children):
+            if not process.is_alive():
+                logger.warning(
+                    f"Worker {process.pid} exited with {process.exitcode}, restarting"
+                )
+                children[i] = start()
+        stopping.wait(1.0)
+
+    logger.info("Stopping job workers")
+    for process in children:
+        process.terminate()
+    deadline = time.monotonic() + settings.JOB_SHUTDOWN_TIMEOUT
+    for process in children:
+        process.join(max(deadline - time.monotonic(), 0))
+        if process.is_alive():
+            logger.warning(f"Worker {process.pid} did not stop in time, killing it")
+            process.kill()
+            process.join()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run background job workers")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument(
+        "--queues", nargs="+", help="Queues to poll (default: every handler's)"
+    )
+    parser.add_argument(
+        "--enqueue-reindex",
+        action="store_true",
+        help="Queue re-indexing of every indexable thread and exit",
+    )
+    args = parser.parse_args()
+    queues = args.queues or sorted(
+        {DEFAULT_QUEUE}
+        | {
+            getattr(h, "job_queue", None) or DEFAULT_QUEUE
+            for h in JOB_HANDLERS.values()
+        }
+    )
+
+    from app.core.observability import configure_logging
+
+    configure_logging(logging.DEBUG if settings.DEBUG else logging.INFO)
+    if args.enqueue_reindex:
+        from app.ingestion.incremental import enqueue_reindex
+
+        enqueue_reindex()
+        return
+    run_workers(args.processes, queues)
@@ -8,10 +8,16 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 # Import LLM models
-from app.models.llm import QueryRequest, QueryResponse
+from app.models.llm import (
+    BatchQueryRequest,
+    BatchQueryResult,
+    QueryRequest,
+    QueryResponse,
+    SummaryResponse,
+)
 
 
 class UserStatus(str, Enum):
@@ -46,10 +52,8 @@ class UserResponse(UserBase):
     created_at: datetime = Field(..., description="Account creation timestamp")
     updated_at: Optional[datetime] = Field(None, description="Last update timestamp")
 
-    class Config:
-        # Allow the model to work with ORM objects
-        from_attributes = True
-        json_encoders = {datetime: lambda v: v.isoformat()}
+    # Allow the model to work with ORM objects; datetimes serialize as ISO 8601
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UserUpdate(BaseModel):
@@ -68,8 +72,11 @@ __all__ = [
     "UserCreate",
     "UserResponse",
     "UserUpdate",
+    "BatchQueryRequest",
+    "BatchQueryResult",
     "QueryRequest",
     "QueryResponse",
+    "SummaryResponse",
 ]
 
 # TODO: Add SQLAlchemy database models when needed
@@ -2,6 +2,10 @@
 LLM models.
 """
 
+from datetime import datetime
+from typing import List, Literal, Optional
+from uuid import UUID
+
 from pydantic import BaseModel, Field
 
 
@@ -9,6 +13,8 @@ class QueryRequest(BaseModel):
     """Request model for LLM queries."""
 
     query: str = Field(..., min_length=1, max_length=5000)
+    thread_id: Optional[UUID] = Field(None, description="Thread the query is about")
+    user_id: Optional[UUID] = Field(None, description="User asking the query")
 
 
 class QueryResponse(BaseModel):
@@ -17,6 +23,45 @@ class QueryResponse(BaseModel):
     query: str
     response: str
     model: str
+    cached: bool = False
+
+
+class BatchQueryRequest(BaseModel):
+    """Request model for answering many queries in one call."""
+
+    queries: List[QueryRequest] = Field(..., min_length=1)
+    user_id: Optional[UUID] = Field(None, description="User submitting the batch")
+
+
+class BatchQueryResult(BaseModel):
+    """One answered (or failed) query of a batch, streamed as an NDJSON line."""
+
+    index: int = Field(..., description="Position of the query in the request")
+    query: str
+    response: Optional[str] = None
+    model: Optional[str] = None
+    cached: bool = False
+    status_code: int = Field(200, description="HTTP status the query alone would get")
+    error: Optional[str] = None
+
+
+class SummaryResponse(BaseModel):
+    """Response model for post and thread summaries."""
+
+    thread_id: UUID
+    post_id: Optional[UUID] = None
+    status: Literal["fresh", "stale", "pending"] = Field(
+        ..., description="pending: no summary yet, one is being generated"
+    )
+    summary: Optional[str] = None
+    computed_at: Optional[datetime] = None
+    sources: List[dict] = Field(default_factory=list)
 
 
-__all__ = ["QueryRequest", "QueryResponse"]
+__all__ = [
+    "BatchQueryRequest",
+    "BatchQueryResult",
+    "QueryRequest",
+    "QueryResponse",
+    "SummaryResponse",
+]
@@ -0,0 +1,44 @@
+"""
+Retrieval package for the Piazza AI backend.
+
+This package contains search over indexed course content (post and document
+chunks) used to ground LLM answers.
+"""
+
+from app.retrieval.hybrid import (
+    BM25Index,
+    HybridSearchEngine,
+    InMemoryHybridEngine,
+    PgHybridEngine,
+    get_hybrid_engine,
+    hybrid_search,
+    reciprocal_rank_fusion,
+    set_hybrid_engine,
+)
+from app.retrieval.vector import (
+    InMemoryVectorEngine,
+    PgVectorEngine,
+    RetrievedChunk,
+    VectorSearchEngine,
+    get_vector_engine,
+    search_similar,
+    set_vector_engine,
+)
+
+__all__ = [
+    "BM25Index",
+    "HybridSearchEngine",
+    "InMemoryHybridEngine",
+    "InMemoryVectorEngine",
+    "PgHybridEngine",
+    "PgVectorEngine",
+    "RetrievedChunk",
+    "VectorSearchEngine",
+    "get_hybrid_engine",
+    "get_vector_engine",
+    "hybrid_search",
+    "reciprocal_rank_fusion",
+    "search_similar",
+    "set_hybrid_engine",
+    "set_vector_engine",
+]
@@ -0,0 +1,417 @@
+"""
+Hybrid lexical + vector retrieval.
+
+Embedding search misses exact identifiers that Piazza questions are full of
+(assignment numbers, function names, error strings), while full-text search
+misses paraphrases. The hybrid engines rank candidates both ways and fuse the
+rankings with reciprocal-rank fusion (RRF):
+
+    score(chunk) = sum over rankings of 1 / (HYBRID_RRF_K + rank)
+
+- `PgHybridEngine` runs both rankings and the fusion in a single SQL
+  statement, using the GIN `text_tsv` indexes on the chunk tables and the HNSW
+  indexes on `embeddings`. The transaction-local HNSW settings go first, so a
+  search costs two round trips.
+- `InMemoryHybridEngine` pairs `InMemoryVectorEngine` with an Okapi BM25 index
+  for tests, benchmarks and running without a database.
+"""
+
+import logging
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Protocol, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.retrieval.vector import (
+    SOURCE_TYPES,
+    InMemoryVectorEngine,
+    RetrievedChunk,
+    configure_hnsw,
+    to_pgvector,
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+ChunkKey = Tuple[str, str]
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens used by the BM25 index."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def reciprocal_rank_fusion(
+    rankings: Iterable[Sequence[ChunkKey]], rrf_k: int = 60
+) -> List[Tuple[ChunkKey, float]]:
+    """
+    Fuse several rankings into one with reciprocal-rank fusion.
+
+    Args:
+        rankings: Each ranking is a best-first sequence of (source_type, source_id)
+        rrf_k: Damping constant; larger values flatten the head of each ranking
+
+    Returns:
+        (key, fused score) pairs ordered by descending score
+    """
+    scores: Dict[ChunkKey, float] = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class HybridSearchEngine(Protocol):
+    """Top-k lexical + vector search scoped to a thread."""
+
+    def search(
+        self,
+        query: str,
+        query_vector: Sequence[float],
+        thread_id: str,
+        k: int = 10,
+        source_types: Optional[Sequence[str]] = None,
+    ) -> List[RetrievedChunk]: ...
+
+
+class PgHybridEngine:
+    """Full-text and pgvector rankings fused by RRF in one query."""
+
+    def __init__(
+        self,
+        candidates: Optional[int] = None,
+        rrf_k: Optional[int] = None,
+        ef_search: Optional[int] = None,
+    ):
+        self.candidates = candidates or settings.HYBRID_CANDIDATES
+        self.rrf_k = rrf_k or settings.HYBRID_RRF_K
+        self.ef_search = ef_search or settings.VECTOR_HNSW_EF_SEARCH
+
+    def search(
+        self,
+        query: str,
+        query_vector: Sequence[float],
+        thread_id: str,
+        k: int = 10,
+        source_types: Optional[Sequence[str]] = None,
+    ) -> List[RetrievedChunk]:
+        """
+        Return the k chunks in a thread ranked best by lexical and vector search.
+
+        Args:
+            query: Raw query text, parsed with websearch_to_tsquery
+            query_vector: Query embedding, same dimensions as stored embeddings
+            thread_id: Thread to search within
+            k: Number of chunks to return
+            source_types: Restrict to these source types (default: all)
+
+        Returns:
+            Chunks ordered by descending fused score
+        """
+        from app.core.database import get_db
+
+        types = list(source_types or SOURCE_TYPES)
+        with get_db() as db:
+            cursor = db.cursor()
+            configure_hnsw(cursor, self.ef_search)
+            cursor.execute(
+                """
+                WITH q AS (
+                    SELECT websearch_to_tsquery('english', %(query)s) AS tsq
+                ),
+                vector_hits AS (
+                    SELECT source_type::text AS source_type, source_id,
+                           ROW_NUMBER() OVER (
+                               ORDER BY embedding <=> %(vector)s::vector
+                           ) AS rank
+                    FROM (
+                        SELECT source_type, source_id, embedding
+                        FROM embeddings
+                        WHERE thread_id = %(thread_id)s
+                          AND source_type = ANY(%(types)s::source_type_enum[])
+                        ORDER BY embedding <=> %(vector)s::vector
+                        LIMIT %(candidates)s
+                    ) nearest
+                ),
+                text_hits AS (
+                    SELECT source_type, source_id,
+                           ROW_NUMBER() OVER (ORDER BY lexical DESC) AS rank
+                    FROM (
+                        (SELECT 'post_chunk' AS source_type, pc.id AS source_id,
+                                ts_rank_cd(pc.text_tsv, q.tsq) AS lexical
+                         FROM post_chunks pc, q
+                         WHERE pc.thread_id = %(thread_id)s
+                           AND pc.text_tsv @@ q.tsq
+                           AND 'post_chunk' = ANY(%(types)s)
+                         ORDER BY lexical DESC
+                         LIMIT %(candidates)s)
+                        UNION ALL
+                        (SELECT kind.source_type, dc.id,
+                                ts_rank_cd(dc.text_tsv, q.tsq)
+                         FROM document_chunks dc
+                         CROSS JOIN q
+                         -- Document chunks are embedded as doc_chunk or
+                         -- external; label lexical hits the same way so both
+                         -- rankings fuse on one key
+                         CROSS JOIN LATERAL (
+                             SELECT COALESCE(
+                                 (SELECT e.source_type::text FROM embeddings e
+                                  WHERE e.source_id = dc.id
+                                    AND e.source_type <> 'post_chunk'
+                                  LIMIT 1),
+                                 'doc_chunk'
+                             ) AS source_type
+                         ) kind
+                         WHERE dc.thread_id = %(thread_id)s
+                           AND dc.text_tsv @@ q.tsq
+                           AND kind.source_type = ANY(%(types)s)
+                         ORDER BY 3 DESC
+                         LIMIT %(candidates)s)
+                    ) matches
+                ),
+                fused AS (
+                    SELECT source_type, source_id,
+                           SUM(1.0 / (%(rrf_k)s + rank)) AS score
+                    FROM (
+                        SELECT * FROM vector_hits
+                        UNION ALL
+                        SELECT * FROM text_hits
+                    ) ranked
+                    GROUP BY source_type, source_id
+                    ORDER BY score DESC
+                    LIMIT %(k)s
+                )
+                SELECT f.source_type, f.source_id, f.score,
+                       COALESCE(pc.thread_id, dc.thread_id) AS thread_id,
+                       COALESCE(pc.text_chunk, dc.text_chunk) AS text,
+                       COALESCE(pc.token_count, dc.token_count) AS token_count,
+                       COALESCE(pc.metadata, dc.metadata) AS metadata
+                FROM fused f
+                LEFT JOIN post_chunks pc
+                       ON f.source_type = 'post_chunk' AND pc.id = f.source_id
+                LEFT JOIN document_chunks dc
+                       ON f.source_type <> 'post_chunk' AND dc.id = f.source_id
+                ORDER BY f.score DESC
+                """,
+                {
+                    "query": query,
+                    "vector": to_pgvector(query_vector),
+                    "thread_id": str(thread_id),
+                    "types": types,
+                    "candidates": max(self.candidates, k),
+                    "rrf_k": self.rrf_k,
+                    "k": k,
+                },
+            )
+            rows = cursor.fetchall()
+
+        return [
+            RetrievedChunk(
+                source_type=row["source_type"],
+                source_id=str(row["source_id"]),
+                thread_id=str(row["thread_id"] or thread_id),
+                text=row["text"] or "",
+                token_count=row["token_count"],
+                score=float(row["score"]),
+                metadata=row["metadata"] or {},
+            )
+            for row in rows
+        ]
+
+
+class BM25Index:
+    """Okapi BM25 over the chunks of one thread."""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.chunks: List[RetrievedChunk] = []
+        self.lengths: List[int] = []
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    def add(self, chunks: Sequence[RetrievedChunk]) -> None:
+        for chunk in chunks:
+            doc = len(self.chunks)
+            terms = Counter(tokenize(chunk.text))
+            for term, tf in terms.items():
+                self.postings.setdefault(term, []).append((doc, tf))
+            length = sum(terms.values())
+            self.chunks.append(chunk)
+            self.lengths.append(length)
+            self.total_length += length
+
+    def search(
+        self, query: str, k: int, source_types: Optional[Sequence[str]] = None
+    ) -> List[Tuple[RetrievedChunk, float]]:
+        """Return up to k (chunk, BM25 score) pairs with a non-zero score."""
+        if not self.chunks:
+            return []
+
+        n = len(self.chunks)
+        average = self.total_length / n or 1.0
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc, tf in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[doc] / average)
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (self.k1 + 1) / (
+                    tf + norm
+                )
+
+        allowed = set(source_types) if source_types else None
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        results = []
+        for doc, score in ranked:
+            chunk = self.chunks[doc]
+            if allowed is None or chunk.source_type in allowed:
+                results.append((chunk, score))
+                if len(results) >= k:
+                    break
+        return results
+
+
+class InMemoryHybridEngine:
+    """BM25 and exact cosine rankings fused by RRF."""
+
+    def __init__(
+        self,
+        vector_engine: Optional[InMemoryVectorEngine] = None,
+        candidates: Optional[int] = None,
+        rrf_k: Optional[int] = None,
+    ):
+        # An empty engine is falsy (len 0), so test for None explicitly
+        self.vector_engine = (
+            vector_engine if vector_engine is not None else InMemoryVectorEngine()
+        )
+        self.candidates = candidates or settings.HYBRID_CANDIDATES
+        self.rrf_k = rrf_k or settings.HYBRID_RRF_K
+        self._lexical: Dict[str, BM25Index] = {}
+
+    def __len__(self) -> int:
+        return len(self.vector_engine)
+
+    def add(self, chunks: Sequence[RetrievedChunk], vectors: np.ndarray) -> None:
+        """
+        Index chunks for both lexical and vector search.
+
+        Args:
+            chunks: Chunks to index (their score field is ignored)
+            vectors: Array of shape (len(chunks), dimensions)
+        """
+        self.vector_engine.add(chunks, vectors)
+        by_thread: Dict[str, List[RetrievedChunk]] = {}
+        for chunk in chunks:
+            by_thread.setdefault(str(chunk.thread_id), []).append(chunk)
+        for thread_id, thread_chunks in by_thread.items():
+            self._lexical.setdefault(thread_id, BM25Index()).add(thread_chunks)
+
+    def search(
+        self,
+        query: str,
+        query_vector: Sequence[float],
+        thread_id: str,
+        k: int = 10,
+        source_types: Optional[Sequence[str]] = None,
+    ) -> List[RetrievedChunk]:
+        """Return the k chunks in a thread ranked best by BM25 and cosine."""
+        candidates = max(self.candidates, k)
+        vector_hits = self.vector_engine.search(
+            query_vector, thread_id, candidates, source_types
+        )
+        lexical = self._lexical.get(str(thread_id))
+        text_hits = (
+            [chunk for chunk, _ in lexical.search(query, candidates, source_types)]
+            if lexical
+            else []
+        )
+
+        by_key = {(c.source_type, c.source_id): c for c in text_hits + vector_hits}
+        fused = reciprocal_rank_fusion(
+            [
+                [(c.source_type, c.source_id) for c in vector_hits],
+                [(c.source_type, c.source_id) for c in text_hits],
+            ],
+            self.rrf_k,
+        )
+
+        results = []
+        for key, score in fused[:k]:
+            chunk = by_key[key]
+            results.append(
+                RetrievedChunk(
+                    source_type=chunk.source_type,
+                    source_id=chunk.source_id,
+                    thread_id=chunk.thread_id,
+                    text=chunk.text,
+                    token_count=chunk.token_count,
+                    score=score,
+                    metadata=chunk.metadata,
+                )
+            )
+        return results
+
+
+# Global hybrid engine
+_hybrid_engine: Optional[HybridSearchEngine] = None
+
+
+def get_hybrid_engine() -> HybridSearchEngine:
+    """
+    Get the configured hybrid search engine.
+
+    Returns:
+        HybridSearchEngine: Postgres-backed unless settings.VECTOR_ENGINE is "memory"
+    """
+    global _hybrid_engine
+
+    if _hybrid_engine is None:
+        if settings.VECTOR_ENGINE == "memory":
+            _hybrid_engine = InMemoryHybridEngine()
+        elif settings.VECTOR_ENGINE == "pgvector":
+            _hybrid_engine = PgHybridEngine()
+        else:
+            raise ValueError(f"Unknown vector engine: {settings.VECTOR_ENGINE}")
+    return _hybrid_engine
+
+
+def set_hybrid_engine(engine: HybridSearchEngine) -> None:
+    """Install a specific hybrid engine (e.g. a pre-loaded in-memory one)."""
+    global _hybrid_engine
+
+    _hybrid_engine = engine
+
+
+def hybrid_search(
+    query: str,
+    thread_id: str,
+    k: int = 10,
+    source_types: Optional[Sequence[str]] = None,
+) -> List[RetrievedChunk]:
+    """
+    Embed a query and return the k best chunks in a thread by hybrid search.
+
+    Args:
+        query: Natural-language query, possibly with exact identifiers
+        thread_id: Thread to search within
+        k: Number of chunks to return
+        source_types: Restrict to these source types (default: all)
+
+    Returns:
+        Chunks ordered by descending fused score
+    """
+    from app.textGeneration.embeddings import get_embeddings
+
+    vector = get_embeddings().embed_query(query)
+    return get_hybrid_engine().search(query, vector, thread_id, k, source_types)
@@ -0,0 +1,299 @@
+"""
+Vector similarity search over chunk embeddings.
+
+Two engines share one interface:
+
+- `PgVectorEngine` queries the partitioned `embeddings` table with pgvector's
+  cosine distance operator, which the HNSW indexes on each partition serve.
+- `InMemoryVectorEngine` is an exact NumPy brute-force engine for tests,
+  benchmarks and running without a database.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Protocol, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+SOURCE_TYPES = ("post_chunk", "doc_chunk", "external")
+
+
+@dataclass
+class RetrievedChunk:
+    """A chunk returned by retrieval, with its similarity score."""
+
+    source_type: str
+    source_id: str
+    thread_id: str
+    text: str
+    token_count: Optional[int]
+    score: float
+    metadata: dict = field(default_factory=dict)
+
+    def as_result(self) -> dict:
+        """Shape stored in query_logs.results."""
+        return {
+            "source_type": self.source_type,
+            "source_id": str(self.source_id),
+            "score": round(self.score, 6),
+        }
+
+
+class VectorSearchEngine(Protocol):
+    """Top-k similarity search scoped to a thread."""
+
+    def search(
+        self,
+        query_vector: Sequence[float],
+        thread_id: str,
+        k: int = 10,
+        source_types: Optional[Sequence[str]] = None,
+    ) -> List[RetrievedChunk]: ...
+
+
+def to_pgvector(vector: Sequence[float]) -> str:
+    """Format a vector as a pgvector text literal."""
+    return "[" + ",".join(f"{float(x):.7g}" for x in vector) + "]"
+
+
+def configure_hnsw(cursor, ef_search: int) -> None:
+    """
+    Tune HNSW scans for the current transaction.
+
+    Widens the candidate list and keeps scanning past rows that the thread
+    filter discards, so filtered queries still return k results. The settings
+    are sent together, in one round trip.
+    """
+    statements = [f"SET LOCAL hnsw.ef_search = {int(ef_search)}"]
+    if settings.VECTOR_ITERATIVE_SCAN:
+        statements.append("SET LOCAL hnsw.iterative_scan = relaxed_order")
+    cursor.execute("; ".join(statements))
+
+
+class PgVectorEngine:
+    """Cosine similarity search against the `embeddings` table."""
+
+    def __init__(self, ef_search: Optional[int] = None):
+        self.ef_search = ef_search or settings.VECTOR_HNSW_EF_SEARCH
+
+    def search(
+        self,
+        query_vector: Sequence[float],
+        thread_id: str,
+        k: int = 10,
+        source_types: Optional[Sequence[str]] = None,
+    ) -> List[RetrievedChunk]:
+        """
+        Return the k chunks in a thread most similar to the query vector.
+
+        Args:
+            query_vector: Query embedding, same dimensions as stored embeddings
+            thread_id: Thread to search within
+            k: Number of chunks to return
+            source_types: Restrict to these source types (default: all)
+
+        Returns:
+            Chunks ordered by descending similarity
+        """
+        from app.core.database import get_db
+
+        types = list(source_types or SOURCE_TYPES)
+        with get_db() as db:
+            cursor = db.cursor()
+            configure_hnsw(cursor, self.ef_search)
+            cursor.execute(
+                """
+                SELECT e.source_type::text AS source_type, e.source_id,
+                       e.thread_id, e.metadata,
+                       COALESCE(pc.text_chunk, dc.text_chunk) AS text,
+                       COALESCE(pc.token_count, dc.token_count) AS token_count,
+                       1 - (e.embedding <=> %(vector)s::vector) AS score
+                FROM embeddings e
+                LEFT JOIN post_chunks pc
+                       ON e.source_type = 'post_chunk' AND pc.id = e.source_id
+                LEFT JOIN document_chunks dc
+                       ON e.source_type <> 'post_chunk' AND dc.id = e.source_id
+                WHERE e.thread_id = %(thread_id)s
+                  AND e.source_type = ANY(%(types)s::source_type_enum[])
+                ORDER BY e.embedding <=> %(vector)s::vector
+                LIMIT %(k)s
+                """,
+                {
+                    "vector": to_pgvector(query_vector),
+                    "thread_id": str(thread_id),
+                    "types": types,
+                    "k": k,
+                },
+            )
+            rows = cursor.fetchall()
+
+        return [
+            RetrievedChunk(
+                source_type=row["source_type"],
+                source_id=str(row["source_id"]),
+                thread_id=str(row["thread_id"]),
+                text=row["text"] or "",
+                token_count=row["token_count"],
+                score=float(row["score"]),
+                metadata=row["metadata"] or {},
+            )
+            for row in rows
+        ]
+
+
+class _ThreadIndex:
+    def __init__(self, dimensions: int):
+        self.chunks: List[RetrievedChunk] = []
+        self.pending: List[np.ndarray] = []
+        self.matrix = np.empty((0, dimensions), dtype=np.float32)
+
+    def vectors(self) -> np.ndarray:
+        if self.pending:
+            self.matrix = np.vstack([self.matrix, *self.pending])
+            self.pending = []
+        return self.matrix
+
+
+class InMemoryVectorEngine:
+    """Exact cosine search over L2-normalized vectors held in NumPy arrays."""
+
+    def __init__(self, dimensions: Optional[int] = None):
+        self.dimensions = dimensions or settings.EMBEDDING_DIMENSIONS
+        self._threads: Dict[str, _ThreadIndex] = {}
+
+    def __len__(self) -> int:
+        return sum(len(index.chunks) for index in self._threads.values())
+
+    def add(self, chunks: Sequence[RetrievedChunk], vectors: np.ndarray) -> None:
+        """
+        Index chunks with their embeddings.
+
+        Args:
+            chunks: Chunks to index (their score field is ignored)
+            vectors: Array of shape (len(chunks), dimensions)
+        """
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dimensions)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+
+        by_thread: Dict[str, List[int]] = {}
+        for i, chunk in enumerate(chunks):
+            by_thread.setdefault(str(chunk.thread_id), []).append(i)
+
+        for thread_id, rows in by_thread.items():
+            index = self._threads.setdefault(thread_id, _ThreadIndex(self.dimensions))
+            index.chunks.extend(chunks[i] for i in rows)
+            index.pending.append(vectors[rows])
+
+    def remove(self, source_ids: Sequence[str]) -> None:
+        """Drop chunks by source id."""
+        doomed = {str(source_id) for source_id in source_ids}
+        for index in self._threads.values():
+            vectors = index.vectors()
+            keep = [i for i, c in enumerate(index.chunks) if c.source_id not in doomed]
+            index.chunks = [index.chunks[i] for i in keep]
+            index.matrix = vectors[keep]
+
+    def search(
+        self,
+        query_vector: Sequence[float],
+        thread_id: str,
+        k: int = 10,
+        source_types: Optional[Sequence[str]] = None,
+    ) -> List[RetrievedChunk]:
+        """Return the k chunks in a thread most similar to the query vector."""
+        index = self._threads.get(str(thread_id))
+        if index is None or not index.chunks:
+            return []
+
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        scores = index.vectors() @ (query / norm if norm else query)
+
+        if source_types:
+            allowed = set(source_types)
+            mask = np.fromiter(
+                (c.source_type in allowed for c in index.chunks), dtype=bool
+            )
+            scores = np.where(mask, scores, -np.inf)
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        results = []
+        for i in top:
+            if scores[i] == -np.inf:
+                break
+            chunk = index.chunks[i]
+            results.append(
+                RetrievedChunk(
+                    source_type=chunk.source_type,
+                    source_id=chunk.source_id,
+                    thread_id=chunk.thread_id,
+                    text=chunk.text,
+                    token_count=chunk.token_count,
+                    score=float(scores[i]),
+                    metadata=chunk.metadata,
+                )
+            )
+        return results
+
+
+# Global vector engine
+_vector_engine: Optional[VectorSearchEngine] = None
+
+
+def get_vector_engine() -> VectorSearchEngine:
+    """
+    Get the configured vector search engine.
+
+    Returns:
+        VectorSearchEngine: pgvector-backed unless settings.VECTOR_ENGINE is "memory"
+    """
+    global _vector_engine
+
+    if _vector_engine is None:
+        if settings.VECTOR_ENGINE == "memory":
+            _vector_engine = InMemoryVectorEngine()
+        elif settings.VECTOR_ENGINE == "pgvector":
+            _vector_engine = PgVectorEngine()
+        else:
+            raise ValueError(f"Unknown vector engine: {settings.VECTOR_ENGINE}")
+    return _vector_engine
+
+
+def set_vector_engine(engine: VectorSearchEngine) -> None:
+    """Install a specific vector engine (e.g. a pre-loaded in-memory one)."""
+    global _vector_engine
+
+    _vector_engine = engine
+
+
+def search_similar(
+    query: str,
+    thread_id: str,
+    k: int = 10,
+    source_types: Optional[Sequence[str]] = None,
+) -> List[RetrievedChunk]:
+    """
+    Embed a query and return the k most similar chunks in a thread.
+
+    Args:
+        query: Natural-language query
+        thread_id: Thread to search within
+        k: Number of chunks to return
+        source_types: Restrict to these source types (default: all)
+
+    Returns:
+        Chunks ordered by descending similarity
+    """
+    from app.textGeneration.embeddings import get_embeddings
+
+    vector = get_embeddings().embed_query(query)
+    return get_vector_engine().search(vector, thread_id, k, source_types)
@@ -2,6 +2,36 @@
 Text Generation Module
 """
 
-from app.textGeneration.llm_service import get_llm_response
+from app.textGeneration.client import (
+    LLMClientManager,
+    close_llm_client,
+    get_llm_client,
+    init_llm_client,
+)
+from app.textGeneration.llm_service import (
+    abatch_llm_responses,
+    aget_llm_response,
+    astream_llm_response,
+    get_llm_response,
+)
+from app.textGeneration.routing import (
+    ModelRegistry,
+    ModelSpec,
+    get_model_registry,
+    set_model_registry,
+)
 
-__all__ = ["get_llm_response"]
+__all__ = [
+    "LLMClientManager",
+    "ModelRegistry",
+    "ModelSpec",
+    "abatch_llm_responses",
+    "aget_llm_response",
+    "astream_llm_response",
+    "close_llm_client",
+    "get_llm_client",
+    "get_llm_response",
+    "get_model_registry",
+    "init_llm_client",
+    "set_model_registry",
+]
@@ -0,0 +1,365 @@
+"""
+Response cache in front of the LLM.
+
+Lookups go through up to three tiers, cheapest first:
+
+1. An in-process LRU keyed by thread and normalized query, with TTL expiry.
+2. Optionally, recent `query_logs` rows for the same thread and query hash.
+3. Optionally, an embedding-similarity scan of the in-process entries for the
+   same thread, so paraphrased questions can hit too. Each thread keeps a
+   matrix of its entries' query embeddings, updated as entries come and go.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+
+import anyio
+import numpy as np
+
+from app.core.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = re.compile(r"[\s?.!]+$")
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation."""
+    normalized = _WHITESPACE.sub(" ", query.strip().lower())
+    return _TRAILING_PUNCTUATION.sub("", normalized)
+
+
+def query_hash(query: str) -> str:
+    """Stable hash of the normalized query, as stored in query_logs.query_hash."""
+    return hashlib.sha256(normalize_query(query).encode()).hexdigest()
+
+
+@dataclass
+class CachedResponse:
+    """A cached LLM answer."""
+
+    content: str
+    model: str
+    tier: str
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for tuning the cache."""
+
+    memory_hits: int = 0
+    persistent_hits: int = 0
+    semantic_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    def as_dict(self) -> dict:
+        data = asdict(self)
+        hits = self.memory_hits + self.persistent_hits + self.semantic_hits
+        total = hits + self.misses
+        data["hit_rate"] = hits / total if total else 0.0
+        return data
+
+
+@dataclass
+class _Entry:
+    content: str
+    model: str
+    expires_at: float
+
+
+class _ScopeVectors:
+    """Query embeddings of one scope's entries, one matrix row per entry."""
+
+    def __init__(self, dimensions: int):
+        self.matrix = np.empty((16, dimensions), dtype=np.float32)
+        self.keys: List[str] = []
+        self.rows: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def put(self, key: str, vector: np.ndarray) -> None:
+        row = self.rows.get(key)
+        if row is None:
+            row = len(self.keys)
+            if row == len(self.matrix):
+                grown = np.empty((2 * row, self.matrix.shape[1]), dtype=np.float32)
+                grown[:row] = self.matrix
+                self.matrix = grown
+            self.keys.append(key)
+            self.rows[key] = row
+        self.matrix[row] = vector
+
+    def remove(self, key: str) -> None:
+        row = self.rows.pop(key, None)
+        if row is None:
+            return
+        # Move the last row into the gap so the live rows stay contiguous
+        last = len(self.keys) - 1
+        if row != last:
+            moved = self.keys[last]
+            self.matrix[row] = self.matrix[last]
+            self.keys[row] = moved
+            self.rows[moved] = row
+        self.keys.pop()
+
+    def scores(self, vector: np.ndarray) -> np.ndarray:
+        return self.matrix[: len(self.keys)] @ vector
+
+
+class ResponseCache:
+    """Multi-tier LLM response cache with TTL and size-based eviction."""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600.0,
+        persistent: bool = False,
+        semantic: bool = False,
+        semantic_threshold: float = 0.95,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persistent = persistent
+        self.semantic = semantic
+        self.semantic_threshold = semantic_threshold
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._vectors: Dict[str, _ScopeVectors] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(
+        self, query: str, thread_id: Optional[str] = None
+    ) -> Optional[CachedResponse]:
+        """
+        Look up a cached response for a query.
+
+        Args:
+            query: User's question
+            thread_id: Thread the question was asked in, if any
+
+        Returns:
+            CachedResponse if any tier hit, otherwise None
+        """
+        cached, _ = await self.lookup(query, thread_id)
+        return cached
+
+    async def lookup(
+        self, query: str, thread_id: Optional[str] = None
+    ) -> Tuple[Optional[CachedResponse], Optional[np.ndarray]]:
+        """
+        Look up a cached response, also returning the query's embedding.
+
+        The query is embedded at most once, and only when the semantic tier is
+        reached. Pass the embedding on to `set` so a miss is not embedded twice.
+
+        Args:
+            query: User's question
+            thread_id: Thread the question was asked in, if any
+
+        Returns:
+            (CachedResponse or None, query embedding or None)
+        """
+        scope = str(thread_id or "")
+        key = (scope, query_hash(query))
+
+        entry = self._get_memory(key)
+        if entry:
+            self.stats.memory_hits += 1
+            return CachedResponse(entry.content, entry.model, "memory"), None
+
+        if self.persistent and thread_id:
+            logged = await _lookup_query_log(scope, key[1], self.ttl_seconds)
+            if logged is not None:
+                content, model = logged
+                self.stats.persistent_hits += 1
+                vector = await self.embed(query)
+                self._put_memory(key, content, model, vector)
+                return CachedResponse(content, model, "persistent"), vector
+
+        vector = None
+        if self.semantic:
+            vector = await self.embed(query)
+            entry = self._get_similar(scope, vector)
+            if entry:
+                self.stats.semantic_hits += 1
+                return CachedResponse(entry.content, entry.model, "semantic"), vector
+
+        self.stats.misses += 1
+        return None, vector
+
+    async def set(
+        self,
+        query: str,
+        content: str,
+        model: str,
+        thread_id: Optional[str] = None,
+        vector: Optional[np.ndarray] = None,
+    ) -> None:
+        """
+        Cache a response in the in-process tier.
+
+        The persistent tier is populated by query logging, not here.
+
+        Args:
+            query: User's question
+            content: Generated answer
+            model: Model that produced the answer
+            thread_id: Thread the question was asked in, if any
+            vector: Query embedding returned by `lookup`, if already computed
+        """
+        if vector is None:
+            vector = await self.embed(query)
+        key = (str(thread_id or ""), query_hash(query))
+        self._put_memory(key, content, model, vector)
+
+    async def embed(self, query: str) -> Optional[np.ndarray]:
+        """
+        Embed a normalized query for the semantic tier, off the event loop.
+
+        Returns:
+            The embedding, or None when the semantic tier is disabled
+        """
+        if not self.semantic:
+            return None
+
+        from app.textGeneration.embeddings import get_embeddings
+
+        embeddings = get_embeddings()
+        vector = await anyio.to_thread.run_sync(
+            lambda: embeddings.embed_query(normalize_query(query))
+        )
+        return np.asarray(vector, dtype=np.float32)
+
+    def clear(self) -> None:
+        """Drop all in-process entries."""
+        with self._lock:
+            self._entries.clear()
+            self._vectors.clear()
+
+    def _get_memory(self, key: Tuple[str, str]) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _put_memory(
+        self,
+        key: Tuple[str, str],
+        content: str,
+        model: str,
+        vector: Optional[np.ndarray],
+    ) -> None:
+        entry = _Entry(content, model, time.monotonic() + self.ttl_seconds)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            if vector is not None:
+                scope, hashed = key
+                if scope not in self._vectors:
+                    self._vectors[scope] = _ScopeVectors(len(vector))
+                self._vectors[scope].put(hashed, vector)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.stats.evictions += 1
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        """Drop an entry and its embedding. Caller holds the lock."""
+        del self._entries[key]
+        scope, hashed = key
+        vectors = self._vectors.get(scope)
+        if vectors is not None:
+            vectors.remove(hashed)
+            if not vectors:
+                del self._vectors[scope]
+
+    def _get_similar(self, scope: str, vector: np.ndarray) -> Optional[_Entry]:
+        now = time.monotonic()
+        with self._lock:
+            vectors = self._vectors.get(scope)
+            if vectors is None:
+                return None
+            scores = vectors.scores(vector)
+            for row in np.argsort(-scores):
+                if scores[row] < self.semantic_threshold:
+                    break
+                entry = self._entries[(scope, vectors.keys[row])]
+                if entry.expires_at >= now:
+                    return entry
+        return None
+
+
+async def _lookup_query_log(
+    thread_id: str, cache_key: str, max_age_seconds: float
+) -> Optional[Tuple[str, str]]:
+    """
+    Return the newest generated (answer, model) for this thread and query hash.
+
+    Logged cache hits are skipped, so the TTL counts from when an answer was
+    generated, not from when it was last served.
+    """
+    from app.core.async_database import execute_query
+
+    try:
+        row = await execute_query(
+            """
+            SELECT query_response, model FROM query_logs
+            WHERE thread_id = $1::uuid AND query_hash = $2 AND NOT cached
+              AND created_at > NOW() - make_interval(secs => $3)
+            ORDER BY created_at DESC
+            LIMIT 1
+            """,
+            thread_id,
+            cache_key,
+            max_age_seconds,
+            fetch_one=True,
+        )
+    except Exception as e:
+        logger.warning(f"Persistent cache lookup failed: {e}")
+        return None
+    if not row:
+        return None
+    # Rows logged before the model column was added were all answered by the
+    # default model
+    return row["query_response"], row["model"] or settings.LLM_MODEL
+
+
+# Global response cache
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Get the shared response cache, configured from settings.
+
+    Returns:
+        ResponseCache: The shared cache
+    """
+    global _response_cache
+
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+            persistent=settings.LLM_CACHE_PERSISTENT,
+            semantic=settings.LLM_CACHE_SEMANTIC,
+            semantic_threshold=settings.LLM_CACHE_SEMANTIC_THRESHOLD,
+        )
+    return _response_cache
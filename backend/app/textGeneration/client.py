@@ -0,0 +1,187 @@
+"""
+Shared LLM client management.
+
+This module owns one chat model instance per registered model (see
+app.textGeneration.routing), all sharing keep-alive HTTP connection pools for
+the lifetime of the application, so requests reuse established connections
+instead of constructing a new client per call.
+"""
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Dict, Optional
+
+from app.core.config import settings
+from app.textGeneration.resilience import CircuitBreaker
+from app.textGeneration.routing import ModelSpec, get_model_registry
+
+if TYPE_CHECKING:
+    import httpx
+    from langchain_core.language_models.chat_models import BaseChatModel
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class LLMClientManager:
+    """Owns the chat models and the HTTP connection pools they send requests on."""
+
+    def __init__(self, provider: Optional[str] = None):
+        self.provider = provider or settings.LLM_PROVIDER
+        # One chat model per model name, all on the same pools
+        self._models: Dict[str, "BaseChatModel"] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._http_client: Optional["httpx.Client"] = None
+        self._http_async_client: Optional["httpx.AsyncClient"] = None
+        # Bounds in-flight async completions (across models) so a spike
+        # queues instead of exhausting the HTTP pool
+        self.semaphore = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+
+    @property
+    def is_started(self) -> bool:
+        return bool(self._models)
+
+    @property
+    def llm(self) -> "BaseChatModel":
+        """The default model, started on first access if necessary."""
+        return self.chat_model(get_model_registry().default)
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        """The default model's circuit breaker."""
+        return self.breaker_for(get_model_registry().default.model)
+
+    def breaker_for(self, model: str) -> CircuitBreaker:
+        """
+        The circuit breaker of one model.
+
+        Shared by every call to that model, so failures fail fast; a throttled
+        model does not shed calls to the others.
+        """
+        breaker = self._breakers.get(model)
+        if breaker is None:
+            breaker = self._breakers.setdefault(model, CircuitBreaker())
+        return breaker
+
+    def chat_model(self, spec: ModelSpec) -> "BaseChatModel":
+        """The chat model for a spec, created on first use."""
+        llm = self._models.get(spec.model)
+        if llm is None:
+            self.start()
+            llm = self._models.get(spec.model)
+            if llm is None:
+                llm = self._models[spec.model] = self._create(spec)
+        return llm
+
+    def start(self) -> None:
+        """
+        Create the HTTP pools and the default chat model bound to them.
+
+        The provider SDK (and LangChain behind it) is imported here rather
+        than at module import, so importing the app stays fast; the lifespan
+        hook calls this at startup. Other models are created on first use.
+        """
+        if self._models:
+            return
+
+        if self.provider == "groq":
+            import httpx
+
+            limits = httpx.Limits(
+                max_connections=settings.LLM_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_POOL_MAX_KEEPALIVE,
+                keepalive_expiry=settings.LLM_POOL_KEEPALIVE_EXPIRY,
+            )
+            timeout = httpx.Timeout(settings.LLM_REQUEST_TIMEOUT)
+            self._http_client = httpx.Client(limits=limits, timeout=timeout)
+            self._http_async_client = httpx.AsyncClient(limits=limits, timeout=timeout)
+        elif self.provider != "fake":
+            raise ValueError(f"Unknown LLM provider: {self.provider}")
+
+        default = get_model_registry().default
+        self._models[default.model] = self._create(default)
+
+        logger.info(
+            f"LLM client started (provider={self.provider}, "
+            f"max_connections={settings.LLM_POOL_MAX_CONNECTIONS})"
+        )
+
+    def _create(self, spec: ModelSpec) -> "BaseChatModel":
+        """Create the provider's chat model for a spec."""
+        if self.provider == "fake":
+            from app.textGeneration.fake import FakeChatModel
+
+            failing = spec.model in settings.FAKE_LLM_FAILING_MODELS
+            return FakeChatModel(
+                model_name=spec.model,
+                latency_ms=settings.FAKE_LLM_LATENCY_MS,
+                failure_status=settings.FAKE_LLM_FAILURE_STATUS if failing else None,
+            )
+
+        from langchain_groq import ChatGroq
+
+        return ChatGroq(
+            model=spec.model,
+            temperature=spec.temperature,
+            max_tokens=spec.max_tokens,
+            # Retries happen in resilience.call_with_retries, with jitter
+            # and behind the circuit breaker
+            max_retries=0,
+            http_client=self._http_client,
+            http_async_client=self._http_async_client,
+        )
+
+    async def aclose(self) -> None:
+        """Close the HTTP pools and drop the chat models."""
+        if self._http_client:
+            self._http_client.close()
+        if self._http_async_client:
+            await self._http_async_client.aclose()
+        self._http_client = None
+        self._http_async_client = None
+        self._models.clear()
+        logger.info("LLM client closed")
+
+
+# Global client manager
+_client_manager: Optional[LLMClientManager] = None
+
+
+def init_llm_client(provider: Optional[str] = None) -> LLMClientManager:
+    """
+    Initialize the shared LLM client.
+
+    Args:
+        provider: Provider name, defaults to settings.LLM_PROVIDER
+
+    Returns:
+        LLMClientManager: The started client manager
+    """
+    global _client_manager
+
+    _client_manager = LLMClientManager(provider)
+    _client_manager.start()
+    return _client_manager
+
+
+def get_llm_client() -> LLMClientManager:
+    """
+    Get the shared LLM client, initializing it on first use.
+
+    Returns:
+        LLMClientManager: The shared client manager
+    """
+    global _client_manager
+
+    if _client_manager is None:
+        init_llm_client()
+    return _client_manager
+
+
+async def close_llm_client() -> None:
+    """Close the shared LLM client and its connection pools."""
+    global _client_manager
+
+    if _client_manager:
+        await _client_manager.aclose()
+        _client_manager = None
@@ -0,0 +1,78 @@
+"""
+Text embedding providers.
+
+The default provider is a deterministic feature-hashing embedder that runs
+offline with no model download. Any langchain `Embeddings` implementation can
+be installed in its place via `set_embeddings`.
+"""
+
+import re
+import zlib
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from app.core.config import settings
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class HashingEmbeddings(Embeddings):
+    """Hashes word unigrams and bigrams into a fixed-size, L2-normalized vector."""
+
+    def __init__(self, dimensions: int = 384):
+        self.dimensions = dimensions
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        tokens = _TOKEN_PATTERN.findall(text.lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        if features:
+            hashes = np.fromiter(
+                (zlib.crc32(feature.encode()) for feature in features),
+                dtype=np.uint32,
+                count=len(features),
+            )
+            signs = np.where(hashes & 1, 1.0, -1.0).astype(np.float32)
+            np.add.at(vector, (hashes >> 1) % self.dimensions, signs)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text).tolist() for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text).tolist()
+
+
+# Global embeddings provider
+_embeddings: Optional[Embeddings] = None
+
+
+def get_embeddings() -> Embeddings:
+    """
+    Get the configured embeddings provider.
+
+    Returns:
+        Embeddings: The shared embeddings provider
+
+    Raises:
+        ValueError: If settings.EMBEDDING_PROVIDER is not recognised
+    """
+    global _embeddings
+
+    if _embeddings is None:
+        if settings.EMBEDDING_PROVIDER != "hashing":
+            raise ValueError(
+                f"Unknown embedding provider: {settings.EMBEDDING_PROVIDER}"
+            )
+        _embeddings = HashingEmbeddings(settings.EMBEDDING_DIMENSIONS)
+    return _embeddings
+
+
+def set_embeddings(embeddings: Embeddings) -> None:
+    """Install a custom embeddings provider (e.g. a hosted model)."""
+    global _embeddings
+
+    _embeddings = embeddings
@@ -0,0 +1,93 @@
+"""
+Fake chat model used as an offline stand-in for Groq.
+
+Echoes the last user message back after an optional injected latency, so the
+LLM code paths can be exercised and benchmarked without network access. A
+model can also be made to fail every call with an HTTP status, to exercise
+retries, the circuit breaker and model fallback.
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+class FakeUpstreamError(Exception):
+    """An error response from the fake upstream."""
+
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+        super().__init__(f"Fake upstream returned HTTP {status_code}")
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model that answers with a canned echo of the prompt."""
+
+    model_name: str = "fake-model"
+    latency_ms: float = 0.0
+    tokens_per_second: Optional[float] = None
+    # Every call fails with this status after the latency, if set
+    failure_status: Optional[int] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _reply(self, messages: List[BaseMessage]) -> str:
+        if self.failure_status is not None:
+            raise FakeUpstreamError(self.failure_status)
+        prompt = messages[-1].content if messages else ""
+        return f"Echo: {prompt}"
+
+    def _token_delay(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second else 0.0
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self.latency_ms / 1000)
+        message = AIMessage(content=self._reply(messages))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep(self.latency_ms / 1000)
+        message = AIMessage(content=self._reply(messages))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.latency_ms / 1000)
+        for token in self._reply(messages).split(" "):
+            time.sleep(self._token_delay())
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token + " "))
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.latency_ms / 1000)
+        for token in self._reply(messages).split(" "):
+            await asyncio.sleep(self._token_delay())
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token + " "))
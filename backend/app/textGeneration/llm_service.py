@@ -2,14 +2,81 @@
 Simple LLM service using langchain-groq.
 """
 
-from langchain_groq import ChatGroq
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, List, Optional, Sequence, Tuple
 
-MODEL = "openai/gpt-oss-120b"
+import anyio
+
+from app.core.config import settings
+from app.core.metrics import REGISTRY, timer
+from app.ingestion.chunking import count_tokens
+from app.textGeneration.cache import get_response_cache, query_hash
+from app.textGeneration.client import get_llm_client
+from app.textGeneration.rag import retrieve_context
+from app.textGeneration.resilience import call_with_retries, is_retryable
+from app.textGeneration.routing import ModelSpec, get_model_registry, should_fall_back
+from app.textGeneration.singleflight import SingleFlight
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Coalesces identical in-flight upstream calls within this worker
+flights = SingleFlight()
+
+LLM_REQUEST_SECONDS = REGISTRY.histogram(
+    "llm_request_seconds",
+    "Upstream LLM call time, excluding the wait for a concurrency slot",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0),
+)
+LLM_TIME_TO_FIRST_TOKEN_SECONDS = REGISTRY.histogram(
+    "llm_time_to_first_token_seconds",
+    "Time from opening an upstream stream to its first token",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+
+@dataclass
+class StreamInfo:
+    """Where a streamed answer comes from, reported before its fragments."""
+
+    model: str
+    cached: bool = False
+    sources: List[dict] = field(default_factory=list)  # query_logs.results entries
+
+
+def _flight_key(query: str, thread_id: Optional[str]) -> str:
+    """Key identifying upstream calls that would produce the same completion."""
+    # Routing depends only on the query and its thread, so the registry's
+    # default model stands in for whichever model the call is routed to
+    default = get_model_registry().default
+    return ":".join(
+        [
+            str(thread_id or ""),
+            query_hash(query),
+            default.model,
+            str(default.temperature),
+            str(default.max_tokens),
+        ]
+    )
+
+
+def _usage_tokens(prompt: str, response) -> int:
+    """Tokens billed for a completion, estimated if the provider omits usage."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage and usage.get("total_tokens"):
+        return usage["total_tokens"]
+    return count_tokens(prompt) + count_tokens(response.content)
 
 
 def get_llm_response(query: str) -> object:
     """
-    Get LLM response using Groq.
+    Get LLM response using the shared Groq client, on the model the query
+    is routed to.
+
+    Blocks the calling thread; async callers should use aget_llm_response.
 
     Args:
         query: User's question
@@ -17,13 +84,325 @@ def get_llm_response(query: str) -> object:
     Returns:
         Generated response string
     """
-    llm = ChatGroq(
-        model=MODEL,
-        temperature=0.7,
-        max_tokens=8192,
-        max_retries=3,
-    )
+    client = get_llm_client()
+    spec = get_model_registry().route(query)
 
-    response = llm.invoke(query)
-    response.model = MODEL
+    response = client.chat_model(spec).invoke(query)
+    response.model = spec.model
     return response
+
+
+async def _complete(prompt: str, spec: ModelSpec) -> object:
+    """
+    Complete a prompt on a model, with retries behind the model's breaker.
+
+    If the registry has a fallback model, the routed model gets
+    settings.LLM_FALLBACK_RETRIES retries within settings.LLM_FALLBACK_TIMEOUT
+    seconds; when it times out or is throttled, the fallback model is called
+    instead.
+
+    Returns:
+        Generated response message, with `model` set to the model that answered
+    """
+    client = get_llm_client()
+    registry = get_model_registry()
+
+    async def _attempt(target: ModelSpec):
+        # The slot is held per attempt, not across retry backoff
+        async with client.semaphore:
+            with timer(LLM_REQUEST_SECONDS.labels(mode="invoke", model=target.model)):
+                return await client.chat_model(target).ainvoke(prompt)
+
+    def _call(target: ModelSpec, max_retries: Optional[int] = None):
+        return call_with_retries(
+            lambda: _attempt(target), client.breaker_for(target.model), max_retries
+        )
+
+    fallback = registry.fallback_for(spec)
+    if fallback is None:
+        response = await _call(spec)
+    else:
+        try:
+            response = await asyncio.wait_for(
+                _call(spec, settings.LLM_FALLBACK_RETRIES),
+                settings.LLM_FALLBACK_TIMEOUT,
+            )
+        except Exception as e:
+            if not should_fall_back(e):
+                raise
+            logger.warning(
+                f"{spec.model} unavailable ({e.__class__.__name__}), "
+                f"falling back to {fallback.model}"
+            )
+            registry.stats.fallbacks += 1
+            spec = fallback
+            response = await _call(spec)
+    response.model = spec.model
+    return response
+
+
+async def aget_llm_response(
+    query: str, thread_id: Optional[str] = None, timeout: Optional[float] = None
+) -> object:
+    """
+    Get LLM response without blocking the event loop.
+
+    Answers are served from the response cache when possible, and concurrent
+    identical queries share one upstream call. On a cache miss, queries with a
+    thread are grounded in the thread's content (see app.textGeneration.rag),
+    then routed to a model and retried on the fallback model if that one is
+    timing out or throttled (see app.textGeneration.routing). Concurrent
+    upstream calls are bounded by settings.LLM_MAX_CONCURRENCY; callers over
+    the limit wait for a slot, and that wait counts against the timeout.
+
+    Args:
+        query: User's question
+        thread_id: Thread the question was asked in, scopes the cache
+        timeout: Deadline in seconds, defaults to settings.LLM_QUERY_TIMEOUT
+
+    Returns:
+        Generated response message, with `model`, `cached`, `sources`
+        (query_logs.results entries) and `total_tokens` attributes
+
+    Raises:
+        asyncio.TimeoutError: If no response arrives before the deadline
+        CircuitOpenError: If the upstream is failing and calls are shed
+    """
+    cache = get_response_cache() if settings.LLM_CACHE_ENABLED else None
+    vector = None
+    if cache is not None:
+        cached, vector = await cache.lookup(query, thread_id)
+        if cached:
+            from langchain_core.messages import AIMessage
+
+            response = AIMessage(content=cached.content)
+            response.model = cached.model
+            response.cached = True
+            response.sources = []
+            response.total_tokens = 0
+            return response
+
+    async def _invoke():
+        context = await retrieve_context(query, thread_id)
+        spec = get_model_registry().route(query, context.context_tokens)
+        response = await _complete(context.prompt, spec)
+        response.cached = False
+        response.sources = context.results()
+        response.total_tokens = _usage_tokens(context.prompt, response)
+        if cache is not None:
+            await cache.set(query, response.content, response.model, thread_id, vector)
+        return response
+
+    if settings.LLM_COALESCE_ENABLED:
+        call = flights.do(_flight_key(query, thread_id), _invoke)
+    else:
+        call = _invoke()
+    return await asyncio.wait_for(call, timeout=timeout or settings.LLM_QUERY_TIMEOUT)
+
+
+async def abatch_llm_responses(
+    queries: Sequence[Tuple[str, Optional[str]]], concurrency: Optional[int] = None
+) -> AsyncIterator[Tuple[int, object]]:
+    """
+    Answer many queries concurrently, yielding each answer as it completes.
+
+    A fixed pool of `concurrency` tasks works through the queries, each
+    through aget_llm_response, so a batch shares the response cache, request
+    coalescing (duplicate queries cost one upstream call), the circuit
+    breaker and the one upstream client, and also waits for slots under
+    settings.LLM_MAX_CONCURRENCY with all other traffic. One failed query
+    does not stop the rest. Closing the iterator cancels unfinished queries.
+
+    Args:
+        queries: (query, thread_id) pairs
+        concurrency: Queries in flight, defaults to settings.LLM_BATCH_CONCURRENCY
+
+    Yields:
+        (index into queries, response or the exception it raised), in
+        completion order; responses also carry `duration_ms`
+    """
+    if not queries:
+        return
+    concurrency = min(concurrency or settings.LLM_BATCH_CONCURRENCY, len(queries))
+    results: asyncio.Queue = asyncio.Queue()
+    # Shared by the workers; each takes the next query when it is free
+    pending = iter(enumerate(queries))
+
+    async def worker() -> None:
+        for index, (query, thread_id) in pending:
+            start = time.perf_counter()
+            try:
+                result = await aget_llm_response(query, thread_id)
+                result.duration_ms = (time.perf_counter() - start) * 1000
+            except Exception as e:
+                result = e
+            await results.put((index, result))
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        for _ in range(len(queries)):
+            yield await results.get()
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+async def astream_llm_response(
+    query: str,
+    thread_id: Optional[str] = None,
+    on_start: Optional[Callable[[StreamInfo], None]] = None,
+) -> AsyncIterator[str]:
+    """
+    Stream LLM response tokens as the model emits them.
+
+    A cached answer is yielded as a single fragment. Otherwise concurrent
+    identical queries share one upstream stream, which holds a concurrency
+    slot while it runs. The query is routed like aget_llm_response; if the
+    routed model times out or is throttled before its first token, the
+    fallback model streams the answer instead. Once every consumer stops
+    iterating (e.g. clients disconnected and their tasks were cancelled), the
+    upstream stream is closed so the provider stops generating, and the
+    partial answer is not cached.
+
+    Args:
+        query: User's question
+        thread_id: Thread the question was asked in, scopes the cache
+        on_start: Called with a StreamInfo before the fragments of the
+            answer (again if the answer falls back to another model)
+
+    Yields:
+        Response text fragments in order
+    """
+    cache = get_response_cache() if settings.LLM_CACHE_ENABLED else None
+    vector = None
+    if cache is not None:
+        cached, vector = await cache.lookup(query, thread_id)
+        if cached:
+            if on_start:
+                on_start(StreamInfo(cached.model, cached=True))
+            yield cached.content
+            return
+
+    fragments = []
+    model = get_model_registry().default.model
+    if settings.LLM_COALESCE_ENABLED:
+        stream = flights.stream(
+            _flight_key(query, thread_id), lambda: _upstream_stream(query, thread_id)
+        )
+    else:
+        stream = _upstream_stream(query, thread_id)
+
+    async for fragment in stream:
+        # The upstream announces each model it starts streaming from
+        if isinstance(fragment, StreamInfo):
+            model = fragment.model
+            if on_start:
+                on_start(fragment)
+            continue
+        fragments.append(fragment)
+        yield fragment
+
+    if cache is not None:
+        await cache.set(query, "".join(fragments), model, thread_id, vector)
+
+
+def upstream_retry_after(query: str) -> Optional[float]:
+    """
+    Seconds until a model may take `query`, or None if one can take it now.
+
+    Checks the circuit breakers of every model the query may be routed to
+    and of the fallback model; any of them not open means the query can be
+    answered.
+
+    Args:
+        query: User's question
+
+    Returns:
+        Shortest wait until an open circuit lets a trial call through, or None
+    """
+    client = get_llm_client()
+    registry = get_model_registry()
+    waits = []
+    for spec in registry.candidates(query):
+        for target in (spec, registry.fallback_for(spec)):
+            if target is None:
+                continue
+            breaker = client.breaker_for(target.model)
+            if breaker.state != "open":
+                return None
+            waits.append(breaker.retry_after)
+    return min(waits)
+
+
+async def _upstream_stream(query: str, thread_id: Optional[str]) -> AsyncIterator:
+    """
+    Stream fragments from the routed model, or from the fallback model if the
+    routed one fails with nothing streamed yet.
+
+    Yields a StreamInfo for a model before the fragments it generates.
+    """
+    registry = get_model_registry()
+    context = await retrieve_context(query, thread_id)
+    spec = registry.route(query, context.context_tokens)
+    fallback = registry.fallback_for(spec)
+
+    streamed = False
+    try:
+        yield StreamInfo(spec.model, sources=context.results())
+        async for fragment in _model_stream(context.prompt, spec):
+            streamed = True
+            yield fragment
+        return
+    except Exception as e:
+        if streamed or fallback is None or not should_fall_back(e):
+            raise
+        logger.warning(
+            f"{spec.model} unavailable ({e.__class__.__name__}), "
+            f"falling back to {fallback.model}"
+        )
+        registry.stats.fallbacks += 1
+
+    yield StreamInfo(fallback.model, sources=context.results())
+    async for fragment in _model_stream(context.prompt, fallback):
+        yield fragment
+
+
+async def _model_stream(prompt: str, spec: ModelSpec) -> AsyncIterator[str]:
+    """Stream fragments from one model while holding a concurrency slot."""
+    client = get_llm_client()
+    breaker = client.breaker_for(spec.model)
+
+    # Streams are not retried (tokens may already be on the wire), but their
+    # outcome still feeds the circuit breaker
+    breaker.before_call()
+    outcome = breaker.record_abandoned
+
+    async with client.semaphore:
+        start = time.perf_counter()
+        first_token = True
+        stream = client.chat_model(spec).astream(prompt)
+        try:
+            async for chunk in stream:
+                if chunk.content:
+                    if first_token:
+                        LLM_TIME_TO_FIRST_TOKEN_SECONDS.observe(
+                            time.perf_counter() - start
+                        )
+                        first_token = False
+                    yield chunk.content
+            outcome = breaker.record_success
+        except Exception as e:
+            if is_retryable(e):
+                outcome = breaker.record_failure
+            else:
+                outcome = breaker.record_success
+            raise
+        finally:
+            outcome()
+            LLM_REQUEST_SECONDS.labels(mode="stream", model=spec.model).observe(
+                time.perf_counter() - start
+            )
+            # Shielded so closing the upstream survives our own cancellation
+            with anyio.CancelScope(shield=True):
+                await stream.aclose()
@@ -0,0 +1,158 @@
+"""
+Retrieval-augmented prompt construction.
+
+For a query asked in a thread, retrieves the thread's most relevant chunks,
+drops duplicates, and packs them into a fixed token budget so prompt size (and
+with it latency and cost) stays predictable. Chunk sizes come from the stored
+`token_count` columns, so nothing is re-tokenized at request time.
+"""
+
+import logging
+import math
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+import anyio
+
+from app.core.config import settings
+from app.core.metrics import REGISTRY, timer
+from app.retrieval.vector import RetrievedChunk
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+PROMPT_TEMPLATE = """You are a teaching assistant answering a student's question on a course Q&A forum.
+Answer using the course material below, citing sources by number like [1].
+If the material does not contain the answer, say so before answering from general knowledge.
+
+Course material:
+{context}
+
+Question: {query}"""
+
+RAG_RETRIEVAL_SECONDS = REGISTRY.histogram(
+    "rag_retrieval_seconds", "Time retrieving context chunks for a query"
+)
+
+# Tokens added per packed chunk for its "[n] " label and separating newline
+CHUNK_OVERHEAD_TOKENS = 4
+
+
+@dataclass
+class RagContext:
+    """A grounded prompt and the chunks it was built from."""
+
+    prompt: str
+    sources: List[RetrievedChunk] = field(default_factory=list)
+    context_tokens: int = 0
+
+    def results(self) -> List[dict]:
+        """Sources in the shape stored in query_logs.results."""
+        return [chunk.as_result() for chunk in self.sources]
+
+
+def chunk_tokens(chunk: RetrievedChunk) -> int:
+    """Stored token count, or a conservative character-based estimate."""
+    if chunk.token_count is not None:
+        return chunk.token_count
+    return math.ceil(len(chunk.text) / 3)
+
+
+def pack_chunks(
+    chunks: Sequence[RetrievedChunk], budget_tokens: int
+) -> List[RetrievedChunk]:
+    """
+    Select the best chunks that fit in a token budget.
+
+    Chunks are taken in descending score order. Repeats of the same source or
+    of identical text (e.g. a post quoted in a document) are dropped, and a
+    chunk too large for the remaining budget is skipped so smaller,
+    lower-ranked chunks can still fill it.
+
+    Args:
+        chunks: Retrieved chunks, any order
+        budget_tokens: Maximum tokens for packed chunks, including labels
+
+    Returns:
+        Packed chunks in descending score order
+    """
+    packed: List[RetrievedChunk] = []
+    seen_sources, seen_texts = set(), set()
+    remaining = budget_tokens
+
+    for chunk in sorted(chunks, key=lambda c: c.score, reverse=True):
+        text = " ".join(chunk.text.split())
+        source = (chunk.source_type, chunk.source_id)
+        if not text or source in seen_sources or text in seen_texts:
+            continue
+
+        cost = chunk_tokens(chunk) + CHUNK_OVERHEAD_TOKENS
+        if cost > remaining:
+            continue
+
+        packed.append(chunk)
+        seen_sources.add(source)
+        seen_texts.add(text)
+        remaining -= cost
+        if remaining <= CHUNK_OVERHEAD_TOKENS:
+            break
+
+    return packed
+
+
+def build_prompt(query: str, chunks: Sequence[RetrievedChunk]) -> str:
+    """Render the grounded prompt with numbered sources."""
+    context = "\n".join(
+        f"[{i}] {chunk.text.strip()}" for i, chunk in enumerate(chunks, start=1)
+    )
+    return PROMPT_TEMPLATE.format(context=context, query=query)
+
+
+async def retrieve_context(
+    query: str,
+    thread_id: Optional[str],
+    k: Optional[int] = None,
+    budget_tokens: Optional[int] = None,
+) -> RagContext:
+    """
+    Build the prompt for a query, grounded in its thread's content.
+
+    Without a thread, with RAG disabled, or if retrieval fails, the query is
+    used as the prompt unchanged.
+
+    Args:
+        query: User's question
+        thread_id: Thread to retrieve from
+        k: Chunks to retrieve, defaults to settings.RAG_TOP_K
+        budget_tokens: Context budget, defaults to settings.RAG_CONTEXT_TOKENS
+
+    Returns:
+        RagContext with the prompt and the sources packed into it
+    """
+    if not thread_id or not settings.RAG_ENABLED:
+        return RagContext(prompt=query)
+
+    from app.retrieval.hybrid import hybrid_search
+
+    k = k or settings.RAG_TOP_K
+    budget_tokens = budget_tokens or settings.RAG_CONTEXT_TOKENS
+
+    try:
+        # Retrieval uses the sync database pool, so keep it off the event loop
+        with timer(RAG_RETRIEVAL_SECONDS):
+            chunks = await anyio.to_thread.run_sync(
+                lambda: hybrid_search(query, str(thread_id), k)
+            )
+    except Exception as e:
+        logger.warning(f"Retrieval failed, answering without context: {e}")
+        return RagContext(prompt=query)
+
+    packed = pack_chunks(chunks, budget_tokens)
+    if not packed:
+        return RagContext(prompt=query)
+
+    return RagContext(
+        prompt=build_prompt(query, packed),
+        sources=packed,
+        context_tokens=sum(chunk_tokens(c) + CHUNK_OVERHEAD_TOKENS for c in packed),
+    )
@@ -0,0 +1,190 @@
+"""
+Retry policy and circuit breaker for upstream LLM calls.
+
+The provider SDK's own retries (immediate, unjittered, per call) multiply load
+exactly when the upstream is throttling. Instead, calls are retried here with
+capped exponential backoff and full jitter, honoring any Retry-After the
+provider sends, and a circuit breaker fails calls fast once the upstream has
+failed repeatedly, probing with a single call after a cool-down.
+"""
+
+import asyncio
+import logging
+import random
+import sys
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from app.core.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream that is failing."""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"LLM upstream unavailable, retry in {retry_after:.1f}s")
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures.
+
+    While open, calls fail immediately with CircuitOpenError. After
+    `reset_timeout` seconds one trial call is let through (half-open); its
+    success closes the circuit and its failure re-opens it.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: Optional[int] = None,
+        reset_timeout: Optional[float] = None,
+    ):
+        self.failure_threshold = (
+            failure_threshold or settings.LLM_BREAKER_FAILURE_THRESHOLD
+        )
+        self.reset_timeout = reset_timeout or settings.LLM_BREAKER_RESET_SECONDS
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until an open circuit lets a trial call through."""
+        if self.opened_at is None:
+            return 0.0
+        return max(self.reset_timeout - (time.monotonic() - self.opened_at), 1.0)
+
+    def before_call(self) -> None:
+        """
+        Admit a call, or raise if the circuit is open.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a trial
+                call already in flight
+        """
+        state = self.state
+        if state == "closed":
+            return
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return
+        raise CircuitOpenError(self.retry_after)
+
+    def record_success(self) -> None:
+        if self.opened_at is not None:
+            logger.info("LLM circuit closed")
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._trial_in_flight or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.warning(
+                    f"LLM circuit opened after {self.failures} consecutive failures"
+                )
+            self.opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+    def record_abandoned(self) -> None:
+        """A call was cancelled before it succeeded or failed."""
+        self._trial_in_flight = False
+
+    def as_dict(self) -> dict:
+        return {"state": self.state, "consecutive_failures": self.failures}
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether an upstream error is transient (throttling, 5xx, network)."""
+    # httpx is loaded by the provider client; an httpx error implies it is
+    httpx = sys.modules.get("httpx")
+    if httpx and isinstance(error, (httpx.TimeoutException, httpx.NetworkError)):
+        return True
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    # Provider SDK connection and timeout errors carry no status code
+    return type(error).__name__ in ("APIConnectionError", "APITimeoutError")
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """The Retry-After hint from an upstream error response, if any."""
+    response = getattr(error, "response", None)
+    value = getattr(response, "headers", {}).get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def backoff_delay(attempt: int) -> float:
+    """Capped exponential backoff with full jitter, for retry number `attempt`."""
+    cap = min(settings.LLM_RETRY_MAX_DELAY, settings.LLM_RETRY_BASE_DELAY * 2**attempt)
+    return random.uniform(0, cap)
+
+
+async def call_with_retries(
+    fn: Callable[[], Awaitable[T]],
+    breaker: CircuitBreaker,
+    max_retries: Optional[int] = None,
+) -> T:
+    """
+    Call an upstream with jittered retries behind a circuit breaker.
+
+    Args:
+        fn: Makes one upstream call
+        breaker: Breaker guarding the upstream
+        max_retries: Retries after the first attempt, defaults to
+            settings.LLM_MAX_RETRIES
+
+    Returns:
+        The result of the first successful call
+
+    Raises:
+        CircuitOpenError: If the breaker is open
+        Exception: The last upstream error, once retries are exhausted or the
+            error is not retryable
+    """
+    max_retries = settings.LLM_MAX_RETRIES if max_retries is None else max_retries
+
+    for attempt in range(max_retries + 1):
+        breaker.before_call()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            breaker.record_abandoned()
+            raise
+        except Exception as e:
+            if not is_retryable(e):
+                # The upstream answered; the request itself was bad
+                breaker.record_success()
+                raise
+            breaker.record_failure()
+            if attempt == max_retries:
+                raise
+            delay = max(backoff_delay(attempt), retry_after_seconds(e) or 0)
+            logger.warning(
+                f"LLM call failed ({e.__class__.__name__}), "
+                f"retry {attempt + 1}/{max_retries} in {delay:.2f}s"
+            )
+            await asyncio.sleep(delay)
+        else:
+            breaker.record_success()
+            return result
@@ -0,0 +1,204 @@
+"""
+Model registry and per-query routing.
+
+Every model the app can call is described by a ModelSpec registered under a
+role:
+- default (settings.LLM_MODEL): the large model, answers anything not routed
+  elsewhere;
+- fast (settings.LLM_FAST_MODEL): a cheaper, faster model for short queries
+  whose prompt carries little or no retrieved context;
+- fallback (settings.LLM_FALLBACK_MODEL): tried once when the routed model
+  times out, is throttled or has its circuit open.
+An empty model name leaves that role out. All models are served by the
+configured provider (settings.LLM_PROVIDER), through one LLMClientManager.
+"""
+
+import asyncio
+import logging
+import sys
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, List, Optional
+
+from app.core.config import settings
+from app.ingestion.chunking import count_tokens
+from app.textGeneration.resilience import CircuitOpenError
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+DEFAULT = "default"
+FAST = "fast"
+FALLBACK = "fallback"
+
+# Upstream responses meaning "busy", not "bad request"
+FALLBACK_STATUS_CODES = {408, 429, 503, 504}
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    """A model and the generation parameters it is called with."""
+
+    role: str
+    model: str
+    temperature: float
+    max_tokens: int
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class RoutingStats:
+    """Counters for routing decisions and fallbacks."""
+
+    default: int = 0
+    fast: int = 0
+    fallbacks: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class ModelRegistry:
+    """The models available to this deployment, keyed by role."""
+
+    def __init__(self, specs: List[ModelSpec]):
+        self._specs: Dict[str, ModelSpec] = {spec.role: spec for spec in specs}
+        if DEFAULT not in self._specs:
+            raise ValueError("A model registry needs a default model")
+        self.stats = RoutingStats()
+
+    @classmethod
+    def from_settings(cls) -> "ModelRegistry":
+        """Build the registry from the LLM_* settings."""
+        specs = [
+            ModelSpec(
+                DEFAULT,
+                settings.LLM_MODEL,
+                settings.LLM_TEMPERATURE,
+                settings.LLM_MAX_TOKENS,
+            )
+        ]
+        if settings.LLM_FAST_MODEL:
+            specs.append(
+                ModelSpec(
+                    FAST,
+                    settings.LLM_FAST_MODEL,
+                    settings.LLM_TEMPERATURE,
+                    settings.LLM_FAST_MAX_TOKENS,
+                )
+            )
+        if settings.LLM_FALLBACK_MODEL:
+            specs.append(
+                ModelSpec(
+                    FALLBACK,
+                    settings.LLM_FALLBACK_MODEL,
+                    settings.LLM_TEMPERATURE,
+                    settings.LLM_MAX_TOKENS,
+                )
+            )
+        return cls(specs)
+
+    @property
+    def default(self) -> ModelSpec:
+        return self._specs[DEFAULT]
+
+    def get(self, role: str) -> Optional[ModelSpec]:
+        return self._specs.get(role)
+
+    def __iter__(self) -> Iterator[ModelSpec]:
+        return iter(self._specs.values())
+
+    def route(self, query: str, context_tokens: int = 0) -> ModelSpec:
+        """
+        Pick the model for a query.
+
+        Short queries whose prompt holds at most
+        settings.LLM_ROUTE_FAST_CONTEXT_TOKENS of retrieved context go to the
+        fast model; everything else goes to the default model.
+
+        Args:
+            query: User's question
+            context_tokens: Tokens of retrieved context packed into the prompt
+
+        Returns:
+            ModelSpec to call
+        """
+        fast = self._fast_for(query)
+        if (
+            fast is not None
+            and context_tokens <= settings.LLM_ROUTE_FAST_CONTEXT_TOKENS
+        ):
+            self.stats.fast += 1
+            return fast
+        self.stats.default += 1
+        return self.default
+
+    def candidates(self, query: str) -> List[ModelSpec]:
+        """
+        The models `query` may be routed to before its context is retrieved.
+
+        Does not count as a routing decision.
+        """
+        fast = self._fast_for(query)
+        return [self.default] if fast is None else [fast, self.default]
+
+    def _fast_for(self, query: str) -> Optional[ModelSpec]:
+        """The fast model, if routing is on and the query is short enough."""
+        fast = self._specs.get(FAST)
+        if (
+            fast is not None
+            and settings.LLM_ROUTING_ENABLED
+            and count_tokens(query) <= settings.LLM_ROUTE_FAST_QUERY_TOKENS
+        ):
+            return fast
+        return None
+
+    def fallback_for(self, spec: ModelSpec) -> Optional[ModelSpec]:
+        """The model to retry on when `spec` is unavailable, if any."""
+        fallback = self._specs.get(FALLBACK)
+        if fallback is None or fallback.model == spec.model:
+            return None
+        return fallback
+
+    def as_dict(self) -> dict:
+        return {role: spec.model for role, spec in self._specs.items()}
+
+
+def should_fall_back(error: BaseException) -> bool:
+    """Whether an upstream error means the model is timing out or throttled."""
+    if isinstance(error, (asyncio.TimeoutError, CircuitOpenError)):
+        return True
+    httpx = sys.modules.get("httpx")
+    if httpx and isinstance(error, httpx.TimeoutException):
+        return True
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status in FALLBACK_STATUS_CODES
+    return type(error).__name__ == "APITimeoutError"
+
+
+# Global model registry
+_registry: Optional[ModelRegistry] = None
+
+
+def get_model_registry() -> ModelRegistry:
+    """
+    Get the model registry, building it from settings on first use.
+
+    Returns:
+        ModelRegistry: The shared registry
+    """
+    global _registry
+
+    if _registry is None:
+        _registry = ModelRegistry.from_settings()
+        logger.info(f"LLM models: {_registry.as_dict()}")
+    return _registry
+
+
+def set_model_registry(registry: Optional[ModelRegistry]) -> None:
+    """Install a registry (e.g. fake models in tests), or None to rebuild it."""
+    global _registry
+
+    _registry = registry
@@ -0,0 +1,151 @@
+"""
+Single-flight deduplication of concurrent identical LLM calls.
+
+When several requests for the same key arrive while a call is in flight, they
+all wait on that one call instead of issuing their own. Streams are shared the
+same way: late joiners replay the fragments produced so far, then follow live.
+"""
+
+import asyncio
+from dataclasses import asdict, dataclass
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class FlightStats:
+    """Counters for calls that started upstream work vs. joined an existing one."""
+
+    leaders: int = 0
+    followers: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class _Call:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class _SharedStream:
+    """Pumps one upstream iterator and replays it to every subscriber."""
+
+    def __init__(self, source: AsyncIterator[str]):
+        self.fragments: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.abandoned = False
+        self._changed = asyncio.Condition()
+        self.task = asyncio.ensure_future(self._pump(source))
+
+    async def _pump(self, source: AsyncIterator[str]) -> None:
+        try:
+            async for fragment in source:
+                self.fragments.append(fragment)
+                async with self._changed:
+                    self._changed.notify_all()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+            async with self._changed:
+                self._changed.notify_all()
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        self.subscribers += 1
+        position = 0
+        try:
+            while True:
+                if position < len(self.fragments):
+                    yield self.fragments[position]
+                    position += 1
+                elif self.done:
+                    if self.error:
+                        raise self.error
+                    return
+                else:
+                    async with self._changed:
+                        await self._changed.wait_for(
+                            lambda: position < len(self.fragments) or self.done
+                        )
+        finally:
+            self.subscribers -= 1
+            # Nobody is listening any more, stop paying for the generation
+            if self.subscribers == 0 and not self.done:
+                self.abandoned = True
+                self.task.cancel()
+
+
+class SingleFlight:
+    """Coalesces concurrent calls and streams that share a key."""
+
+    def __init__(self):
+        self.stats = FlightStats()
+        self._calls: Dict[str, _Call] = {}
+        self._streams: Dict[str, _SharedStream] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `fn` once for all concurrent callers with the same key.
+
+        The shared call is only cancelled once every waiter has gone away, so a
+        single caller timing out does not fail the others.
+
+        Args:
+            key: Deduplication key
+            fn: Zero-argument coroutine function producing the result
+
+        Returns:
+            The result of the shared call (or raises its exception)
+        """
+        call = self._calls.get(key)
+        if call is None:
+            self.stats.leaders += 1
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(self._calls, key, call))
+        else:
+            self.stats.followers += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                self._forget(self._calls, key, call)
+                call.task.cancel()
+
+    def stream(
+        self, key: str, fn: Callable[[], AsyncIterator[str]]
+    ) -> AsyncIterator[str]:
+        """
+        Share one upstream stream among all concurrent callers with the same key.
+
+        Args:
+            key: Deduplication key
+            fn: Zero-argument function returning the upstream async iterator
+
+        Returns:
+            An async iterator over every fragment of the shared stream
+        """
+        shared = self._streams.get(key)
+        if shared is None or shared.abandoned:
+            self.stats.leaders += 1
+            shared = _SharedStream(fn())
+            self._streams[key] = shared
+            shared.task.add_done_callback(
+                lambda _: self._forget(self._streams, key, shared)
+            )
+        else:
+            self.stats.followers += 1
+        return shared.subscribe()
+
+    @staticmethod
+    def _forget(table: dict, key: str, value) -> None:
+        if table.get(key) is value:
+            del table[key]
@@ -0,0 +1,530 @@
+"""
+Precomputed post and thread summaries.
+
+Summaries live in `summary_cache`, one row per post and one per thread
+(post_id NULL). Reads never wait on the LLM: a fresh summary is returned as
+is, a stale one is returned immediately while a background refresh is
+scheduled (stale-while-revalidate), and a missing one is reported as pending
+with its first computation scheduled.
+
+A summary is stale when a chunk in its scope was inserted or updated after
+its `last_computed_as`, or when one of its `source_chunks` no longer exists.
+`last_computed_as` is the time the sources were read, not the time the
+summary was written, so edits made while a summary is generating still mark
+it stale.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Protocol, Tuple
+
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+from app.retrieval.vector import RetrievedChunk
+from app.textGeneration.rag import CHUNK_OVERHEAD_TOKENS, chunk_tokens
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = """Summarize the following discussion from a course Q&A forum for a student who has not read it.
+State the question, the accepted or best-supported answer, and any unresolved points.
+Be concise and do not add information that is not in the discussion.
+
+Discussion:
+{context}"""
+
+SUMMARY_REFRESH_SECONDS = REGISTRY.histogram(
+    "summary_refresh_seconds",
+    "Time recomputing one summary, from reading sources to saving",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0),
+)
+
+SummaryKey = Tuple[str, Optional[str]]
+Summarizer = Callable[[str], Awaitable[str]]
+
+
+@dataclass
+class Summary:
+    """A summary_cache row."""
+
+    thread_id: str
+    post_id: Optional[str]
+    text: str
+    source_chunks: List[dict]
+    computed_at: datetime
+    # None until the summary is validated against its sources
+    validation_label: Optional[str] = None
+    summary_confidence: Optional[float] = None
+    validation_confidence: Optional[float] = None
+    stale: bool = False
+
+
+@dataclass
+class SummarySources:
+    """The chunks a summary is computed from, as of one point in time."""
+
+    chunks: List[RetrievedChunk]
+    as_of: datetime
+
+
+@dataclass
+class SummaryStats:
+    """Counters for summary reads and background refreshes."""
+
+    fresh_hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    scheduled: int = 0
+    dropped: int = 0
+    refreshed: int = 0
+    enqueued: int = 0
+    failed: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class SummaryStore(Protocol):
+    """Persistence for summaries and the chunks they summarize."""
+
+    async def get(self, thread_id: str, post_id: Optional[str]) -> Optional[Summary]:
+        """The stored summary with its `stale` flag set, or None."""
+        ...
+
+    async def load_sources(
+        self, thread_id: str, post_id: Optional[str]
+    ) -> SummarySources:
+        """Chunks in the summary's scope, in reading order."""
+        ...
+
+    async def save(self, summary: Summary) -> None:
+        """Upsert a summary unless a newer one is already stored."""
+        ...
+
+
+class PostgresSummaryStore:
+    """Summaries in summary_cache, summarizing post_chunks."""
+
+    async def get(self, thread_id: str, post_id: Optional[str]) -> Optional[Summary]:
+        from app.core.async_database import execute_query
+
+        row = await execute_query(
+            """
+            SELECT s.summary_text, s.source_chunks, s.last_computed_as,
+                   s.validation_label::text AS validation_label,
+                   s.summary_confidence, s.validation_confidence,
+                   EXISTS (
+                       SELECT 1 FROM post_chunks pc
+                       WHERE pc.thread_id = s.thread_id
+                         AND (s.post_id IS NULL OR pc.post_id = s.post_id)
+                         AND pc.updated_at > s.last_computed_as
+                   )
+                   OR (
+                       SELECT COUNT(*) FROM post_chunks pc
+                       WHERE pc.id IN (
+                           SELECT (c->>'source_id')::uuid
+                           FROM jsonb_array_elements(s.source_chunks) c
+                       )
+                   ) < jsonb_array_length(s.source_chunks) AS stale
+            FROM summary_cache s
+            WHERE s.thread_id = $1::uuid AND s.post_id IS NOT DISTINCT FROM $2::uuid
+            """,
+            thread_id,
+            post_id,
+            fetch_one=True,
+        )
+        if row is None:
+            return None
+
+        return Summary(
+            thread_id=thread_id,
+            post_id=post_id,
+            text=row["summary_text"],
+            source_chunks=row["source_chunks"],
+            computed_at=row["last_computed_as"],
+            validation_label=row["validation_label"],
+            summary_confidence=row["summary_confidence"],
+            validation_confidence=row["validation_confidence"],
+            stale=row["stale"],
+        )
+
+    async def load_sources(
+        self, thread_id: str, post_id: Optional[str]
+    ) -> SummarySources:
+        from app.core.async_database import execute_query
+
+        rows = await execute_query(
+            """
+            SELECT pc.id, pc.thread_id, pc.text_chunk, pc.token_count,
+                   NOW() AS as_of
+            FROM post_chunks pc
+            JOIN posts p ON p.id = pc.post_id
+            WHERE pc.thread_id = $1::uuid
+              AND ($2::uuid IS NULL OR pc.post_id = $2::uuid)
+            ORDER BY p.created_at, pc.post_id, pc.chunk_index
+            """,
+            thread_id,
+            post_id,
+        )
+        chunks = [
+            RetrievedChunk(
+                source_type="post_chunk",
+                source_id=str(row["id"]),
+                thread_id=str(row["thread_id"]),
+                text=row["text_chunk"],
+                token_count=row["token_count"],
+                score=0.0,
+            )
+            for row in rows
+        ]
+        as_of = rows[0]["as_of"] if rows else datetime.now(timezone.utc)
+        return SummarySources(chunks=chunks, as_of=as_of)
+
+    async def save(self, summary: Summary) -> None:
+        from app.core.async_database import execute_statement
+
+        await execute_statement(
+            """
+            INSERT INTO summary_cache AS s
+                (thread_id, post_id, summary_text, summary_confidence,
+                 validation_label, validation_confidence, source_chunks,
+                 last_computed_as)
+            VALUES ($1::uuid, $2::uuid, $3, $4, $5::validation_label_enum, $6,
+                    $7::jsonb, $8)
+            ON CONFLICT (thread_id, post_id) DO UPDATE SET
+                summary_text = EXCLUDED.summary_text,
+                summary_confidence = EXCLUDED.summary_confidence,
+                validation_label = EXCLUDED.validation_label,
+                validation_confidence = EXCLUDED.validation_confidence,
+                source_chunks = EXCLUDED.source_chunks,
+                last_computed_as = EXCLUDED.last_computed_as
+            WHERE s.last_computed_as < EXCLUDED.last_computed_as
+            """,
+            summary.thread_id,
+            summary.post_id,
+            summary.text,
+            summary.summary_confidence,
+            summary.validation_label,
+            summary.validation_confidence,
+            summary.source_chunks,
+            summary.computed_at,
+        )
+
+
+@dataclass
+class _StoredChunk:
+    chunk: RetrievedChunk
+    post_id: str
+    updated_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class InMemorySummaryStore:
+    """Summaries and chunks held in this process, for development and benchmarks."""
+
+    def __init__(self):
+        self._summaries: Dict[SummaryKey, Summary] = {}
+        self._chunks: Dict[str, _StoredChunk] = {}
+
+    def put_chunk(self, chunk: RetrievedChunk, post_id: str) -> None:
+        """Insert or update a chunk, stamping it with the current time."""
+        self._chunks[chunk.source_id] = _StoredChunk(chunk, str(post_id))
+
+    def remove_chunk(self, source_id: str) -> None:
+        self._chunks.pop(source_id, None)
+
+    def _in_scope(self, thread_id: str, post_id: Optional[str]) -> List[_StoredChunk]:
+        return [
+            stored
+            for stored in self._chunks.values()
+            if stored.chunk.thread_id == thread_id
+            and (post_id is None or stored.post_id == post_id)
+        ]
+
+    async def get(self, thread_id: str, post_id: Optional[str]) -> Optional[Summary]:
+        summary = self._summaries.get((thread_id, post_id))
+        if summary is None:
+            return None
+
+        updated = any(
+            stored.updated_at > summary.computed_at
+            for stored in self._in_scope(thread_id, post_id)
+        )
+        missing = any(
+            source["source_id"] not in self._chunks for source in summary.source_chunks
+        )
+        return replace(summary, stale=updated or missing)
+
+    async def load_sources(
+        self, thread_id: str, post_id: Optional[str]
+    ) -> SummarySources:
+        as_of = datetime.now(timezone.utc)
+        chunks = [stored.chunk for stored in self._in_scope(thread_id, post_id)]
+        return SummarySources(chunks=chunks, as_of=as_of)
+
+    async def save(self, summary: Summary) -> None:
+        key = (summary.thread_id, summary.post_id)
+        current = self._summaries.get(key)
+        if current is None or current.computed_at < summary.computed_at:
+            self._summaries[key] = summary
+
+
+def build_summary_prompt(
+    chunks: List[RetrievedChunk], budget_tokens: int
+) -> Tuple[str, List[RetrievedChunk]]:
+    """
+    Render the summary prompt from chunks in reading order.
+
+    Chunks past the token budget are left out, so very long threads are
+    summarized from their beginning.
+
+    Returns:
+        The prompt and the chunks included in it
+    """
+    included: List[RetrievedChunk] = []
+    remaining = budget_tokens
+    for chunk in chunks:
+        cost = chunk_tokens(chunk) + CHUNK_OVERHEAD_TOKENS
+        if cost > remaining:
+            break
+        included.append(chunk)
+        remaining -= cost
+
+    context = "\n".join(chunk.text.strip() for chunk in included)
+    return SUMMARY_PROMPT.format(context=context), included
+
+
+async def llm_summarize(prompt: str) -> str:
+    """Generate a summary with the shared LLM client, with retries."""
+    from app.textGeneration.client import get_llm_client
+    from app.textGeneration.resilience import call_with_retries
+
+    client = get_llm_client()
+
+    async def _attempt():
+        async with client.semaphore:
+            return await client.llm.ainvoke(prompt)
+
+    response = await asyncio.wait_for(
+        call_with_retries(_attempt, client.breaker), settings.LLM_QUERY_TIMEOUT
+    )
+    return response.content
+
+
+class SummaryService:
+    """
+    Serves stored summaries and refreshes stale ones in the background.
+
+    With the Postgres job queue (settings.JOB_QUEUE_BACKEND), refreshes are
+    handed to the job workers as `refresh_summary` jobs, deduplicated per
+    summary across API processes; otherwise this process's own refresh tasks
+    compute them.
+    """
+
+    def __init__(
+        self,
+        store: Optional[SummaryStore] = None,
+        summarize: Optional[Summarizer] = None,
+        workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        retry_seconds: Optional[float] = None,
+    ):
+        if store is None:
+            if settings.SUMMARY_STORE == "postgres":
+                store = PostgresSummaryStore()
+            elif settings.SUMMARY_STORE == "memory":
+                store = InMemorySummaryStore()
+            else:
+                raise ValueError(f"Unknown summary store: {settings.SUMMARY_STORE}")
+        self.store = store
+        self.summarize = summarize or llm_summarize
+        self.workers = workers or settings.SUMMARY_WORKERS
+        self.retry_seconds = (
+            settings.SUMMARY_RETRY_SECONDS if retry_seconds is None else retry_seconds
+        )
+
+        self.stats = SummaryStats()
+        self._queue: asyncio.Queue = asyncio.Queue(
+            maxsize=max_pending or settings.SUMMARY_QUEUE_SIZE
+        )
+        # Keys queued or being refreshed, so each is refreshed once at a time
+        self._scheduled: set = set()
+        self._failed_at: Dict[SummaryKey, float] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def __len__(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        """Start the refresh workers on the running event loop."""
+        self._tasks = [task for task in self._tasks if not task.done()]
+        loop = asyncio.get_running_loop()
+        while len(self._tasks) < self.workers:
+            self._tasks.append(loop.create_task(self._run()))
+
+    async def get(
+        self, thread_id: str, post_id: Optional[str] = None
+    ) -> Optional[Summary]:
+        """
+        Get a summary without waiting for generation.
+
+        Stale and missing summaries are scheduled for a background refresh.
+
+        Args:
+            thread_id: Thread the summary belongs to
+            post_id: Post to summarize, or None for the whole thread
+
+        Returns:
+            The stored summary (check `stale`), or None if none is stored yet
+        """
+        thread_id = str(thread_id)
+        post_id = str(post_id) if post_id else None
+
+        summary = await self.store.get(thread_id, post_id)
+        if summary is None:
+            self.stats.misses += 1
+            self.schedule(thread_id, post_id)
+        elif summary.stale:
+            self.stats.stale_hits += 1
+            self.schedule(thread_id, post_id)
+        else:
+            self.stats.fresh_hits += 1
+        return summary
+
+    def schedule(self, thread_id: str, post_id: Optional[str] = None) -> bool:
+        """
+        Queue a refresh unless one is already pending or recently failed.
+
+        Returns:
+            bool: True if a refresh was queued
+        """
+        key = (str(thread_id), str(post_id) if post_id else None)
+        if key in self._scheduled:
+            return False
+        failed_at = self._failed_at.get(key)
+        if failed_at is not None and time.monotonic() - failed_at < self.retry_seconds:
+            return False
+
+        self.start()
+        try:
+            self._queue.put_nowait(key)
+        except asyncio.QueueFull:
+            self.stats.dropped += 1
+            return False
+        self._scheduled.add(key)
+        self.stats.scheduled += 1
+        return True
+
+    async def refresh(
+        self, thread_id: str, post_id: Optional[str] = None
+    ) -> Optional[Summary]:
+        """
+        Recompute and store a summary now.
+
+        Returns:
+            The new summary, or None if the scope has no chunks
+        """
+        start = time.perf_counter()
+        sources = await self.store.load_sources(thread_id, post_id)
+        if not sources.chunks:
+            return None
+
+        prompt, included = build_summary_prompt(
+            sources.chunks, settings.SUMMARY_CONTEXT_TOKENS
+        )
+        text = await self.summarize(prompt)
+        summary = Summary(
+            thread_id=thread_id,
+            post_id=post_id,
+            text=text,
+            source_chunks=[
+                {"source_type": c.source_type, "source_id": c.source_id}
+                for c in included
+            ],
+            computed_at=sources.as_of,
+        )
+        await self.store.save(summary)
+        SUMMARY_REFRESH_SECONDS.observe(time.perf_counter() - start)
+        return summary
+
+    async def _enqueue_refresh(self, thread_id: str, post_id: Optional[str]) -> None:
+        """Hand a refresh to the job workers, unless one is already queued."""
+        from app.jobs import enqueue
+
+        job_id = await asyncio.to_thread(
+            enqueue,
+            "refresh_summary",
+            {"thread_id": thread_id, "post_id": post_id},
+            dedupe_key=f"refresh_summary:{thread_id}:{post_id or ''}",
+        )
+        if job_id is not None:
+            self.stats.enqueued += 1
+
+    async def _run(self) -> None:
+        while True:
+            key = await self._queue.get()
+            try:
+                if settings.JOB_QUEUE_BACKEND == "postgres":
+                    await self._enqueue_refresh(*key)
+                else:
+                    await self.refresh(*key)
+                    self.stats.refreshed += 1
+                self._failed_at.pop(key, None)
+            except Exception as e:
+                self.stats.failed += 1
+                self._failed_at[key] = time.monotonic()
+                logger.warning(f"Failed to refresh summary {key}: {e}")
+            finally:
+                self._scheduled.discard(key)
+
+    async def close(self) -> None:
+        """
+        Stop the refresh workers.
+
+        Pending refreshes are abandoned; the summaries stay stale and are
+        scheduled again on their next read.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+# Global summary service
+_summary_service: Optional[SummaryService] = None
+
+
+def init_summary_service() -> SummaryService:
+    """Create the shared summary service and start its workers."""
+    global _summary_service
+
+    _summary_service = SummaryService()
+    _summary_service.start()
+    logger.info(f"Summary service started with {_summary_service.workers} workers")
+    return _summary_service
+
+
+def get_summary_service() -> SummaryService:
+    """
+    Get the shared summary service, creating it on first use.
+
+    Returns:
+        SummaryService: The shared service
+    """
+    global _summary_service
+
+    if _summary_service is None:
+        _summary_service = SummaryService()
+    return _summary_service
+
+
+async def close_summary_service() -> None:
+    """Stop the summary service's workers."""
+    global _summary_service
+
+    if _summary_service is not None:
+        await _summary_service.close()
+        _summary_service = None
+        logger.info("Summary service closed")
@@ -0,0 +1,21 @@
+"""
+Users for the example API (app.api.endpoints.example).
+"""
+
+from app.users.repository import (
+    EmailTakenError,
+    InMemoryUserRepository,
+    PostgresUserRepository,
+    UserRepository,
+    get_user_repository,
+    set_user_repository,
+)
+
+__all__ = [
+    "EmailTakenError",
+    "InMemoryUserRepository",
+    "PostgresUserRepository",
+    "UserRepository",
+    "get_user_repository",
+    "set_user_repository",
+]
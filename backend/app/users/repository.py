@@ -0,0 +1,355 @@
+"""
+User storage for the example users API.
+
+`UserRepository` is the interface endpoints use, so they never scan a list
+themselves. Lookups by id and email are hash lookups, age ranges come from a
+sorted index, and lists are paginated by keyset (`after_id`): a page costs
+O(log n + page) however deep it is, and rows created or deleted between
+requests never shift later pages.
+
+Users are plain dicts with the fields of app.models.UserResponse.
+"""
+
+import bisect
+import heapq
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Protocol, Tuple
+
+from app.core.config import settings
+from app.models import UserStatus
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Fields returned for a user, in column order
+USER_COLUMNS = "id, name, email, age, status, created_at, updated_at"
+
+# Fields update() may change
+UPDATABLE_FIELDS = ("name", "email", "age", "status")
+
+
+class EmailTakenError(ValueError):
+    """Raised when a user would share an email with another user."""
+
+
+class UserRepository(Protocol):
+    """Indexed user storage."""
+
+    def get(self, user_id: int) -> Optional[dict]: ...
+
+    def get_by_email(self, email: str) -> Optional[dict]: ...
+
+    def create(
+        self,
+        name: str,
+        email: str,
+        age: Optional[int] = None,
+        status: UserStatus = UserStatus.ACTIVE,
+    ) -> dict:
+        """Add a user with the next id; raise EmailTakenError on a duplicate."""
+        ...
+
+    def update(self, user_id: int, changes: dict) -> Optional[dict]:
+        """Apply changes; return the user, or None if it does not exist."""
+        ...
+
+    def delete(self, user_id: int) -> Optional[dict]:
+        """Remove a user; return it, or None if it did not exist."""
+        ...
+
+    def search(
+        self,
+        name: Optional[str] = None,
+        min_age: Optional[int] = None,
+        max_age: Optional[int] = None,
+        status: Optional[UserStatus] = None,
+        after_id: int = 0,
+        limit: int = 100,
+    ) -> List[dict]:
+        """Matching users with id > after_id, in id order, at most `limit`."""
+        ...
+
+
+class InMemoryUserRepository:
+    """Users held in this process, indexed by id, email and age."""
+
+    def __init__(self):
+        self._users: Dict[int, dict] = {}
+        self._by_email: Dict[str, int] = {}
+        # Ids are assigned in increasing order, so appending keeps this sorted
+        self._ids: List[int] = []
+        self._by_age: List[Tuple[int, int]] = []  # (age, id), users with an age
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def get(self, user_id: int) -> Optional[dict]:
+        user = self._users.get(user_id)
+        return dict(user) if user else None
+
+    def get_by_email(self, email: str) -> Optional[dict]:
+        user_id = self._by_email.get(email)
+        return self.get(user_id) if user_id is not None else None
+
+    def create(
+        self,
+        name: str,
+        email: str,
+        age: Optional[int] = None,
+        status: UserStatus = UserStatus.ACTIVE,
+    ) -> dict:
+        with self._lock:
+            if email in self._by_email:
+                raise EmailTakenError(email)
+            user = {
+                "id": self._next_id,
+                "name": name,
+                "email": email,
+                "age": age,
+                "status": UserStatus(status),
+                "created_at": datetime.now(),
+                "updated_at": None,
+            }
+            self._next_id += 1
+            self._users[user["id"]] = user
+            self._by_email[email] = user["id"]
+            self._ids.append(user["id"])
+            if age is not None:
+                bisect.insort(self._by_age, (age, user["id"]))
+            return dict(user)
+
+    def update(self, user_id: int, changes: dict) -> Optional[dict]:
+        with self._lock:
+            user = self._users.get(user_id)
+            if user is None:
+                return None
+            changes = {k: v for k, v in changes.items() if k in UPDATABLE_FIELDS}
+            email = changes.get("email", user["email"])
+            if email != user["email"]:
+                if email in self._by_email:
+                    raise EmailTakenError(email)
+                del self._by_email[user["email"]]
+                self._by_email[email] = user_id
+            age = changes.get("age", user["age"])
+            if age != user["age"]:
+                self._unindex_age(user)
+                if age is not None:
+                    bisect.insort(self._by_age, (age, user_id))
+            user.update(changes)
+            user["updated_at"] = datetime.now()
+            return dict(user)
+
+    def delete(self, user_id: int) -> Optional[dict]:
+        with self._lock:
+            user = self._users.pop(user_id, None)
+            if user is None:
+                return None
+            del self._by_email[user["email"]]
+            del self._ids[bisect.bisect_left(self._ids, user_id)]
+            self._unindex_age(user)
+            return user
+
+    def _unindex_age(self, user: dict) -> None:
+        if user["age"] is None:
+            return
+        del self._by_age[bisect.bisect_left(self._by_age, (user["age"], user["id"]))]
+
+    def search(
+        self,
+        name: Optional[str] = None,
+        min_age: Optional[int] = None,
+        max_age: Optional[int] = None,
+        status: Optional[UserStatus] = None,
+        after_id: int = 0,
+        limit: int = 100,
+    ) -> List[dict]:
+        needle = name.lower() if name else None
+
+        def matches(user: dict) -> bool:
+            return (status is None or user["status"] == status) and (
+                needle is None or needle in user["name"].lower()
+            )
+
+        with self._lock:
+            if min_age is None and max_age is None:
+                # Walk ids from the cursor and stop once the page is full
+                page = []
+                for user in self._walk(after_id):
+                    if matches(user):
+                        page.append(dict(user))
+                        if len(page) == limit:
+                            break
+                return page
+
+            # Age range from the sorted index, then the lowest ids in it
+            lo = bisect.bisect_left(self._by_age, (min_age, 0)) if min_age else 0
+            hi = (
+                bisect.bisect_right(self._by_age, (max_age, float("inf")))
+                if max_age is not None
+                else len(self._by_age)
+            )
+            ids = (
+                user_id
+                for _, user_id in self._by_age[lo:hi]
+                if user_id > after_id and matches(self._users[user_id])
+            )
+            return [dict(self._users[i]) for i in heapq.nsmallest(limit, ids)]
+
+    def _walk(self, after_id: int) -> Iterator[dict]:
+        for i in range(bisect.bisect_right(self._ids, after_id), len(self._ids)):
+            yield self._users[self._ids[i]]
+
+
+class PostgresUserRepository:
+    """Users in the `example_users` table (see its migration for the indexes)."""
+
+    def get(self, user_id: int) -> Optional[dict]:
+        from app.core.database import execute_query
+
+        return execute_query(
+            f"SELECT {USER_COLUMNS} FROM example_users WHERE id = %s",
+            (user_id,),
+            fetch_one=True,
+        )
+
+    def get_by_email(self, email: str) -> Optional[dict]:
+        from app.core.database import execute_query
+
+        return execute_query(
+            f"SELECT {USER_COLUMNS} FROM example_users WHERE email = %s",
+            (email,),
+            fetch_one=True,
+        )
+
+    def create(
+        self,
+        name: str,
+        email: str,
+        age: Optional[int] = None,
+        status: UserStatus = UserStatus.ACTIVE,
+    ) -> dict:
+        from app.core.database import execute_query
+
+        user = execute_query(
+            f"""
+            INSERT INTO example_users (name, email, age, status)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (email) DO NOTHING
+            RETURNING {USER_COLUMNS}
+            """,
+            (name, email, age, UserStatus(status).value),
+            fetch_one=True,
+        )
+        if user is None:
+            raise EmailTakenError(email)
+        return user
+
+    def update(self, user_id: int, changes: dict) -> Optional[dict]:
+        import psycopg2.errors
+
+        from app.core.database import execute_query
+
+        # Only whitelisted names are interpolated into the statement
+        columns = [column for column in changes if column in UPDATABLE_FIELDS]
+        assignments = ", ".join(f"{column} = %s" for column in columns)
+        values = [
+            value.value if isinstance(value, UserStatus) else value
+            for value in (changes[column] for column in columns)
+        ]
+        try:
+            return execute_query(
+                f"""
+                UPDATE example_users
+                SET {assignments + ", " if assignments else ""}updated_at = NOW()
+                WHERE id = %s
+                RETURNING {USER_COLUMNS}
+                """,
+                (*values, user_id),
+                fetch_one=True,
+            )
+        except psycopg2.errors.UniqueViolation:
+            raise EmailTakenError(changes.get("email"))
+
+    def delete(self, user_id: int) -> Optional[dict]:
+        from app.core.database import execute_query
+
+        return execute_query(
+            f"DELETE FROM example_users WHERE id = %s RETURNING {USER_COLUMNS}",
+            (user_id,),
+            fetch_one=True,
+        )
+
+    def search(
+        self,
+        name: Optional[str] = None,
+        min_age: Optional[int] = None,
+        max_age: Optional[int] = None,
+        status: Optional[UserStatus] = None,
+        after_id: int = 0,
+        limit: int = 100,
+    ) -> List[dict]:
+        from app.core.database import execute_query
+
+        conditions = ["id > %s"]
+        params: list = [after_id]
+        if name:
+            escaped = name.replace("\\", "\\\\").replace("%", r"\%").replace("_", r"\_")
+            conditions.append("name ILIKE %s")
+            params.append(f"%{escaped}%")
+        if min_age is not None:
+            conditions.append("age >= %s")
+            params.append(min_age)
+        if max_age is not None:
+            conditions.append("age <= %s")
+            params.append(max_age)
+        if status is not None:
+            conditions.append("status = %s")
+            params.append(UserStatus(status).value)
+
+        return execute_query(
+            f"""
+            SELECT {USER_COLUMNS} FROM example_users
+            WHERE {" AND ".join(conditions)}
+            ORDER BY id
+            LIMIT %s
+            """,
+            (*params, limit),
+        )
+
+
+# Global user repository
+_user_repository: Optional[UserRepository] = None
+
+
+def get_user_repository() -> UserRepository:
+    """
+    Get the configured user repository.
+
+    Returns:
+        UserRepository: In-memory (seeded with two example users) unless
+        settings.EXAMPLE_USER_STORE is "postgres"
+    """
+    global _user_repository
+
+    if _user_repository is None:
+        if settings.EXAMPLE_USER_STORE == "postgres":
+            _user_repository = PostgresUserRepository()
+        elif settings.EXAMPLE_USER_STORE == "memory":
+            repository = InMemoryUserRepository()
+            repository.create("John Doe", "john@example.com", 25)
+            repository.create("Jane Smith", "jane@example.com", 30)
+            _user_repository = repository
+        else:
+            raise ValueError(f"Unknown user store: {settings.EXAMPLE_USER_STORE}")
+    return _user_repository
+
+
+def set_user_repository(repository: UserRepository) -> None:
+    """Install a specific user repository (e.g. an empty one in tests)."""
+    global _user_repository
+
+    _user_repository = repository
@@ -0,0 +1,6 @@
+"""
+Benchmarks for the Piazza AI backend.
+
+Each module is runnable on its own, e.g. ``python -m benchmarks.llm_client``,
+and works offline using the fake LLM provider and in-memory stand-ins.
+"""
@@ -0,0 +1,213 @@
+"""
+Load benchmark: throughput and latency percentiles for the main HTTP routes.
+
+Drives the full FastAPI app (middleware, validation, serialization) in-process
+over an ASGI transport, with the fake LLM provider injecting a configurable
+latency. For each route and concurrency level it reports requests/sec and
+p50/p95/p99 latency, and writes machine-readable JSON so runs can be compared
+over time (e.g. `--output results/$(git rev-parse --short HEAD).json`).
+
+The example user routes are served from the in-memory store, seeded with
+--users rows, so no database is needed.
+
+Usage:
+    python -m benchmarks.http_load --concurrency 1 10 100 --output bench.json
+    python -m benchmarks.http_load --routes health llm_query --latency-ms 200
+    python -m benchmarks.http_load --output new.json --baseline bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Tuple
+
+os.environ["LLM_PROVIDER"] = "fake"
+
+import httpx  # noqa: E402
+import numpy as np  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.users import (  # noqa: E402
+    InMemoryUserRepository,
+    get_user_repository,
+    set_user_repository,
+)
+from main import app  # noqa: E402
+
+Request = Tuple[str, str, dict]
+
+# Each route maps a request number to (method, path, json body)
+ROUTES: Dict[str, Callable[[int], Request]] = {
+    "health": lambda i: ("GET", f"{settings.API_PREFIX}/health", None),
+    "users_list": lambda i: ("GET", f"{settings.API_PREFIX}/example/users", None),
+    "user_get": lambda i: (
+        "GET",
+        f"{settings.API_PREFIX}/example/users/{i % len(get_user_repository()) + 1}",
+        None,
+    ),
+    # Unique queries, so every request misses the response cache
+    "llm_query": lambda i: (
+        "POST",
+        f"{settings.API_PREFIX}/llm/query",
+        {"query": f"benchmark question {i} {time.monotonic_ns()}"},
+    ),
+}
+
+
+def seed_users(count: int) -> None:
+    """Replace the example user store with an in-memory one of `count` users."""
+    repository = InMemoryUserRepository()
+    for i in range(1, count + 1):
+        repository.create(f"User {i}", f"user{i}@example.com", 18 + i % 60)
+    set_user_repository(repository)
+
+
+async def run(
+    client: httpx.AsyncClient, route: str, concurrency: int, requests: int
+) -> dict:
+    """Send `requests` requests to a route with `concurrency` in flight."""
+    make_request = ROUTES[route]
+    queue = iter(range(requests))
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for i in queue:
+            method, url, body = make_request(i)
+            start = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        "route": route,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+    }
+
+
+async def sweep(args) -> List[dict]:
+    transport = httpx.ASGITransport(app=app)
+    results = []
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", timeout=None
+        ) as client:
+            print(
+                f"{'route':12s} {'conc':>5s} {'req/s':>9s} "
+                f"{'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} {'errors':>6s}"
+            )
+            for route in args.routes:
+                await run(client, route, 1, args.warmup)
+                for concurrency in args.concurrency:
+                    total = max(concurrency * args.requests_per_worker, 1)
+                    result = await run(client, route, concurrency, total)
+                    results.append(result)
+                    print(
+                        f"{route:12s} {concurrency:5d} {result['rps']:9.1f} "
+                        f"{result['p50_ms']:8.2f} {result['p95_ms']:8.2f} "
+                        f"{result['p99_ms']:8.2f} {result['errors']:6d}"
+                    )
+    return results
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: List[dict], baseline_path: str) -> None:
+    """Print throughput and p95 changes against a previous run's JSON."""
+    with open(baseline_path) as f:
+        baseline = {(r["route"], r["concurrency"]): r for r in json.load(f)["results"]}
+
+    print(f"\nvs {baseline_path}")
+    print(f"{'route':12s} {'conc':>5s} {'req/s':>9s} {'p95':>9s}")
+    for result in results:
+        before = baseline.get((result["route"], result["concurrency"]))
+        if before is None:
+            continue
+        rps = (result["rps"] / before["rps"] - 1) * 100
+        p95 = (result["p95_ms"] / before["p95_ms"] - 1) * 100
+        print(
+            f"{result['route']:12s} {result['concurrency']:5d} "
+            f"{rps:+8.1f}% {p95:+8.1f}%"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--routes", nargs="+", choices=sorted(ROUTES), default=list(ROUTES)
+    )
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--requests-per-worker", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--baseline", help="Compare against a previous --output")
+    args = parser.parse_args()
+
+    # Per-request client logging would dominate the measurement
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    settings.FAKE_LLM_LATENCY_MS = args.latency_ms
+    # All benchmark traffic comes from one anonymous client
+    settings.RATE_LIMIT_ENABLED = False
+    seed_users(args.users)
+
+    results = asyncio.run(sweep(args))
+    report = {
+        "benchmark": "http_load",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "config": {
+            "fake_llm_latency_ms": args.latency_ms,
+            "users": args.users,
+            "requests_per_worker": args.requests_per_worker,
+            "llm_cache_enabled": settings.LLM_CACHE_ENABLED,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
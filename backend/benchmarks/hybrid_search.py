@@ -0,0 +1,91 @@
+"""
+Benchmark: hybrid (BM25 + vector, RRF-fused) retrieval latency by thread size.
+
+Builds a synthetic thread of posts that mention assignment numbers, function
+names and error strings, then compares vector-only search with hybrid search
+on latency and on how often the chunk containing the query's exact identifier
+is returned in the top k.
+
+Usage:
+    python -m benchmarks.hybrid_search --sizes 1000 10000 100000
+"""
+
+import argparse
+import random
+import time
+from typing import List
+
+import numpy as np
+
+from app.retrieval.hybrid import InMemoryHybridEngine
+from app.retrieval.vector import InMemoryVectorEngine, RetrievedChunk
+from app.textGeneration.embeddings import HashingEmbeddings
+
+THREAD_ID = "00000000-0000-0000-0000-000000000001"
+
+WORDS = (
+    "how do i fix the test failing on my submission for the lab when running "
+    "autograder output expected value recursion list loop function return error"
+).split()
+ERRORS = ("IndexError", "KeyError", "TypeError", "ValueError", "AttributeError")
+
+
+def make_chunks(size: int, seed: int = 0) -> List[RetrievedChunk]:
+    rng = random.Random(seed)
+    chunks = []
+    for i in range(size):
+        words = rng.choices(WORDS, k=40)
+        identifier = f"pa{i % 97} {ERRORS[i % len(ERRORS)]} helper_{i}"
+        words.insert(rng.randrange(len(words)), identifier)
+        chunks.append(
+            RetrievedChunk("post_chunk", str(i), THREAD_ID, " ".join(words), 41, 0.0)
+        )
+    return chunks
+
+
+def percentiles(samples: List[float]):
+    return float(np.percentile(samples, 50)), float(np.percentile(samples, 95))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000]
+    )
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    embeddings = HashingEmbeddings()
+    print(f"{'engine':8s} {'size':>8s} {'hit@k':>7s} {'p50 ms':>8s} {'p95 ms':>8s}")
+    for size in args.sizes:
+        chunks = make_chunks(size)
+        vectors = np.asarray(
+            embeddings.embed_documents([c.text for c in chunks]), dtype=np.float32
+        )
+        engine = InMemoryHybridEngine(InMemoryVectorEngine(embeddings.dimensions))
+        engine.add(chunks, vectors)
+
+        rng = random.Random(1)
+        targets = [rng.randrange(size) for _ in range(args.queries)]
+        queries = [f"{ERRORS[t % len(ERRORS)]} in helper_{t}" for t in targets]
+        query_vectors = [embeddings.embed_query(q) for q in queries]
+
+        for name in ("vector", "hybrid"):
+            timings, hits = [], 0
+            for target, query, vector in zip(targets, queries, query_vectors):
+                start = time.perf_counter()
+                if name == "vector":
+                    results = engine.vector_engine.search(vector, THREAD_ID, args.k)
+                else:
+                    results = engine.search(query, vector, THREAD_ID, args.k)
+                timings.append((time.perf_counter() - start) * 1000)
+                hits += any(r.source_id == str(target) for r in results)
+            p50, p95 = percentiles(timings)
+            print(
+                f"{name:8s} {size:8d} {hits / args.queries:7.2f} {p50:8.2f} {p95:8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Cold-start benchmark: module import time and app startup time.
+
+Each run is a fresh interpreter, so nothing is cached in sys.modules. Import
+cost is measured with `python -X importtime`, which also shows where it goes:
+the report lists the largest direct imports of each target module and
+whether any heavy dependency (LangChain, the provider SDK, database
+drivers) was imported eagerly. Startup time is the app's lifespan startup
+(LLM client, query log sink, summary workers) with the fake provider and no
+database, i.e. what a new serverless or autoscaled instance pays before its
+first request.
+
+Usage:
+    python -m benchmarks.import_time --runs 10
+    python -m benchmarks.import_time --modules main app.jobs --output cold.json
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+
+# Dependencies the app should load on first use or in its lifespan, not on import
+HEAVY_MODULES = (
+    "langchain_core",
+    "langchain_groq",
+    "groq",
+    "psycopg2",
+    "asyncpg",
+    "httpx",
+    "numpy",
+)
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+_STARTUP_SNIPPET = """
+import asyncio, json, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+async def startup():
+    async with main.app.router.lifespan_context(main.app):
+        return time.perf_counter()
+
+ready = asyncio.run(startup())
+print(json.dumps({"import_ms": (imported - start) * 1000,
+                  "startup_ms": (ready - imported) * 1000}))
+"""
+
+
+def _env() -> Dict[str, str]:
+    env = dict(os.environ, LLM_PROVIDER="fake", ENVIRONMENT="test")
+    env.setdefault("PYTHONPATH", os.getcwd())
+    return env
+
+
+def measure_import(module: str) -> Tuple[float, List[Tuple[str, float]], List[str]]:
+    """
+    Import a module in a fresh interpreter under -X importtime.
+
+    Returns:
+        Cumulative import ms, [(direct import, cumulative ms)], and the heavy
+        modules that were imported
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=_env(),
+        check=True,
+    )
+    total = 0.0
+    children: List[Tuple[str, float]] = []
+    loaded = set()
+    rows = [m for m in map(_IMPORTTIME_LINE.match, result.stderr.splitlines()) if m]
+    # Rows are printed after their children, so a direct import of the target
+    # is a row one level deeper than the target's own (last) row
+    for match in rows:
+        _, cumulative, indent, name = match.groups()
+        loaded.add(name.split(".")[0])
+        if name == module and not indent:
+            total = int(cumulative) / 1000
+        elif len(indent) == 2:
+            children.append((name, int(cumulative) / 1000))
+    heavy = [name for name in HEAVY_MODULES if name in loaded]
+    return total, sorted(children, key=lambda c: c[1], reverse=True), heavy
+
+
+def measure_startup() -> Dict[str, float]:
+    """Wall-clock `import main` plus lifespan startup, in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-c", _STARTUP_SNIPPET],
+        capture_output=True,
+        text=True,
+        env=_env(),
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--modules", nargs="+", default=["main"])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    results = []
+    for module in args.modules:
+        runs = [measure_import(module) for _ in range(args.runs)]
+        totals = [total for total, _, _ in runs]
+        median = statistics.median(totals)
+        # Breakdown from the run closest to the median
+        _, children, heavy = min(runs, key=lambda run: abs(run[0] - median))
+
+        print(f"\nimport {module}: median {median:.1f} ms over {args.runs} runs")
+        for name, ms in children[: args.top]:
+            print(f"  {ms:8.1f} ms  {name}")
+        print(f"  heavy dependencies loaded: {', '.join(heavy) or 'none'}")
+        results.append(
+            {
+                "module": module,
+                "median_ms": round(median, 1),
+                "min_ms": round(min(totals), 1),
+                "top_imports": [
+                    {"module": name, "ms": round(ms, 1)}
+                    for name, ms in children[: args.top]
+                ],
+                "heavy_loaded": heavy,
+            }
+        )
+
+    startups = [measure_startup() for _ in range(args.runs)]
+    startup = {
+        key: round(statistics.median(run[key] for run in startups), 1)
+        for key in ("import_ms", "startup_ms")
+    }
+    print(
+        f"\ncold start: import {startup['import_ms']:.1f} ms "
+        f"+ lifespan startup {startup['startup_ms']:.1f} ms (median)"
+    )
+
+    if args.output:
+        report = {
+            "benchmark": "import_time",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": sys.version.split()[0],
+            "runs": args.runs,
+            "imports": results,
+            "cold_start": startup,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark: ingestion throughput (chunks/sec) by batch size.
+
+By default the writer is an in-memory stand-in for Postgres that sleeps for
+--commit-latency-ms per transaction, which models the round trip and commit
+cost that row-by-row writes pay on every statement. With --postgres, batches
+are written to DATABASE_URL instead (the thread must exist there).
+
+Usage:
+    python -m benchmarks.ingestion --posts 5000 --batch-sizes 1 64 512
+"""
+
+import argparse
+import random
+import uuid
+
+from app.ingestion import InMemoryChunkWriter, InMemoryPostSource, PostIngestionPipeline
+from app.ingestion.pipeline import PostgresChunkWriter
+
+WORDS = "the a lecture midterm assignment function recursion error list tree".split()
+
+
+def make_posts(count: int, thread_id: str, seed: int = 0):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "thread_id": thread_id,
+            "body_text": " ".join(rng.choices(WORDS, k=rng.randint(50, 600))),
+        }
+        for _ in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=2000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 64, 512])
+    parser.add_argument("--commit-latency-ms", type=float, default=2.0)
+    parser.add_argument("--thread-id", default=str(uuid.uuid4()))
+    parser.add_argument("--postgres", action="store_true")
+    args = parser.parse_args()
+
+    source = InMemoryPostSource(make_posts(args.posts, args.thread_id))
+    print(f"{'batch':>6s} {'chunks':>8s} {'batches':>8s} {'chunks/s':>10s}")
+    for batch_size in args.batch_sizes:
+        if args.postgres:
+            writer = PostgresChunkWriter()
+        else:
+            writer = InMemoryChunkWriter(args.commit_latency_ms)
+        pipeline = PostIngestionPipeline(source, writer, batch_size=batch_size)
+        stats = pipeline.run(args.thread_id, resume=False)
+        print(
+            f"{batch_size:6d} {stats.chunks:8d} {stats.batches:8d} "
+            f"{stats.chunks_per_second:10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
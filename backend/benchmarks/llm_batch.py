@@ -0,0 +1,114 @@
+"""
+Benchmark: a backlog of queries sent one /llm/query call at a time vs one
+/llm/query/batch call.
+
+Drives the FastAPI app in-process over an ASGI transport against the fake
+provider with injected latency. Serial time is measured on a sample of
+--serial-sample queries and extrapolated to the whole backlog; the batch is
+run in full. Every query is unique, so nothing is served from the cache.
+(The ASGI transport buffers the streamed body, so this measures time to the
+last result only.)
+
+Usage:
+    python -m benchmarks.llm_batch --queries 500 --latency-ms 2000
+    python -m benchmarks.llm_batch --concurrency 4 16 64
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+
+os.environ["LLM_PROVIDER"] = "fake"
+
+import httpx  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.textGeneration import init_llm_client  # noqa: E402
+from main import app  # noqa: E402
+
+
+def questions(count: int, tag: str):
+    return [
+        f"Post {i}: why does my solution fail test {tag}-{i}?" for i in range(count)
+    ]
+
+
+async def serial(client: httpx.AsyncClient, count: int) -> float:
+    """Seconds per query when each is its own HTTP call, sent one by one."""
+    start = time.perf_counter()
+    for query in questions(count, f"serial-{time.monotonic_ns()}"):
+        response = await client.post(
+            f"{settings.API_PREFIX}/llm/query", json={"query": query}
+        )
+        response.raise_for_status()
+    return (time.perf_counter() - start) / count
+
+
+async def batch(client: httpx.AsyncClient, count: int) -> dict:
+    """Send the backlog as one batch and wait for every result."""
+    body = {
+        "queries": [
+            {"query": query}
+            for query in questions(count, f"batch-{time.monotonic_ns()}")
+        ]
+    }
+    start = time.perf_counter()
+    answered = failed = 0
+    async with client.stream(
+        "POST", f"{settings.API_PREFIX}/llm/query/batch", json=body
+    ) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line:
+                continue
+            if json.loads(line)["error"]:
+                failed += 1
+            else:
+                answered += 1
+    return {
+        "seconds": time.perf_counter() - start,
+        "answered": answered,
+        "failed": failed,
+    }
+
+
+async def main_async(args) -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=None
+    ) as client:
+        per_query = await serial(client, args.serial_sample)
+        print(
+            f"serial: {per_query:.2f}s per query, "
+            f"~{per_query * args.queries / 60:.1f} min for {args.queries} queries"
+        )
+        print(f"{'concurrency':>11s} {'total s':>8s} {'ok':>5s} {'fail':>5s}")
+        for concurrency in args.concurrency:
+            settings.LLM_BATCH_CONCURRENCY = concurrency
+            result = await batch(client, args.queries)
+            print(
+                f"{concurrency:11d} {result['seconds']:8.1f} "
+                f"{result['answered']:5d} {result['failed']:5d}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=2000.0)
+    parser.add_argument("--serial-sample", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4, 16, 64])
+    args = parser.parse_args()
+
+    settings.FAKE_LLM_LATENCY_MS = args.latency_ms
+    # All benchmark traffic comes from one anonymous client
+    settings.RATE_LIMIT_ENABLED = False
+    init_llm_client("fake")
+
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark: per-request ChatGroq construction vs the shared LLM client.
+
+Client construction never touches the network, so this runs offline. The
+completion itself is served by the fake provider to isolate client overhead.
+
+Usage:
+    python -m benchmarks.llm_client --requests 500
+"""
+
+import argparse
+import os
+import time
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark-placeholder")
+
+from langchain_groq import ChatGroq  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.textGeneration.client import LLMClientManager  # noqa: E402
+from app.textGeneration.fake import FakeChatModel  # noqa: E402
+
+
+def per_request(n: int) -> float:
+    """Construct a new ChatGroq for every request, as the old service did."""
+    fake = FakeChatModel()
+    start = time.perf_counter()
+    for i in range(n):
+        ChatGroq(
+            model=settings.LLM_MODEL,
+            temperature=settings.LLM_TEMPERATURE,
+            max_tokens=settings.LLM_MAX_TOKENS,
+            max_retries=settings.LLM_MAX_RETRIES,
+        )
+        fake.invoke(f"question {i}")
+    return time.perf_counter() - start
+
+
+def shared(n: int) -> float:
+    """Reuse one client manager for every request."""
+    manager = LLMClientManager("groq")
+    manager.start()
+    fake = FakeChatModel()
+    start = time.perf_counter()
+    for i in range(n):
+        _ = manager.llm
+        fake.invoke(f"question {i}")
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    for name, fn in (("per_request", per_request), ("shared", shared)):
+        elapsed = fn(args.requests)
+        print(
+            f"{name:12s} {args.requests} requests in {elapsed:.3f}s "
+            f"({elapsed / args.requests * 1000:.3f} ms/request)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Load benchmark: blocking vs async /llm/query against a latency-injecting fake.
+
+Drives the FastAPI app in-process over an ASGI transport. The "blocking" mode
+mounts the old handler shape (sync invoke inside an async def) for comparison.
+
+Usage:
+    python -m benchmarks.llm_concurrency --latency-ms 200 --concurrency 1 10 100 300
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+os.environ["LLM_PROVIDER"] = "fake"
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.models import QueryRequest, QueryResponse  # noqa: E402
+from app.textGeneration import get_llm_response, init_llm_client  # noqa: E402
+from main import app  # noqa: E402
+
+blocking_app = FastAPI()
+
+
+@blocking_app.post(f"{settings.API_PREFIX}/llm/query", response_model=QueryResponse)
+async def blocking_query(request: QueryRequest):
+    response = get_llm_response(request.query)
+    return QueryResponse(
+        query=request.query, response=response.content, model=response.model
+    )
+
+
+async def run(target: FastAPI, concurrency: int, requests: int) -> float:
+    """Send `requests` queries with `concurrency` in flight; return requests/sec."""
+    transport = httpx.ASGITransport(app=target)
+    url = f"{settings.API_PREFIX}/llm/query"
+    queue = iter(range(requests))
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+
+        async def worker():
+            for i in queue:
+                r = await c.post(url, json={"query": f"question {i}"})
+                r.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return requests / (time.perf_counter() - start)
+
+
+async def sweep(concurrencies, requests_per_worker: int) -> None:
+    print(f"{'mode':10s} {'concurrency':>11s} {'req/s':>10s}")
+    for concurrency in concurrencies:
+        total = concurrency * requests_per_worker
+        for mode, target in (("blocking", blocking_app), ("async", app)):
+            rps = await run(target, concurrency, total)
+            print(f"{mode:10s} {concurrency:11d} {rps:10.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--requests-per-worker", type=int, default=3)
+    args = parser.parse_args()
+
+    settings.FAKE_LLM_LATENCY_MS = args.latency_ms
+    # All benchmark traffic comes from one anonymous client
+    settings.RATE_LIMIT_ENABLED = False
+    init_llm_client("fake")
+
+    asyncio.run(sweep(args.concurrency, args.requests_per_worker))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Benchmark: query latency with model routing and fallback.
+
+Answers a mix of short lookups and long questions through aget_llm_response
+against fake models whose latencies stand in for a large and a small model,
+in these scenarios:
+- default only: routing disabled, every query goes to the large model;
+- routed: short queries go to the fast model;
+- throttled: the large model answers every call with HTTP 429, with and
+  without a fallback model configured.
+Every query is unique, so nothing is served from the cache.
+
+Usage:
+    python -m benchmarks.llm_routing --queries 200 --short-share 0.6
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+
+os.environ["LLM_PROVIDER"] = "fake"
+
+import numpy as np  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.textGeneration import (  # noqa: E402
+    LLMClientManager,
+    aget_llm_response,
+    set_model_registry,
+)
+from app.textGeneration import client as llm_client  # noqa: E402
+from app.textGeneration.fake import FakeChatModel  # noqa: E402
+
+
+class BenchClientManager(LLMClientManager):
+    """Fake models with a latency per model name."""
+
+    def __init__(self, latencies_ms: dict, failing: set):
+        super().__init__("fake")
+        self.latencies_ms = latencies_ms
+        self.failing = failing
+
+    def _create(self, spec):
+        return FakeChatModel(
+            model_name=spec.model,
+            latency_ms=self.latencies_ms[spec.model],
+            failure_status=429 if spec.model in self.failing else None,
+        )
+
+
+def workload(count: int, short_share: float, seed: int):
+    rng = random.Random(seed)
+    tag = time.monotonic_ns()
+    return [
+        f"What is the due date of assignment {i}? ({tag})"
+        if rng.random() < short_share
+        else f"Walk me through why my proof of lemma {i} fails. ({tag}) "
+        + "Here is my attempt, step by step. " * 20
+        for i in range(count)
+    ]
+
+
+async def run(queries, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    timings, models, failed = [], {}, 0
+
+    async def one(query: str) -> None:
+        nonlocal failed
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await aget_llm_response(query)
+            except Exception:
+                failed += 1
+                return
+            timings.append((time.perf_counter() - start) * 1000)
+            models[response.model] = models.get(response.model, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(query) for query in queries))
+    return {
+        "seconds": time.perf_counter() - start,
+        "p50": float(np.percentile(timings, 50)) if timings else 0.0,
+        "p95": float(np.percentile(timings, 95)) if timings else 0.0,
+        "failed": failed,
+        "models": models,
+    }
+
+
+def scenarios():
+    """(name, settings overrides, failing models) per scenario."""
+    return [
+        ("default only", {"LLM_ROUTING_ENABLED": False}, set()),
+        ("routed", {"LLM_ROUTING_ENABLED": True}, set()),
+        (
+            "throttled, no fallback",
+            {"LLM_ROUTING_ENABLED": True, "LLM_FALLBACK_MODEL": ""},
+            {settings.LLM_MODEL},
+        ),
+        (
+            "throttled, fallback",
+            {"LLM_ROUTING_ENABLED": True},
+            {settings.LLM_MODEL},
+        ),
+    ]
+
+
+async def main_async(args) -> None:
+    latencies = {
+        settings.LLM_MODEL: args.large_ms,
+        settings.LLM_FAST_MODEL: args.fast_ms,
+        settings.LLM_FALLBACK_MODEL: args.large_ms,
+    }
+    print(
+        f"{'scenario':24s} {'p50 ms':>8s} {'p95 ms':>8s} {'total s':>8s} "
+        f"{'fail':>5s}  models"
+    )
+    for seed, (name, overrides, failing) in enumerate(scenarios()):
+        saved = {key: getattr(settings, key) for key in overrides}
+        for key, value in overrides.items():
+            setattr(settings, key, value)
+        set_model_registry(None)
+        llm_client._client_manager = BenchClientManager(latencies, failing)
+        try:
+            queries = workload(args.queries, args.short_share, seed)
+            result = await run(queries, args.concurrency)
+        finally:
+            for key, value in saved.items():
+                setattr(settings, key, value)
+        print(
+            f"{name:24s} {result['p50']:8.0f} {result['p95']:8.0f} "
+            f"{result['seconds']:8.1f} {result['failed']:5d}  {result['models']}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--short-share", type=float, default=0.6)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--large-ms", type=float, default=1500.0)
+    parser.add_argument("--fast-ms", type=float, default=300.0)
+    args = parser.parse_args()
+
+    settings.LLM_CACHE_ENABLED = False
+    settings.LLM_RETRY_BASE_DELAY = 0.05
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark: per-row response serialization cost for UserResponse and
+QueryResponse.
+
+Compares the ways a route can turn rows into a JSON body:
+- fastapi: the response_model path (validate each row, jsonable_encoder,
+  then the stdlib JSONResponse), what every route did before;
+- fastapi+orjson: the same, rendered by the app's orjson default response;
+- pydantic: validate, then model_dump_json (the previous /llm/query path);
+- fast path: app.api.responses.rows_response, which encodes the model's
+  fields of already-valid rows with orjson and skips validation.
+
+Usage:
+    python -m benchmarks.serialization --rows 1 100 1000
+"""
+
+import argparse
+import time
+from datetime import datetime
+from typing import Callable, List, Type
+
+from fastapi.responses import JSONResponse as StdJSONResponse
+from fastapi.responses import Response
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic import BaseModel, TypeAdapter
+
+from app.api.responses import JSONResponse, rows_response
+from app.models import QueryResponse, UserResponse, UserStatus
+
+
+def user_rows(count: int) -> List[dict]:
+    now = datetime.now()
+    return [
+        {
+            "id": i,
+            "name": f"User {i}",
+            "email": f"user{i}@example.com",
+            "age": 18 + i % 60,
+            "status": UserStatus.ACTIVE,
+            "created_at": now,
+            "updated_at": now if i % 2 else None,
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def query_rows(count: int) -> List[dict]:
+    return [
+        {
+            "query": f"How do I solve question {i} on the problem set?",
+            "response": "Start from the definition, then apply the lemma. " * 20,
+            "model": "openai/gpt-oss-120b",
+            "cached": bool(i % 2),
+        }
+        for i in range(count)
+    ]
+
+
+def run_now(coroutine):
+    """Run a coroutine that never suspends, without event loop overhead."""
+    try:
+        coroutine.send(None)
+    except StopIteration as done:
+        return done.value
+    raise RuntimeError("coroutine suspended")
+
+
+def serializers(model: Type[BaseModel]) -> List[tuple]:
+    field = create_response_field(name="bench", type_=List[model])
+    adapter = TypeAdapter(List[model])
+
+    def via_fastapi(response_class) -> Callable[[List[dict]], bytes]:
+        def serialize(rows: List[dict]) -> bytes:
+            # Validation and encoding only: nothing in it awaits
+            content = run_now(serialize_response(field=field, response_content=rows))
+            return response_class(content).body
+
+        return serialize
+
+    return [
+        ("fastapi", via_fastapi(StdJSONResponse)),
+        ("fastapi+orjson", via_fastapi(JSONResponse)),
+        (
+            "pydantic",
+            lambda rows: (
+                Response(
+                    content=adapter.dump_json(adapter.validate_python(rows)),
+                    media_type="application/json",
+                ).body
+            ),
+        ),
+        ("fast path", lambda rows: rows_response(rows, model).body),
+    ]
+
+
+def per_row_us(serialize: Callable, rows: List[dict], min_seconds: float) -> float:
+    serialize(rows)  # warm up
+    calls, start = 0, time.perf_counter()
+    while True:
+        serialize(rows)
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return elapsed / calls / len(rows) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1, 100, 1000])
+    parser.add_argument("--seconds", type=float, default=0.5, help="Per measurement")
+    args = parser.parse_args()
+
+    print(
+        f"{'model':14s} {'rows':>6s} {'serializer':16s} {'us/row':>8s} {'speedup':>8s}"
+    )
+    for model, make_rows in ((UserResponse, user_rows), (QueryResponse, query_rows)):
+        for count in args.rows:
+            rows = make_rows(count)
+            baseline = None
+            for name, serialize in serializers(model):
+                cost = per_row_us(serialize, rows, args.seconds)
+                baseline = baseline or cost
+                print(
+                    f"{model.__name__:14s} {count:6d} {name:16s} "
+                    f"{cost:8.2f} {baseline / cost:7.1f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark: peak memory of a full export, buffered vs streamed.
+
+Seeds the in-memory example user store, then exports every user two ways
+through the full app over an ASGI transport:
+- buffered: one JSON body holding the whole collection, as list endpoints
+  used to return it;
+- streamed: GET /example/users/export, NDJSON produced one keyset page at a
+  time.
+The app is called directly over ASGI with a `send` that counts and drops
+body chunks, like a socket would (httpx's ASGI transport buffers the whole
+body, which would hide the difference). Peak Python memory is measured with
+tracemalloc while each response is produced; the seeded store is excluded.
+
+Usage:
+    python -m benchmarks.streaming --users 10000 100000
+"""
+
+import argparse
+import asyncio
+import os
+import time
+import tracemalloc
+
+os.environ["LLM_PROVIDER"] = "fake"
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.users import InMemoryUserRepository, set_user_repository  # noqa: E402
+from main import app  # noqa: E402
+
+BUFFERED_PATH = "/benchmark/users/buffered"
+
+
+@app.get(BUFFERED_PATH, include_in_schema=False)
+def buffered_users():
+    from app.users import get_user_repository
+
+    repository = get_user_repository()
+    users = repository.search(limit=len(repository))
+    return JSONResponse(jsonable_encoder(users))
+
+
+async def measure(path: str) -> dict:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+    received = 0
+    status = None
+    requested = False
+
+    async def receive() -> dict:
+        nonlocal requested
+        if requested:
+            # The client never disconnects
+            await asyncio.Event().wait()
+        requested = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        nonlocal received, status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            received += len(message.get("body", b""))
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    elapsed = time.perf_counter() - start
+    if status != 200:
+        raise RuntimeError(f"GET {path} returned {status}")
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": elapsed, "peak_mb": peak / 2**20, "body_mb": received / 2**20}
+
+
+async def main_async(sizes) -> None:
+    print(f"{'users':>8s} {'mode':10s} {'body MB':>8s} {'peak MB':>8s} {'sec':>7s}")
+    for size in sizes:
+        repository = InMemoryUserRepository()
+        for i in range(1, size + 1):
+            repository.create(f"User {i}", f"user{i}@example.com", 18 + i % 60)
+        set_user_repository(repository)
+
+        for mode, path in (
+            ("buffered", BUFFERED_PATH),
+            ("streamed", f"{settings.API_PREFIX}/example/users/export"),
+        ):
+            result = await measure(path)
+            print(
+                f"{size:8d} {mode:10s} {result['body_mb']:8.1f} "
+                f"{result['peak_mb']:8.1f} {result['seconds']:7.2f}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+    asyncio.run(main_async(args.users))
+
+
+if __name__ == "__main__":
+    main()
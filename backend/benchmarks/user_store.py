@@ -0,0 +1,140 @@
+"""
+Benchmark: example user store operations, indexed repository vs list scans.
+
+Loads the same users into InMemoryUserRepository and into a plain list
+handled the way the example endpoints used to (linear scans, `any(...)` for
+email uniqueness, a filtered copy per search filter, offset slicing of the
+filtered list), then
+times each operation.
+
+Usage:
+    python -m benchmarks.user_store --users 100000
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from app.models import UserStatus
+from app.users import InMemoryUserRepository
+
+PAGE = 100
+STATUSES = list(UserStatus)
+
+
+def make_users(count: int) -> List[dict]:
+    rng = random.Random(0)
+    now = datetime.now()
+    return [
+        {
+            "id": i,
+            "name": f"User {i}",
+            "email": f"user{i}@example.com",
+            "age": rng.randint(0, 99),
+            "status": STATUSES[i % 10 == 0],  # 10% inactive
+            "created_at": now,
+            "updated_at": None,
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def list_search(users: List[dict], min_age: int, max_age: int) -> List[dict]:
+    """The list-based search: active users in an age range, one copy per filter."""
+    found = users.copy()
+    found = [user for user in found if user["status"] == UserStatus.ACTIVE]
+    found = [user for user in found if user.get("age") and user["age"] >= min_age]
+    found = [user for user in found if user.get("age") and user["age"] <= max_age]
+    return found[:PAGE]
+
+
+def operations(users: List[dict], repository: InMemoryUserRepository, seed: int):
+    """(name, list implementation, repository implementation) per operation."""
+    rng = random.Random(seed)
+    count = len(users)
+
+    def scan_get() -> dict:
+        user_id = rng.randint(1, count)
+        return next(user for user in users if user["id"] == user_id)
+
+    def scan_email() -> bool:
+        # A new address, as on signup: the scan never stops early
+        email = f"new{rng.randint(1, count)}@example.com"
+        return any(user["email"] == email for user in users)
+
+    return [
+        (
+            "get by id",
+            scan_get,
+            lambda: repository.get(rng.randint(1, count)),
+        ),
+        (
+            "email taken",
+            scan_email,
+            lambda: repository.get_by_email(f"new{rng.randint(1, count)}@example.com"),
+        ),
+        (
+            "age range page",
+            lambda: list_search(users, 30, 32),
+            lambda: repository.search(
+                min_age=30, max_age=32, status=UserStatus.ACTIVE, limit=PAGE
+            ),
+        ),
+        (
+            "deep page active",
+            lambda: [u for u in users if u["status"] == UserStatus.ACTIVE][
+                count - 2 * PAGE : count - PAGE
+            ],
+            lambda: repository.search(
+                status=UserStatus.ACTIVE, after_id=count - 2 * PAGE, limit=PAGE
+            ),
+        ),
+    ]
+
+
+def measure(fn: Callable[[], object], repeats: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "p50": float(np.percentile(timings, 50)),
+        "p95": float(np.percentile(timings, 95)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    users = make_users(args.users)
+    repository = InMemoryUserRepository()
+    start = time.perf_counter()
+    for user in users:
+        repository.create(user["name"], user["email"], user["age"], user["status"])
+    load_s = time.perf_counter() - start
+    print(f"Loaded {args.users} users into the repository in {load_s:.2f}s\n")
+
+    print(
+        f"{'operation':18s} {'list p50':>10s} {'list p95':>10s} "
+        f"{'indexed p50':>12s} {'indexed p95':>12s} {'speedup':>8s}"
+    )
+    for name, scan, indexed in operations(users, repository, seed=1):
+        before = measure(scan, args.repeats)
+        after = measure(indexed, args.repeats)
+        print(
+            f"{name:18s} {before['p50']:10.3f} {before['p95']:10.3f} "
+            f"{after['p50']:12.3f} {after['p95']:12.3f} "
+            f"{before['p50'] / max(after['p50'], 1e-6):7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark: vector retrieval recall and latency by corpus size.
+
+Always measures the in-memory brute-force engine (exact, so recall is 1.0 by
+construction). With --pgvector, also loads the same vectors into a scratch
+table with an HNSW index on DATABASE_URL and reports its recall@k against the
+exact results.
+
+Usage:
+    python -m benchmarks.vector_search --sizes 10000 100000 1000000
+    python -m benchmarks.vector_search --sizes 10000 --pgvector
+"""
+
+import argparse
+import io
+import time
+from typing import List, Tuple
+
+import numpy as np
+
+from app.retrieval.vector import InMemoryVectorEngine, RetrievedChunk, to_pgvector
+
+THREAD_ID = "00000000-0000-0000-0000-000000000001"
+
+
+def make_corpus(size: int, dimensions: int, seed: int = 0) -> np.ndarray:
+    """Clustered unit vectors, closer to real embeddings than uniform noise."""
+    rng = np.random.default_rng(seed)
+    centroids = rng.standard_normal((max(size // 100, 1), dimensions))
+    vectors = centroids[rng.integers(0, len(centroids), size)]
+    vectors = vectors + 0.5 * rng.standard_normal((size, dimensions))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
+
+
+def percentiles(samples: List[float]) -> Tuple[float, float]:
+    return float(np.percentile(samples, 50)), float(np.percentile(samples, 95))
+
+
+def bench_memory(vectors: np.ndarray, queries: np.ndarray, k: int):
+    engine = InMemoryVectorEngine(vectors.shape[1])
+    chunks = [
+        RetrievedChunk("post_chunk", str(i), THREAD_ID, "", None, 0.0)
+        for i in range(len(vectors))
+    ]
+    engine.add(chunks, vectors)
+    engine.search(queries[0], THREAD_ID, k)  # materialize the matrix
+
+    timings, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        hits = engine.search(query, THREAD_ID, k)
+        timings.append((time.perf_counter() - start) * 1000)
+        results.append({int(hit.source_id) for hit in hits})
+    return timings, results
+
+
+def bench_pgvector(vectors: np.ndarray, queries: np.ndarray, k: int, ef: int):
+    from app.core.database import get_direct_connection
+
+    connection = get_direct_connection()
+    cursor = connection.cursor()
+    cursor.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    cursor.execute("DROP TABLE IF EXISTS bench_embeddings")
+    cursor.execute(
+        f"CREATE TABLE bench_embeddings (id INTEGER, embedding VECTOR({vectors.shape[1]}))"
+    )
+    buffer = io.StringIO()
+    for i, vector in enumerate(vectors):
+        buffer.write(f"{i}\t{to_pgvector(vector)}\n")
+    buffer.seek(0)
+    cursor.copy_expert("COPY bench_embeddings (id, embedding) FROM STDIN", buffer)
+    start = time.perf_counter()
+    cursor.execute(
+        "CREATE INDEX ON bench_embeddings USING hnsw (embedding vector_cosine_ops)"
+    )
+    build_s = time.perf_counter() - start
+    cursor.execute(f"SET hnsw.ef_search = {ef}")
+    connection.commit()
+
+    timings, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        cursor.execute(
+            "SELECT id FROM bench_embeddings ORDER BY embedding <=> %s::vector LIMIT %s",
+            (to_pgvector(query), k),
+        )
+        rows = cursor.fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+        results.append({row["id"] for row in rows})
+
+    cursor.execute("DROP TABLE bench_embeddings")
+    connection.commit()
+    connection.close()
+    return timings, results, build_s
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--dimensions", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--ef-search", type=int, default=100)
+    parser.add_argument("--pgvector", action="store_true")
+    args = parser.parse_args()
+
+    print(f"{'engine':10s} {'size':>9s} {'recall@k':>9s} {'p50 ms':>8s} {'p95 ms':>8s}")
+    for size in args.sizes:
+        vectors = make_corpus(size, args.dimensions)
+        queries = make_corpus(args.queries, args.dimensions, seed=1)
+
+        timings, exact = bench_memory(vectors, queries, args.k)
+        p50, p95 = percentiles(timings)
+        print(f"{'memory':10s} {size:9d} {1.0:9.3f} {p50:8.2f} {p95:8.2f}")
+
+        if args.pgvector:
+            timings, approx, build_s = bench_pgvector(
+                vectors, queries, args.k, args.ef_search
+            )
+            recall = np.mean([len(a & e) / args.k for a, e in zip(approx, exact)])
+            p50, p95 = percentiles(timings)
+            print(
+                f"{'pgvector':10s} {size:9d} {recall:9.3f} {p50:8.2f} {p95:8.2f}"
+                f"  (index build {build_s:.1f}s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,17 +4,71 @@ Piazza AI Plugin Backend
 Minimal FastAPI backend for the Piazza AI browser extension.
 """
 
+import logging
+from contextlib import asynccontextmanager
+
+import anyio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
+from app.api.responses import JSONResponse
 from app.api.routes import api_router
 from app.core.config import settings
+from app.core.metrics import REGISTRY
+from app.core.observability import RequestContextMiddleware, configure_logging
+from app.core.query_log import close_query_log_sink, init_query_log_sink
+from app.textGeneration import close_llm_client, init_llm_client
+from app.textGeneration.summary import close_summary_service, init_summary_service
+
+configure_logging(logging.DEBUG if settings.DEBUG else logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Create shared clients on startup and release them on shutdown.
+
+    Runs once per worker process, so no pool or client is shared across a fork.
+    Database drivers and the LLM provider SDK are imported here, not when the
+    app module is imported.
+    """
+    from app.core.async_database import close_async_pool, init_async_pool
+    from app.core.database import close_database_pool, init_database_pool
+
+    init_llm_client()
+    init_query_log_sink()
+    init_summary_service()
+    if not settings.ENVIRONMENT == "test":
+        try:
+            await init_async_pool()
+        except Exception as e:
+            logger.warning(f"Failed to initialize async database pool: {e}")
+            logger.warning(
+                "Async database connections will be initialized on first use"
+            )
+        try:
+            await anyio.to_thread.run_sync(init_database_pool)
+        except Exception as e:
+            logger.warning(f"Failed to initialize database pool: {e}")
+            logger.warning("Database connections will be initialized on first use")
+    yield
+    await close_summary_service()
+    # Flush queued query logs while the database pool is still open
+    await close_query_log_sink()
+    await close_async_pool()
+    close_database_pool()
+    await close_llm_client()
+
 
 # Create FastAPI application
 app = FastAPI(
     title="Piazza AI Plugin Backend",
     description="Backend API for the Piazza AI browser extension",
     version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=JSONResponse,
 )
 
 # Add CORS middleware for extension support
@@ -26,6 +80,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Assign request IDs and time every request (outermost, so timings include CORS)
+app.add_middleware(RequestContextMiddleware)
+
 # Include API routes
 app.include_router(api_router, prefix=settings.API_PREFIX)  # ✅ Use config!
 
@@ -41,12 +98,24 @@ def root():
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Latency histograms and pool gauges in Prometheus text format."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
-    import uvicorn
-
-    uvicorn.run(
-        "main:app",
-        host=settings.HOST,  # ✅ Use config!
-        port=settings.PORT,  # ✅ Use config!
-        reload=settings.DEBUG,  # ✅ Use config!
-    )
+    if settings.is_production:
+        # Pre-forked workers with uvloop/httptools (see app.core.server)
+        from app.core.server import serve
+
+        serve(app)
+    else:
+        import uvicorn
+
+        uvicorn.run(
+            "main:app",
+            host=settings.HOST,  # ✅ Use config!
+            port=settings.PORT,  # ✅ Use config!
+            reload=settings.DEBUG,  # ✅ Use config!
+        )
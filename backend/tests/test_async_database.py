@@ -0,0 +1,170 @@
+"""Tests for the asyncpg-backed database helpers, against a fake pool."""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.core import async_database
+from app.core.async_database import (
+    close_async_pool,
+    execute_query,
+    execute_statement,
+    get_async_db,
+    get_async_pool,
+    stream_query,
+)
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = list(rows)
+
+    async def fetch(self, n):
+        batch, self.rows = self.rows[:n], self.rows[n:]
+        return batch
+
+
+class FakeConnection:
+    """Answers every query with `rows` and records how transactions ended."""
+
+    def __init__(self, rows=(), status="SELECT 0"):
+        self.rows = list(rows)
+        self.status = status
+        self.transactions = []
+
+    @asynccontextmanager
+    async def transaction(self):
+        try:
+            yield
+        except BaseException:
+            self.transactions.append("rollback")
+            raise
+        self.transactions.append("commit")
+
+    async def execute(self, query, *args):
+        return self.status
+
+    async def fetch(self, query, *args):
+        return self.rows
+
+    async def fetchrow(self, query, *args):
+        return self.rows[0] if self.rows else None
+
+    async def cursor(self, query, *args):
+        return FakeCursor(self.rows)
+
+
+class FakePool:
+    def __init__(self, connection):
+        self.connection = connection
+        self.closed = False
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.connection
+
+    async def close(self):
+        self.closed = True
+
+    def get_size(self):
+        return 4
+
+    def get_idle_size(self):
+        return 3
+
+
+@pytest.fixture
+def connection(monkeypatch):
+    connection = FakeConnection()
+    created = []
+
+    async def create_pool(dsn, **options):
+        await asyncio.sleep(0.01)
+        created.append(options)
+        return FakePool(connection)
+
+    monkeypatch.setattr(async_database, "_async_pool", None)
+    monkeypatch.setattr(async_database, "_async_pool_lock", asyncio.Lock())
+    monkeypatch.setattr(async_database.asyncpg, "create_pool", create_pool)
+    connection.created = created
+    return connection
+
+
+def test_concurrent_first_callers_share_one_pool(connection):
+    async def main():
+        return await asyncio.gather(*(get_async_pool() for _ in range(5)))
+
+    pools = asyncio.run(main())
+
+    assert len(connection.created) == 1
+    assert all(pool is pools[0] for pool in pools)
+
+
+def test_pool_is_created_with_configured_sizes(connection):
+    asyncio.run(async_database.init_async_pool(min_size=2, max_size=7))
+
+    options = connection.created[0]
+    assert (options["min_size"], options["max_size"]) == (2, 7)
+    assert options["init"] is async_database._init_connection
+
+
+@pytest.mark.parametrize(
+    "status, affected", [("UPDATE 3", 3), ("INSERT 0 1", 1), ("CREATE TABLE", 0)]
+)
+def test_execute_statement_returns_the_affected_row_count(connection, status, affected):
+    connection.status = status
+
+    assert asyncio.run(execute_statement("UPDATE example SET x = $1", 1)) == affected
+
+
+def test_execute_query_returns_dicts(connection):
+    connection.rows = [{"id": 1}, {"id": 2}]
+
+    assert asyncio.run(execute_query("SELECT id FROM example")) == [
+        {"id": 1},
+        {"id": 2},
+    ]
+    assert asyncio.run(execute_query("SELECT 1", fetch_one=True)) == {"id": 1}
+    connection.rows = []
+    assert asyncio.run(execute_query("SELECT 1", fetch_one=True)) is None
+
+
+def test_transactions_roll_back_on_error(connection):
+    async def main():
+        async with get_async_db():
+            pass
+        with pytest.raises(RuntimeError):
+            async with get_async_db():
+                raise RuntimeError("boom")
+
+    asyncio.run(main())
+
+    assert connection.transactions == ["commit", "rollback"]
+
+
+def test_stream_query_yields_batches(connection):
+    connection.rows = [{"id": n} for n in range(5)]
+
+    async def main():
+        return [
+            [row["id"] for row in batch]
+            async for batch in stream_query("SELECT id FROM example", batch_size=2)
+        ]
+
+    assert asyncio.run(main()) == [[0, 1], [2, 3], [4]]
+
+
+def test_close_resets_the_pool(connection):
+    async def main():
+        pool = await get_async_pool()
+        in_use = async_database._pool_in_use()
+        await close_async_pool()
+        return pool, in_use
+
+    pool, in_use = asyncio.run(main())
+
+    assert pool.closed
+    assert in_use == {(("pool", "async"),): 1}
+    assert async_database._async_pool is None
+    assert async_database._pool_in_use() is None
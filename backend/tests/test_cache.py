@@ -0,0 +1,165 @@
+"""Tests for the LLM response cache."""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.textGeneration import embeddings
+from app.textGeneration.cache import ResponseCache, normalize_query, query_hash
+from app.textGeneration.embeddings import HashingEmbeddings
+
+
+def test_miss_then_hit():
+    cache = ResponseCache()
+
+    async def main():
+        assert await cache.get("What is a monad?") is None
+        await cache.set("What is a monad?", "A monoid in...", "model-a")
+        return await cache.get("What is a monad?")
+
+    hit = asyncio.run(main())
+    assert (hit.content, hit.model, hit.tier) == ("A monoid in...", "model-a", "memory")
+    assert cache.stats.memory_hits == 1
+    assert cache.stats.misses == 1
+    assert cache.stats.as_dict()["hit_rate"] == 0.5
+
+
+def test_equivalent_queries_share_an_entry():
+    assert normalize_query("  What   is a Monad?? ") == "what is a monad"
+    assert query_hash("What is a monad?") == query_hash("what is a monad")
+
+    cache = ResponseCache()
+
+    async def main():
+        await cache.set("What is a monad?", "answer", "model-a")
+        return await cache.get("what   is a MONAD")
+
+    assert asyncio.run(main()).content == "answer"
+
+
+def test_entries_are_scoped_by_thread():
+    cache = ResponseCache()
+
+    async def main():
+        await cache.set("When is the midterm?", "Friday", "model-a", "thread-1")
+        return (
+            await cache.get("When is the midterm?", "thread-1"),
+            await cache.get("When is the midterm?", "thread-2"),
+            await cache.get("When is the midterm?"),
+        )
+
+    same, other, unscoped = asyncio.run(main())
+    assert same.content == "Friday"
+    assert other is None
+    assert unscoped is None
+
+
+def test_expired_entries_miss():
+    cache = ResponseCache(ttl_seconds=-1)
+
+    async def main():
+        await cache.set("query", "answer", "model-a")
+        return await cache.get("query")
+
+    assert asyncio.run(main()) is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2)
+
+    async def main():
+        await cache.set("a", "A", "model-a")
+        await cache.set("b", "B", "model-a")
+        await cache.get("a")
+        await cache.set("c", "C", "model-a")
+        return [await cache.get(query) for query in ("a", "b", "c")]
+
+    a, b, c = asyncio.run(main())
+    assert (a.content, b, c.content) == ("A", None, "C")
+    assert cache.stats.evictions == 1
+
+
+class CountingEmbeddings(HashingEmbeddings):
+    """Hashing embeddings that record which threads embedded queries."""
+
+    def __init__(self):
+        super().__init__()
+        self.threads = []
+
+    def embed_query(self, text):
+        self.threads.append(threading.get_ident())
+        return super().embed_query(text)
+
+
+@pytest.fixture
+def counting(monkeypatch):
+    counting = CountingEmbeddings()
+    monkeypatch.setattr(embeddings, "_embeddings", counting)
+    return counting
+
+
+def test_paraphrases_hit_the_semantic_tier(counting):
+    cache = ResponseCache(semantic=True, semantic_threshold=0.8)
+
+    async def main():
+        await cache.set("what is a monad in haskell", "answer", "model-a", "t")
+        return (
+            await cache.get("what is a monad in haskell please", "t"),
+            await cache.get("what is a monad in haskell please", "other"),
+            await cache.get("how do I bake bread", "t"),
+        )
+
+    similar, other_thread, unrelated = asyncio.run(main())
+    assert (similar.content, similar.tier) == ("answer", "semantic")
+    assert other_thread is None
+    assert unrelated is None
+
+
+def test_a_miss_is_embedded_once_and_off_the_event_loop(counting):
+    cache = ResponseCache(semantic=True)
+
+    async def main():
+        cached, vector = await cache.lookup("what is a monad", "t")
+        await cache.set("what is a monad", "answer", "model-a", "t", vector)
+        return cached, threading.get_ident()
+
+    cached, loop_thread = asyncio.run(main())
+    assert cached is None
+    assert len(counting.threads) == 1
+    assert loop_thread not in counting.threads
+
+
+def test_exact_hits_are_not_embedded(counting):
+    cache = ResponseCache(semantic=True)
+
+    async def main():
+        await cache.set("what is a monad", "answer", "model-a")
+        counting.threads.clear()
+        return await cache.get("What is a monad?")
+
+    assert asyncio.run(main()).tier == "memory"
+    assert counting.threads == []
+
+
+def test_semantic_index_follows_puts_and_evictions(counting):
+    cache = ResponseCache(max_entries=20, semantic=True, semantic_threshold=0.99)
+    queries = [f"question {n} about sorting lists" for n in range(30)]
+
+    async def main():
+        for n, query in enumerate(queries):
+            await cache.set(query, f"answer {n}", "model-a")
+        # Ask the embedding index directly, bypassing the exact tier
+        return [
+            cache._get_similar("", await cache.embed(query))
+            for query in (queries[5], queries[25])
+        ]
+
+    evicted, kept = asyncio.run(main())
+    assert evicted is None
+    assert kept.content == "answer 25"
+    vectors = cache._vectors[""]
+    assert sorted(vectors.keys) == sorted(hashed for _, hashed in cache._entries)
+    for hashed, row in vectors.rows.items():
+        assert vectors.keys[row] == hashed
@@ -0,0 +1,158 @@
+"""Tests for the thread-safe sync connection pool, against fake connections."""
+
+import threading
+import time
+
+import psycopg2
+import pytest
+
+from app.core import database
+from app.core.database import ManagedConnectionPool, PoolTimeoutError
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query):
+        self.connection.pings += 1
+        if self.connection.dead:
+            raise psycopg2.OperationalError("server closed the connection")
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.dead = False
+        self.pings = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        pass
+
+
+class FakeThreadedPool:
+    """Hands out idle connections first, opening new ones as needed."""
+
+    def __init__(self, minconn, maxconn, dsn):
+        self.idle = []
+        self.opened = []
+
+    def getconn(self):
+        if self.idle:
+            return self.idle.pop()
+        connection = FakeConnection()
+        self.opened.append(connection)
+        return connection
+
+    def putconn(self, connection, close=False):
+        if close:
+            connection.closed = 1
+        else:
+            self.idle.append(connection)
+
+    def closeall(self):
+        for connection in self.idle:
+            connection.closed = 1
+
+
+@pytest.fixture(autouse=True)
+def fake_psycopg_pool(monkeypatch):
+    monkeypatch.setattr(database, "ThreadedConnectionPool", FakeThreadedPool)
+
+
+def make_pool(**options) -> ManagedConnectionPool:
+    options.setdefault("acquire_timeout", 0.05)
+    options.setdefault("max_lifetime", 0)
+    options.setdefault("validate_idle", 0)
+    return ManagedConnectionPool(1, 2, "postgresql://fake", **options)
+
+
+def test_connections_are_reused():
+    pool = make_pool()
+
+    first = pool.getconn()
+    pool.putconn(first)
+
+    assert pool.getconn() is first
+    assert pool.stats()["in_use"] == 1
+    assert pool.stats()["acquired_total"] == 2
+
+
+def test_exhausted_pool_times_out():
+    pool = make_pool()
+    pool.getconn()
+    pool.getconn()
+
+    with pytest.raises(PoolTimeoutError):
+        pool.getconn()
+    assert pool.stats()["timeouts_total"] == 1
+    assert pool.stats()["waiting"] == 0
+
+
+def test_a_waiting_caller_gets_the_returned_connection():
+    pool = make_pool(acquire_timeout=5)
+    held = [pool.getconn(), pool.getconn()]
+    threading.Timer(0.05, pool.putconn, args=(held[0],)).start()
+
+    start = time.monotonic()
+    assert pool.getconn() is held[0]
+    assert time.monotonic() - start < 5
+
+
+def test_dead_idle_connections_are_replaced_on_checkout():
+    pool = make_pool()
+    connection = pool.getconn()
+    pool.putconn(connection)
+    connection.dead = True
+
+    replacement = pool.getconn()
+
+    assert replacement is not connection
+    assert connection.closed
+    assert pool.stats()["discarded_total"] == 1
+
+
+def test_recently_used_connections_skip_validation():
+    pool = make_pool(validate_idle=60)
+    connection = pool.getconn()
+    pings = connection.pings
+    pool.putconn(connection)
+
+    assert pool.getconn() is connection
+    assert connection.pings == pings
+
+
+def test_expired_and_broken_connections_are_closed_on_return():
+    pool = make_pool(max_lifetime=0.01)
+    old = pool.getconn()
+    time.sleep(0.02)
+    pool.putconn(old)
+
+    broken = pool.getconn()
+    pool.putconn(broken, close=True)
+
+    assert old.closed and broken.closed
+    assert pool.stats()["discarded_total"] == 2
+    assert pool.stats()["in_use"] == 0
+
+
+def test_forked_workers_open_their_own_pool(monkeypatch):
+    inherited = make_pool()
+    monkeypatch.setattr(database, "_connection_pool", inherited)
+    monkeypatch.setattr(database, "_pool_pid", -1)
+
+    connection = database.get_db_connection()
+
+    assert database._connection_pool is not inherited
+    assert database._pool_pid == database.os.getpid()
+    database.return_db_connection(connection)
+    assert database.get_pool_stats()["in_use"] == 0
@@ -0,0 +1,133 @@
+"""Tests for hybrid lexical + vector retrieval."""
+
+from contextlib import contextmanager
+
+import numpy as np
+import pytest
+
+from app.core import database
+from app.core.config import settings
+from app.retrieval.hybrid import (
+    BM25Index,
+    InMemoryHybridEngine,
+    PgHybridEngine,
+    reciprocal_rank_fusion,
+)
+from app.retrieval.vector import InMemoryVectorEngine, RetrievedChunk
+
+
+def chunk(source_id: str, text: str, thread_id: str = "t1") -> RetrievedChunk:
+    return RetrievedChunk(
+        source_type="post_chunk",
+        source_id=source_id,
+        thread_id=thread_id,
+        text=text,
+        token_count=None,
+        score=0.0,
+    )
+
+
+def test_rrf_prefers_items_ranked_well_by_both():
+    a, b, c = ("post_chunk", "a"), ("post_chunk", "b"), ("post_chunk", "c")
+
+    fused = reciprocal_rank_fusion([[a, b, c], [b, c]], rrf_k=60)
+
+    assert [key for key, _ in fused] == [b, c, a]
+    assert fused[0][1] == pytest.approx(1 / 62 + 1 / 61)
+
+
+def test_rrf_scores_are_descending_and_damped_by_k():
+    a, b = ("post_chunk", "a"), ("post_chunk", "b")
+
+    sharp = dict(reciprocal_rank_fusion([[a, b]], rrf_k=1))
+    flat = dict(reciprocal_rank_fusion([[a, b]], rrf_k=1000))
+
+    assert sharp[a] > sharp[b] and flat[a] > flat[b]
+    assert sharp[a] / sharp[b] > flat[a] / flat[b]
+
+
+def test_rrf_of_nothing_is_empty():
+    assert reciprocal_rank_fusion([[], []]) == []
+
+
+def test_bm25_ranks_rarer_terms_higher():
+    index = BM25Index()
+    index.add(
+        [
+            chunk("a", "the assignment is due on friday"),
+            chunk("b", "the midterm covers recursion"),
+            chunk("c", "the the the"),
+        ]
+    )
+
+    hits = index.search("recursion midterm", k=10)
+
+    assert [hit.source_id for hit, _ in hits] == ["b"]
+    assert index.search("unknown words", k=10) == []
+
+
+def test_hybrid_search_fuses_lexical_and_vector_hits():
+    engine = InMemoryHybridEngine(InMemoryVectorEngine(dimensions=2), 10, 60)
+    chunks = [
+        chunk("lexical", "lambda calculus reduction rules"),
+        chunk("vector", "how functions are evaluated"),
+        chunk("both", "lambda calculus evaluation"),
+        chunk("elsewhere", "lambda calculus", thread_id="t2"),
+    ]
+    vectors = np.array(
+        [[0.0, 1.0], [1.0, 0.0], [0.9, 0.1], [1.0, 0.0]], dtype=np.float32
+    )
+    engine.add(chunks, vectors)
+
+    results = engine.search("lambda calculus", [1.0, 0.0], "t1", k=3)
+
+    assert [result.source_id for result in results] == ["both", "lexical", "vector"]
+    assert all(result.thread_id == "t1" for result in results)
+    assert results[0].score > results[1].score
+
+
+class RecordingCursor:
+    """Records statements and returns canned rows."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    def execute(self, sql, params=None):
+        self.statements.append(sql)
+
+    def fetchall(self):
+        return self.rows
+
+
+def test_pg_search_sends_the_settings_and_the_query_in_two_round_trips(monkeypatch):
+    row = {
+        "source_type": "external",
+        "source_id": "d1",
+        "score": 0.03,
+        "thread_id": "t1",
+        "text": "slides",
+        "token_count": 3,
+        "metadata": None,
+    }
+    cursor = RecordingCursor([row])
+
+    class Connection:
+        def cursor(self):
+            return cursor
+
+    @contextmanager
+    def get_db():
+        yield Connection()
+
+    monkeypatch.setattr(database, "get_db", get_db)
+    monkeypatch.setattr(settings, "VECTOR_ITERATIVE_SCAN", True)
+
+    results = PgHybridEngine(ef_search=80).search("HW3", [0.1, 0.2], "t1", k=5)
+
+    settings_sql, query_sql = cursor.statements
+    assert "hnsw.ef_search = 80" in settings_sql
+    assert "hnsw.iterative_scan" in settings_sql
+    # Lexical document hits take their type from the chunk's embedding
+    assert "e.source_type::text FROM embeddings e" in query_sql
+    assert [(r.source_type, r.source_id) for r in results] == [("external", "d1")]
@@ -0,0 +1,137 @@
+"""Tests for incremental re-indexing from updated_at watermarks."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import jobs
+from app.ingestion.incremental import (
+    DOCUMENT_CHUNKS_PIPELINE,
+    POSTS_PIPELINE,
+    IncrementalIndexer,
+    decode_watermark,
+    encode_watermark,
+    enqueue_reindex,
+)
+from app.ingestion.pipeline import InMemoryChunkWriter, InMemoryPostSource
+from app.textGeneration.embeddings import HashingEmbeddings
+
+THREAD = "thread-1"
+EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def at(minutes: int) -> datetime:
+    return EPOCH + timedelta(minutes=minutes)
+
+
+@pytest.fixture
+def source():
+    posts = [
+        {
+            "id": f"p{n}",
+            "thread_id": THREAD,
+            "body_text": f"post {n}",
+            "updated_at": at(n),
+        }
+        for n in range(3)
+    ]
+    document_chunks = [
+        {
+            "id": f"d{n}",
+            "document_id": "doc",
+            "thread_id": THREAD,
+            "text_chunk": f"slide {n}",
+            "updated_at": at(n),
+        }
+        for n in range(2)
+    ]
+    return InMemoryPostSource(posts, document_chunks)
+
+
+@pytest.fixture
+def indexer(source):
+    return IncrementalIndexer(
+        source, InMemoryChunkWriter(), HashingEmbeddings(16), batch_size=2
+    )
+
+
+def test_watermarks_round_trip():
+    row = {"id": "p1", "updated_at": at(5)}
+
+    assert decode_watermark(encode_watermark(row)) == (at(5), "p1")
+    assert decode_watermark(None) is None
+
+
+def test_first_run_indexes_everything_and_stores_the_watermark(indexer):
+    posts = indexer.reindex_posts(THREAD)
+    documents = indexer.reindex_document_chunks(THREAD)
+
+    assert (posts.posts, posts.batches) == (3, 2)
+    assert documents.chunks == 2
+    checkpoint = indexer.writer.load_checkpoint
+    assert decode_watermark(checkpoint(POSTS_PIPELINE, THREAD)) == (at(2), "p2")
+    assert decode_watermark(checkpoint(DOCUMENT_CHUNKS_PIPELINE, THREAD)) == (
+        at(1),
+        "d1",
+    )
+
+
+def test_rows_behind_the_watermark_are_not_read_again(indexer):
+    indexer.reindex_posts(THREAD)
+    indexer.reindex_document_chunks(THREAD)
+
+    posts = indexer.reindex_posts(THREAD)
+    documents = indexer.reindex_document_chunks(THREAD)
+
+    assert (posts.posts, posts.skipped, posts.batches) == (0, 0, 0)
+    assert (documents.chunks, documents.skipped) == (0, 0)
+
+
+def test_only_edited_text_is_reembedded(indexer, source):
+    indexer.run([THREAD])
+    before = dict(indexer.writer.vectors)
+    p0_chunks = [row.id for row in indexer.writer.chunks["p0"]]
+
+    # p0 is touched without a text change, p1 is edited
+    source.posts[0]["updated_at"] = at(10)
+    source.posts[1].update(body_text="post 1, edited", updated_at=at(11))
+    source.document_chunks[0]["updated_at"] = at(10)
+    source.document_chunks[1].update(text_chunk="slide 1, edited", updated_at=at(11))
+    results = indexer.run([THREAD])
+
+    posts, documents = results[THREAD]["posts"], results[THREAD]["document_chunks"]
+    assert (posts.posts, posts.skipped) == (1, 1)
+    assert (documents.chunks, documents.skipped) == (1, 1)
+    assert indexer.writer.chunks["p1"][0].text_chunk == "post 1, edited"
+    assert [row.id for row in indexer.writer.chunks["p0"]] == p0_chunks
+    assert not (indexer.writer.vectors["d1"] == before["d1"]).all()
+    assert (indexer.writer.vectors["d0"] == before["d0"]).all()
+
+
+def test_run_covers_every_indexable_thread(source):
+    source.posts.append(
+        {"id": "q0", "thread_id": "thread-2", "body_text": "hi", "updated_at": at(0)}
+    )
+    indexer = IncrementalIndexer(source, InMemoryChunkWriter(), HashingEmbeddings(16))
+
+    results = indexer.run()
+
+    assert sorted(results) == [THREAD, "thread-2"]
+    assert results["thread-2"]["posts"].posts == 1
+
+
+def test_enqueue_reindex_queues_one_deduplicated_job_per_thread(monkeypatch):
+    queued = []
+
+    def enqueue(kind, payload, **options):
+        queued.append((kind, payload, options["dedupe_key"]))
+        # The second thread already has a job waiting
+        return None if payload["thread_id"] == "t2" else "job"
+
+    monkeypatch.setattr(jobs, "enqueue", enqueue)
+
+    assert enqueue_reindex(["t1", "t2"]) == 1
+    assert queued == [
+        ("index_thread", {"thread_id": "t1"}, "index_thread:t1"),
+        ("index_thread", {"thread_id": "t2"}, "index_thread:t2"),
+    ]
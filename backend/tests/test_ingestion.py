@@ -0,0 +1,113 @@
+"""Tests for chunking and the batched post ingestion pipeline."""
+
+import pytest
+
+from app.ingestion.chunking import chunk_text, count_tokens
+from app.ingestion.pipeline import (
+    PIPELINE_NAME,
+    InMemoryChunkWriter,
+    InMemoryPostSource,
+    PostIngestionPipeline,
+    batched,
+)
+from app.textGeneration.embeddings import HashingEmbeddings
+
+THREAD = "thread-1"
+
+
+def post(n: int, words: int = 30, thread_id: str = THREAD) -> dict:
+    return {
+        "id": f"post-{n:02d}",
+        "thread_id": thread_id,
+        "body_text": " ".join(f"w{n}x{i}" for i in range(words)),
+    }
+
+
+class FailingWriter(InMemoryChunkWriter):
+    """Fails the write after `fail_after` successful ones."""
+
+    def __init__(self, fail_after: int):
+        super().__init__()
+        self.fail_after = fail_after
+
+    def write(self, pipeline, scope, batch):
+        if self.fail_after == 0:
+            raise ConnectionError("database went away")
+        self.fail_after -= 1
+        super().write(pipeline, scope, batch)
+
+
+def pipeline(posts, writer, **options) -> PostIngestionPipeline:
+    options.setdefault("batch_size", 4)
+    options.setdefault("max_tokens", 10)
+    options.setdefault("overlap_tokens", 2)
+    return PostIngestionPipeline(
+        InMemoryPostSource(posts), writer, HashingEmbeddings(16), **options
+    )
+
+
+def test_chunks_overlap_and_cover_the_text():
+    text = " ".join(f"word{i}" for i in range(25))
+
+    chunks = list(chunk_text(text, max_tokens=10, overlap_tokens=3))
+
+    assert [c.token_count for c in chunks] == [10, 10, 10, 4]
+    assert chunks[0].text.split()[-3:] == chunks[1].text.split()[:3]
+    assert chunks[-1].text.endswith("word24")
+    assert count_tokens("Hello, world!") == 4
+
+
+def test_overlap_must_be_smaller_than_the_chunk():
+    with pytest.raises(ValueError):
+        list(chunk_text("some text", max_tokens=5, overlap_tokens=5))
+
+
+def test_batches_end_on_post_boundaries():
+    batches = list(batched([post(n) for n in range(5)], 5, 10, 2))
+
+    for batch in batches:
+        assert {row.post_id for row in batch.rows} == set(batch.post_ids)
+        assert batch.checkpoint == batch.post_ids[-1]
+    assert sum(batch.seen for batch in batches) == 5
+
+
+def test_run_embeds_and_writes_every_chunk():
+    writer = InMemoryChunkWriter()
+    posts = [post(n) for n in range(6)] + [post(9, thread_id="other")]
+
+    stats = pipeline(posts, writer).run(THREAD)
+
+    assert stats.posts == 6
+    assert set(writer.chunks) == {f"post-{n:02d}" for n in range(6)}
+    assert stats.chunks == sum(len(rows) for rows in writer.chunks.values())
+    assert len(writer.vectors) == stats.chunks
+    assert all(vector.shape == (16,) for vector in writer.vectors.values())
+    # A completed run leaves no checkpoint behind
+    assert writer.load_checkpoint(PIPELINE_NAME, THREAD) is None
+
+
+def test_interrupted_run_resumes_after_the_last_committed_batch():
+    posts = [post(n) for n in range(6)]
+    writer = FailingWriter(fail_after=1)
+
+    with pytest.raises(ConnectionError):
+        pipeline(posts, writer, batch_size=2).run(THREAD)
+    # Each post fills a batch, so only the first one was committed
+    assert writer.load_checkpoint(PIPELINE_NAME, THREAD) == "post-00"
+
+    writer.fail_after = 100
+    stats = pipeline(posts, writer, batch_size=2).run(THREAD)
+
+    assert stats.posts == 5
+    assert sorted(writer.chunks) == [f"post-{n:02d}" for n in range(6)]
+
+
+def test_reingesting_replaces_a_posts_chunks():
+    writer = InMemoryChunkWriter()
+    pipeline([post(0)], writer).run(THREAD)
+    before = len(writer.vectors)
+
+    pipeline([post(0, words=5)], writer).run(THREAD)
+
+    assert len(writer.chunks["post-00"]) == 1
+    assert len(writer.vectors) == 1 < before
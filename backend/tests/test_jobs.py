@@ -0,0 +1,112 @@
+"""Tests for the in-memory job queue and workers."""
+
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.jobs import InMemoryJobQueue, Worker
+
+
+@pytest.fixture(autouse=True)
+def no_retry_delay(monkeypatch):
+    monkeypatch.setattr(settings, "JOB_RETRY_BASE_DELAY", 0.0)
+
+
+def test_jobs_are_claimed_by_priority_then_age():
+    queue = InMemoryJobQueue()
+    low = queue.enqueue("work", {"n": 1})
+    high = queue.enqueue("work", {"n": 2}, priority=10)
+    later = queue.enqueue("work", {"n": 3})
+
+    claimed = [queue.claim("w", ["default"]).id for _ in range(3)]
+
+    assert claimed == [high, low, later]
+    assert queue.claim("w", ["default"]) is None
+
+
+def test_jobs_are_only_claimed_from_polled_queues():
+    queue = InMemoryJobQueue()
+    queue.enqueue("work", queue="indexing")
+
+    assert queue.claim("w", ["summaries"]) is None
+    assert queue.claim("w", ["indexing"]).kind == "work"
+
+
+def test_delayed_jobs_wait_until_due():
+    queue = InMemoryJobQueue()
+    queue.enqueue("work", delay=60)
+
+    assert queue.claim("w", ["default"]) is None
+
+
+def test_failed_job_is_retried_until_out_of_attempts():
+    queue = InMemoryJobQueue()
+    job_id = queue.enqueue("work", max_attempts=2)
+
+    first = queue.claim("w", ["default"])
+    assert first.attempts == 1
+    assert queue.fail(first, "boom") is True
+    assert queue.get(job_id).status == "queued"
+
+    second = queue.claim("w", ["default"])
+    assert second.attempts == 2
+    assert queue.fail(second, "boom again") is False
+    assert queue.get(job_id).status == "failed"
+    assert queue.get(job_id).last_error == "boom again"
+
+
+def test_dedupe_key_keeps_one_queued_job():
+    queue = InMemoryJobQueue()
+
+    first = queue.enqueue("refresh", dedupe_key="thread-1")
+    assert queue.enqueue("refresh", dedupe_key="thread-1") is None
+    assert queue.enqueue("refresh", dedupe_key="thread-2") is not None
+
+    # Once the first job runs, the same work can be queued again
+    assert queue.claim("w", ["default"]).id == first
+    assert queue.enqueue("refresh", dedupe_key="thread-1") is not None
+
+
+def test_retry_is_dropped_when_an_equal_job_is_queued():
+    queue = InMemoryJobQueue()
+    job_id = queue.enqueue("refresh", dedupe_key="thread-1", max_attempts=3)
+    job = queue.claim("w", ["default"])
+    queue.enqueue("refresh", dedupe_key="thread-1")
+
+    assert queue.fail(job, "boom") is False
+    assert queue.get(job_id).status == "failed"
+    assert len(queue) == 1
+
+
+def test_expired_locks_are_released():
+    queue = InMemoryJobQueue()
+    job_id = queue.enqueue("work")
+    queue.claim("w", ["default"])
+    queue.get(job_id).locked_at = time.monotonic() - 120
+
+    assert queue.requeue_expired(60) == 1
+    assert queue.get(job_id).status == "queued"
+
+
+def test_worker_runs_handlers_and_records_outcomes():
+    queue = InMemoryJobQueue()
+    seen = []
+
+    async def succeed(value):
+        seen.append(value)
+
+    def fail():
+        raise RuntimeError("boom")
+
+    worker = Worker(queue, handlers={"succeed": succeed, "fail": fail})
+    queue.enqueue("succeed", {"value": 42})
+    queue.enqueue("fail", max_attempts=1)
+    queue.enqueue("unknown", max_attempts=1)
+
+    while worker.run_once():
+        pass
+
+    assert seen == [42]
+    assert worker.stats.as_dict() == {"succeeded": 1, "retried": 0, "failed": 2}
+    assert queue.counts() == {"succeeded": 1, "failed": 2}
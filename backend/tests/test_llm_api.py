@@ -0,0 +1,328 @@
+"""Tests for the LLM endpoints."""
+
+import asyncio
+import json
+import uuid
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.api.endpoints import llm
+from app.core.config import settings
+from app.core.rate_limit import RateLimitExceeded
+from app.models import BatchQueryRequest, QueryRequest
+from app.textGeneration import cache as response_cache
+from app.textGeneration.cache import ResponseCache
+from app.textGeneration.llm_service import StreamInfo
+
+
+class RecordingLimiter:
+    """Admits everything and records token charges."""
+
+    def __init__(self):
+        self.charges = []
+
+    async def acquire(self, caller, thread_id=None):
+        pass
+
+    async def acquire_many(self, caller, requests):
+        pass
+
+    async def record_tokens(self, caller, thread_id, token_count):
+        self.charges.append(token_count)
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    limiter = RecordingLimiter()
+    monkeypatch.setattr(llm, "get_rate_limiter", lambda: limiter)
+    return limiter
+
+
+@pytest.fixture
+def logs(monkeypatch):
+    """Query log rows recorded by the endpoints."""
+    rows = []
+    monkeypatch.setattr(llm, "record_query_log", lambda **row: rows.append(row))
+    return rows
+
+
+@pytest.fixture
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "RAG_ENABLED", False)
+    monkeypatch.setattr(response_cache, "_response_cache", ResponseCache())
+
+
+def post(path: str, body: dict) -> httpx.Response:
+    from main import app
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            return await c.post(settings.API_PREFIX + path, json=body)
+
+    return asyncio.run(main())
+
+
+def asked(query: str) -> dict:
+    return {
+        "query": query,
+        "user_id": str(uuid.uuid4()),
+        "thread_id": str(uuid.uuid4()),
+    }
+
+
+def fake_stream(monkeypatch, tokens, model="model-a", cached=False, error=None):
+    """Make astream_llm_response yield `tokens`, then raise `error` if given."""
+
+    async def stream(query, thread_id=None, on_start=None):
+        on_start(StreamInfo(model, cached=cached))
+        for token in tokens:
+            await asyncio.sleep(0)
+            yield token
+        if error is not None:
+            raise error
+
+    monkeypatch.setattr(llm, "astream_llm_response", stream)
+
+
+def parse_sse(frames):
+    """(event, data) per SSE frame."""
+    events = []
+    for frame in frames:
+        event = "message"
+        for line in frame.strip().splitlines():
+            if line.startswith("event: "):
+                event = line[len("event: ") :]
+            elif line.startswith("data: "):
+                events.append((event, json.loads(line[len("data: ") :])))
+    return events
+
+
+async def collect(stream, limit=None):
+    frames = []
+    async for frame in stream:
+        frames.append(frame)
+        if limit is not None and len(frames) == limit:
+            await stream.aclose()
+            break
+    return frames
+
+
+QUERY = QueryRequest(query="what is recursion")
+
+
+def test_completed_stream_is_charged(monkeypatch, limiter):
+    fake_stream(monkeypatch, ["one ", "two ", "three"])
+
+    asyncio.run(collect(llm._stream_events(QUERY, "ip:1")))
+
+    assert limiter.charges == [
+        llm.count_tokens(QUERY.query) + llm.count_tokens("one two three")
+    ]
+
+
+def test_disconnected_stream_is_charged_for_what_was_generated(monkeypatch, limiter):
+    fake_stream(monkeypatch, ["one ", "two ", "three"])
+
+    frames = asyncio.run(collect(llm._stream_events(QUERY, "ip:1"), limit=2))
+
+    assert len(frames) == 2
+    assert limiter.charges == [
+        llm.count_tokens(QUERY.query) + llm.count_tokens("one two ")
+    ]
+
+
+def test_failed_stream_is_charged_and_reports_an_error(monkeypatch, limiter):
+    fake_stream(monkeypatch, ["partial"], error=RuntimeError("upstream broke"))
+
+    events = parse_sse(asyncio.run(collect(llm._stream_events(QUERY, "ip:1"))))
+
+    assert events[-1][0] == "error"
+    assert "upstream broke" in events[-1][1]["detail"]
+    assert limiter.charges == [
+        llm.count_tokens(QUERY.query) + llm.count_tokens("partial")
+    ]
+
+
+def test_cached_stream_is_not_charged(monkeypatch, limiter):
+    fake_stream(monkeypatch, ["cached answer"], cached=True)
+
+    asyncio.run(collect(llm._stream_events(QUERY, "ip:1")))
+
+    assert limiter.charges == []
+
+
+def test_every_answer_is_logged_and_cache_hits_are_marked(limiter, logs, fresh_cache):
+    body = asked("What is a monad?")
+
+    first = post("/llm/query", body)
+    second = post("/llm/query", body)
+
+    assert [first.json()["cached"], second.json()["cached"]] == [False, True]
+    assert [row["cached"] for row in logs] == [False, True]
+    assert all(row["query_response"] == "Echo: What is a monad?" for row in logs)
+    assert all(row["duration_ms"] is not None for row in logs)
+
+
+def test_streamed_cache_hits_are_logged(monkeypatch, limiter, logs):
+    fake_stream(monkeypatch, ["cached answer"], cached=True)
+    request = QueryRequest(**asked("what is recursion"))
+
+    asyncio.run(collect(llm._stream_events(request, "ip:1")))
+
+    assert len(logs) == 1
+    assert logs[0]["cached"] is True
+    assert logs[0]["query_response"] == "cached answer"
+
+
+def test_queries_without_user_and_thread_are_not_logged(limiter, logs, fresh_cache):
+    post("/llm/query", {"query": "anonymous question"})
+
+    assert logs == []
+
+
+def test_sse_frames_survive_newlines_in_tokens():
+    frame = llm._sse_event({"token": "line one\n\nline two"}, event="message")
+
+    assert frame.endswith("\n\n")
+    assert frame.count("\n\n") == 1
+    assert parse_sse([frame]) == [("message", {"token": "line one\n\nline two"})]
+
+
+def test_stream_endpoint_sends_tokens_then_done(monkeypatch, limiter, logs):
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "RAG_ENABLED", False)
+
+    response = post("/llm/query/stream", {"query": "what is recursion"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["cache-control"] == "no-cache"
+    events = parse_sse(response.text.split("\n\n"))
+    tokens = [data["token"] for event, data in events if event == "message"]
+    assert len(tokens) > 1
+    assert "".join(tokens).strip() == "Echo: what is recursion"
+    assert events[-1][0] == "done"
+    assert events[-1][1]["model"]
+
+
+def test_stream_endpoint_refuses_up_front_when_no_model_can_answer(
+    monkeypatch, limiter
+):
+    monkeypatch.setattr(llm, "upstream_retry_after", lambda query: 7.0)
+
+    response = post("/llm/query/stream", {"query": "what is recursion"})
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "7"
+    assert limiter.charges == []
+
+
+def answered(query: str, total_tokens: int = 50):
+    return SimpleNamespace(
+        content=f"Echo: {query}",
+        model="model-a",
+        sources=[],
+        duration_ms=1.0,
+        cached=False,
+        total_tokens=total_tokens,
+    )
+
+
+def fake_batch(monkeypatch, outcomes, then_hang=False):
+    """Make abatch_llm_responses yield `outcomes` in order, then maybe hang."""
+
+    async def batch(queries):
+        for index, outcome in outcomes:
+            await asyncio.sleep(0)
+            yield index, outcome
+        if then_hang:
+            await asyncio.sleep(60)
+
+    monkeypatch.setattr(llm, "abatch_llm_responses", batch)
+
+
+BATCH = BatchQueryRequest(
+    queries=[QueryRequest(query=q) for q in ("first?", "second?", "third?")]
+)
+
+
+def test_batch_results_stream_as_ndjson_with_errors_per_line(monkeypatch, limiter):
+    fake_batch(
+        monkeypatch,
+        [
+            (1, answered("second?", total_tokens=30)),
+            (0, asyncio.TimeoutError()),
+            (2, answered("third?", total_tokens=40)),
+        ],
+    )
+
+    lines = [
+        json.loads(line)
+        for line in asyncio.run(collect(llm._batch_results(BATCH, "ip:1")))
+    ]
+
+    assert [line["index"] for line in lines] == [1, 0, 2]
+    assert lines[0]["response"] == "Echo: second?"
+    assert (lines[1]["status_code"], lines[1]["error"]) == (
+        504,
+        "LLM response timed out",
+    )
+    reserved = [llm._reserved_tokens(request) for request in BATCH.queries]
+    # Each reservation is settled with what the query actually used
+    assert limiter.charges == [30 - reserved[1], -reserved[0], 40 - reserved[2]]
+
+
+def test_disconnect_refunds_the_queries_that_never_ran(monkeypatch, limiter):
+    fake_batch(monkeypatch, [(0, answered("first?", total_tokens=30))], then_hang=True)
+
+    frames = asyncio.run(collect(llm._batch_results(BATCH, "ip:1"), limit=1))
+
+    assert len(frames) == 1
+    reserved = [llm._reserved_tokens(request) for request in BATCH.queries]
+    assert limiter.charges[0] == 30 - reserved[0]
+    assert sorted(limiter.charges[1:]) == sorted([-reserved[1], -reserved[2]])
+
+
+def test_batch_endpoint_answers_every_query(limiter, logs, fresh_cache):
+    body = {"queries": [asked("first?"), asked("second?"), asked("first?")]}
+
+    response = post("/llm/query/batch", body)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = sorted(
+        (json.loads(line) for line in response.text.splitlines()),
+        key=lambda line: line["index"],
+    )
+    assert [line["response"] for line in lines] == [
+        "Echo: first?",
+        "Echo: second?",
+        "Echo: first?",
+    ]
+    assert all(line["status_code"] == 200 for line in lines)
+    assert len(logs) == 3
+
+
+def test_oversized_batches_are_rejected(monkeypatch, limiter):
+    monkeypatch.setattr(settings, "LLM_BATCH_MAX_QUERIES", 2)
+
+    response = post("/llm/query/batch", BATCH.model_dump(mode="json"))
+
+    assert response.status_code == 413
+
+
+def test_batches_over_the_limit_are_rejected_whole(monkeypatch, limiter):
+    async def acquire_many(caller, requests):
+        raise RateLimitExceeded("caller", retry_after=2.5)
+
+    monkeypatch.setattr(limiter, "acquire_many", acquire_many)
+
+    response = post("/llm/query/batch", BATCH.model_dump(mode="json"))
+
+    assert response.status_code == 429
+    assert "retry-after" in response.headers
+    assert limiter.charges == []
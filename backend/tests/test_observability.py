@@ -0,0 +1,137 @@
+"""Tests for request IDs, request timing and the metrics registry."""
+
+import asyncio
+import logging
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.core.metrics import Histogram, MetricsRegistry, timer
+from app.core.observability import (
+    HTTP_REQUEST_SECONDS,
+    REQUEST_ID_HEADER,
+    RequestContextMiddleware,
+    RequestIdLogFilter,
+    configure_logging,
+    current_request_id,
+    request_elapsed_ms,
+)
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestContextMiddleware)
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int):
+        return {"request_id": current_request_id(), "elapsed": request_elapsed_ms()}
+
+    return app
+
+
+def get(app: FastAPI, path: str, headers: dict = None) -> httpx.Response:
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            return await c.get(path, headers=headers)
+
+    return asyncio.run(main())
+
+
+def test_request_id_is_generated_and_echoed():
+    response = get(make_app(), "/items/1")
+
+    request_id = response.headers[REQUEST_ID_HEADER]
+    assert len(request_id) == 32
+    assert response.json()["request_id"] == request_id
+    assert response.json()["elapsed"] >= 0
+
+
+def test_valid_incoming_request_id_is_kept():
+    response = get(make_app(), "/items/1", {REQUEST_ID_HEADER: "trace-42.a_b"})
+
+    assert response.headers[REQUEST_ID_HEADER] == "trace-42.a_b"
+
+
+@pytest.mark.parametrize(
+    "incoming", ["x" * 65, "id with spaces", "abc\tFAKE LOG LINE", "id;drop"]
+)
+def test_unsafe_incoming_request_id_is_replaced(incoming):
+    response = get(make_app(), "/items/1", {REQUEST_ID_HEADER: incoming})
+
+    assert response.headers[REQUEST_ID_HEADER] != incoming
+    assert len(response.headers[REQUEST_ID_HEADER]) == 32
+
+
+def test_requests_are_timed_by_route_template():
+    child = HTTP_REQUEST_SECONDS.labels(
+        method="GET", route="/items/{item_id}", status=200
+    )
+    before = child.snapshot()["count"]
+
+    get(make_app(), "/items/1")
+    get(make_app(), "/items/2")
+
+    assert child.snapshot()["count"] == before + 2
+
+
+def test_no_request_context_outside_a_request():
+    assert current_request_id() is None
+    assert request_elapsed_ms() is None
+
+
+def test_configure_logging_installs_one_handler():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    try:
+        configure_logging(logging.INFO)
+        configure_logging(logging.DEBUG)
+        ours = [
+            handler
+            for handler in root.handlers
+            if any(isinstance(f, RequestIdLogFilter) for f in handler.filters)
+        ]
+        assert len(ours) == 1
+        assert root.level == logging.DEBUG
+    finally:
+        root.handlers[:] = handlers
+        root.setLevel(level)
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+
+    assert snapshot["buckets"] == {"0.1": 2, "1.0": 3, "+Inf": 4}
+    assert snapshot["count"] == 4
+    assert snapshot["sum"] == pytest.approx(3.65)
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    family = registry.histogram("job_seconds", "Job time", buckets=(1.0,))
+    family.labels(kind='say "hi"').observe(0.5)
+    registry.gauge("pool_size", "Open connections", lambda: {(("pool", "a"),): 3})
+    registry.gauge("absent", "Not exported", lambda: None)
+
+    text = registry.render()
+
+    assert "# TYPE job_seconds histogram" in text
+    assert 'job_seconds_bucket{kind="say \\"hi\\"",le="1.0"} 1' in text
+    assert 'job_seconds_count{kind="say \\"hi\\""} 1' in text
+    assert 'pool_size{pool="a"} 3' in text
+    assert "absent" not in text
+
+
+def test_timer_observes_on_error():
+    histogram = Histogram()
+
+    with pytest.raises(RuntimeError):
+        with timer(histogram):
+            raise RuntimeError("boom")
+
+    assert histogram.snapshot()["count"] == 1
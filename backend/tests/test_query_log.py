@@ -0,0 +1,138 @@
+"""Tests for the batched query log sink."""
+
+import asyncio
+
+import pytest
+
+from app.core import query_log
+from app.core.config import settings
+from app.core.query_log import QueryLogSink, record_query_log
+
+
+class RecordingWriter:
+    """Collects written batches; fails while `failing` is set."""
+
+    def __init__(self):
+        self.batches = []
+        self.failing = False
+
+    async def __call__(self, rows):
+        if self.failing:
+            raise ConnectionError("database is down")
+        self.batches.append(list(rows))
+
+
+def row(n: int) -> tuple:
+    return (f"user-{n}", "thread", f"query {n}", "answer", None, None, 1.0, "m", False)
+
+
+def test_rows_are_written_in_batches_on_close():
+    writer = RecordingWriter()
+
+    async def main():
+        sink = QueryLogSink(writer, max_queue=100, batch_size=2, flush_interval=60)
+        for n in range(5):
+            assert sink.put(row(n))
+        await sink.close()
+        return sink
+
+    sink = asyncio.run(main())
+    assert [len(batch) for batch in writer.batches] == [2, 2, 1]
+    assert [r[0] for batch in writer.batches for r in batch] == [
+        f"user-{n}" for n in range(5)
+    ]
+    assert sink.stats.as_dict() == {
+        "enqueued": 5,
+        "written": 5,
+        "dropped": 0,
+        "failed": 0,
+        "batches": 3,
+    }
+
+
+def test_a_full_batch_is_flushed_without_waiting():
+    writer = RecordingWriter()
+
+    async def main():
+        sink = QueryLogSink(writer, max_queue=100, batch_size=3, flush_interval=60)
+        for n in range(3):
+            sink.put(row(n))
+        for _ in range(10):
+            await asyncio.sleep(0)
+        written = list(writer.batches)
+        await sink.close()
+        return written
+
+    assert [len(batch) for batch in asyncio.run(main())] == [3]
+
+
+@pytest.mark.parametrize(
+    "policy, kept", [("drop_newest", [0, 1]), ("drop_oldest", [1, 2])]
+)
+def test_full_queue_drops_by_policy(policy, kept):
+    writer = RecordingWriter()
+
+    async def main():
+        sink = QueryLogSink(
+            writer, max_queue=2, batch_size=10, flush_interval=60, drop_policy=policy
+        )
+        results = [sink.put(row(n)) for n in range(3)]
+        await sink.close()
+        return sink, results
+
+    sink, results = asyncio.run(main())
+    assert results == [True, True, False]
+    assert sink.stats.dropped == 1
+    assert [r[0] for r in writer.batches[0]] == [f"user-{n}" for n in kept]
+
+
+def test_unknown_drop_policy_is_rejected():
+    with pytest.raises(ValueError):
+        QueryLogSink(RecordingWriter(), drop_policy="drop_everything")
+
+
+def test_failed_batches_are_counted_and_do_not_stop_the_sink():
+    writer = RecordingWriter()
+
+    async def main():
+        sink = QueryLogSink(writer, max_queue=100, batch_size=1, flush_interval=60)
+        writer.failing = True
+        sink.put(row(0))
+        await sink.flush()
+        writer.failing = False
+        sink.put(row(1))
+        await sink.close()
+        return sink
+
+    sink = asyncio.run(main())
+    assert sink.stats.failed == 1
+    assert sink.stats.written == 1
+    assert writer.batches == [[row(1)]]
+
+
+def test_slow_writer_rows_are_counted_as_dropped_on_shutdown():
+    async def slow_writer(rows):
+        await asyncio.sleep(10)
+
+    async def main():
+        sink = QueryLogSink(slow_writer, max_queue=100, batch_size=1, flush_interval=60)
+        sink.put(row(0))
+        sink.put(row(1))
+        await sink.close(timeout=0.05)
+        return sink
+
+    assert asyncio.run(main()).stats.dropped == 2
+
+
+def test_record_query_log_queues_a_row(monkeypatch):
+    writer = RecordingWriter()
+    monkeypatch.setattr(settings, "QUERY_LOG_ENABLED", True)
+
+    async def main():
+        sink = QueryLogSink(writer, max_queue=10, batch_size=10, flush_interval=60)
+        monkeypatch.setattr(query_log, "_query_log_sink", sink)
+        record_query_log("u", "t", "q", "a", model="m", cached=True)
+        await sink.close()
+
+    asyncio.run(main())
+    assert writer.batches == [[("u", "t", "q", "a", None, None, None, "m", True)]]
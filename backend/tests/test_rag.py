@@ -0,0 +1,125 @@
+"""Tests for retrieval-augmented prompt construction."""
+
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.retrieval import hybrid
+from app.retrieval.vector import RetrievedChunk
+from app.textGeneration.rag import (
+    CHUNK_OVERHEAD_TOKENS,
+    build_prompt,
+    chunk_tokens,
+    pack_chunks,
+    retrieve_context,
+)
+
+
+def chunk(
+    source_id: str, score: float, tokens: int = 10, text: str = None
+) -> RetrievedChunk:
+    return RetrievedChunk(
+        source_type="post_chunk",
+        source_id=source_id,
+        thread_id="t1",
+        text=text if text is not None else f"text of {source_id}",
+        token_count=tokens,
+        score=score,
+    )
+
+
+def ids(chunks):
+    return [c.source_id for c in chunks]
+
+
+def test_chunks_are_packed_best_first():
+    chunks = [chunk("low", 0.1), chunk("high", 0.9), chunk("mid", 0.5)]
+
+    assert ids(pack_chunks(chunks, budget_tokens=1000)) == ["high", "mid", "low"]
+
+
+def test_packing_stays_within_the_budget():
+    chunks = [chunk(f"c{n}", 1 - n / 10) for n in range(5)]
+    budget = 3 * (10 + CHUNK_OVERHEAD_TOKENS)
+
+    packed = pack_chunks(chunks, budget)
+
+    assert ids(packed) == ["c0", "c1", "c2"]
+    assert sum(chunk_tokens(c) + CHUNK_OVERHEAD_TOKENS for c in packed) <= budget
+
+
+def test_oversized_chunks_are_skipped_for_smaller_ones():
+    chunks = [chunk("huge", 0.9, tokens=500), chunk("small", 0.5)]
+
+    assert ids(pack_chunks(chunks, budget_tokens=50)) == ["small"]
+
+
+def test_duplicate_sources_and_texts_are_dropped():
+    chunks = [
+        chunk("a", 0.9, text="Use   a stack."),
+        chunk("a", 0.8, text="Another slice of a"),
+        chunk("b", 0.7, text="use a stack."),
+        chunk("c", 0.6, text="Use a stack."),
+        chunk("blank", 0.5, text="   "),
+    ]
+
+    # Whitespace differences do not make a text distinct; case does
+    assert ids(pack_chunks(chunks, budget_tokens=1000)) == ["a", "b"]
+
+
+def test_missing_token_counts_are_estimated_from_text():
+    estimated = chunk("x", 1.0, text="x" * 30)
+    estimated.token_count = None
+
+    assert chunk_tokens(estimated) == 10
+
+
+def test_prompt_numbers_its_sources():
+    prompt = build_prompt("Why?", [chunk("a", 1, text=" first "), chunk("b", 1)])
+
+    assert "[1] first\n[2] text of b" in prompt
+    assert prompt.endswith("Question: Why?")
+
+
+@pytest.fixture
+def rag_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "RAG_ENABLED", True)
+
+
+def test_context_is_retrieved_for_thread_queries(monkeypatch, rag_enabled):
+    searched = []
+
+    def search(query, thread_id, k):
+        searched.append((query, thread_id, k))
+        return [chunk("a", 0.9), chunk("b", 0.8)]
+
+    monkeypatch.setattr(hybrid, "hybrid_search", search)
+
+    context = asyncio.run(retrieve_context("Why?", "t1", k=5, budget_tokens=1000))
+
+    assert searched == [("Why?", "t1", 5)]
+    assert ids(context.sources) == ["a", "b"]
+    assert context.context_tokens == 2 * (10 + CHUNK_OVERHEAD_TOKENS)
+    assert context.results()[0] == {
+        "source_type": "post_chunk",
+        "source_id": "a",
+        "score": 0.9,
+    }
+
+
+def test_queries_without_a_thread_are_not_grounded(rag_enabled):
+    context = asyncio.run(retrieve_context("Why?", None))
+
+    assert (context.prompt, context.sources) == ("Why?", [])
+
+
+def test_failed_retrieval_falls_back_to_the_bare_query(monkeypatch, rag_enabled):
+    def search(query, thread_id, k):
+        raise ConnectionError("database is down")
+
+    monkeypatch.setattr(hybrid, "hybrid_search", search)
+
+    context = asyncio.run(retrieve_context("Why?", "t1"))
+
+    assert (context.prompt, context.sources) == ("Why?", [])
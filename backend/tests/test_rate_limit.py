@@ -0,0 +1,142 @@
+"""Tests for the token-bucket rate limiter."""
+
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.core.rate_limit import (
+    InMemoryRateLimitStore,
+    RateLimiter,
+    RateLimitExceeded,
+    retry_after_header,
+)
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "RATE_LIMIT_USER_REQUESTS_PER_MIN", 3)
+    monkeypatch.setattr(settings, "RATE_LIMIT_USER_TOKENS_PER_MIN", 1000)
+    monkeypatch.setattr(settings, "RATE_LIMIT_THREAD_REQUESTS_PER_MIN", 5)
+    monkeypatch.setattr(settings, "RATE_LIMIT_THREAD_TOKENS_PER_MIN", 10000)
+    return RateLimiter(InMemoryRateLimitStore())
+
+
+def test_requests_over_the_burst_are_rejected(limiter):
+    async def main():
+        for _ in range(3):
+            await limiter.acquire("ip:1.2.3.4")
+        with pytest.raises(RateLimitExceeded) as error:
+            await limiter.acquire("ip:1.2.3.4")
+        return error.value
+
+    error = asyncio.run(main())
+    assert error.scope == "user:ip:1.2.3.4:requests"
+    # 3 per minute refill one request every 20 seconds
+    assert 19 < error.retry_after <= 20
+
+
+def test_callers_have_separate_buckets(limiter):
+    async def main():
+        for _ in range(3):
+            await limiter.acquire("ip:1.1.1.1")
+        await limiter.acquire("ip:2.2.2.2")
+
+    asyncio.run(main())
+
+
+def test_thread_limit_rejection_refunds_the_user_bucket(limiter, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_THREAD_REQUESTS_PER_MIN", 1)
+
+    async def main():
+        await limiter.acquire("ip:other", "thread-1")
+        with pytest.raises(RateLimitExceeded):
+            await limiter.acquire("ip:1.2.3.4", "thread-1")
+        # The rejected request did not spend one of this caller's requests
+        for _ in range(3):
+            await limiter.acquire("ip:1.2.3.4")
+
+    asyncio.run(main())
+
+
+def test_token_usage_is_debited_after_the_answer(limiter):
+    async def main():
+        await limiter.acquire("ip:1.2.3.4")
+        await limiter.record_tokens("ip:1.2.3.4", None, 1000)
+        with pytest.raises(RateLimitExceeded) as error:
+            await limiter.acquire("ip:1.2.3.4")
+        return error.value
+
+    assert asyncio.run(main()).scope == "user:ip:1.2.3.4:tokens"
+
+
+def test_batches_are_admitted_all_or_nothing(limiter):
+    async def main():
+        with pytest.raises(RateLimitExceeded):
+            await limiter.acquire_many("ip:1.2.3.4", [(None, 10)] * 4)
+        # Nothing was taken by the rejected batch
+        await limiter.acquire_many("ip:1.2.3.4", [(None, 10)] * 3)
+
+    asyncio.run(main())
+
+
+def test_batch_token_reservations_are_settled(limiter):
+    async def main():
+        await limiter.acquire_many("ip:1.2.3.4", [(None, 600)])
+        with pytest.raises(RateLimitExceeded):
+            await limiter.acquire_many("ip:1.2.3.4", [(None, 600)])
+        # Only 100 of the 600 reserved tokens were used
+        await limiter.record_tokens("ip:1.2.3.4", None, 100 - 600)
+        await limiter.acquire_many("ip:1.2.3.4", [(None, 600)])
+
+    asyncio.run(main())
+
+
+def test_store_failure_admits_the_request(limiter):
+    class BrokenStore:
+        async def consume(self, key, amount, capacity, rate):
+            raise ConnectionError("database is down")
+
+    limiter.store = BrokenStore()
+    asyncio.run(limiter.acquire("ip:1.2.3.4"))
+
+
+def test_disabled_limiter_admits_everything(limiter, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+
+    async def main():
+        for _ in range(10):
+            await limiter.acquire("ip:1.2.3.4")
+
+    asyncio.run(main())
+
+
+def test_buckets_refill_over_time():
+    store = InMemoryRateLimitStore()
+
+    async def main():
+        assert await store.consume("key", 60, 60, 1.0) == (True, 0)
+        granted, _ = await store.consume("key", 1, 60, 1.0)
+        assert not granted
+        store._buckets["key"] = (0.0, store._buckets["key"][1] - 2)
+        granted, left = await store.consume("key", 1, 60, 1.0)
+        assert granted and 0.9 < left < 1.1
+
+    asyncio.run(main())
+
+
+def test_refunds_do_not_exceed_capacity():
+    store = InMemoryRateLimitStore()
+
+    async def main():
+        await store.debit("key", -100, 60, 1.0)
+        return await store.consume("key", 0, 60, 1.0)
+
+    granted, left = asyncio.run(main())
+    assert granted and left == pytest.approx(60)
+
+
+def test_retry_after_header_rounds_up():
+    assert retry_after_header(0.2) == {"Retry-After": "1"}
+    assert retry_after_header(19.1) == {"Retry-After": "20"}
@@ -0,0 +1,132 @@
+"""Tests for the LLM circuit breaker and retries."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.textGeneration.fake import FakeUpstreamError
+from app.textGeneration.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    call_with_retries,
+)
+
+
+def open_breaker(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold):
+        breaker.before_call()
+        breaker.record_failure()
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError) as error:
+        breaker.before_call()
+    assert 1.0 <= error.value.retry_after <= 30
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_half_open_admits_one_trial_call():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    open_breaker(breaker)
+    breaker.opened_at = time.monotonic() - 30
+
+    assert breaker.state == "half_open"
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_trial_success_closes_the_circuit():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    open_breaker(breaker)
+    breaker.opened_at = time.monotonic() - 30
+
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.as_dict() == {"state": "closed", "consecutive_failures": 0}
+
+
+def test_trial_failure_reopens_the_circuit():
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30)
+    open_breaker(breaker)
+    breaker.opened_at = time.monotonic() - 30
+
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_abandoned_trial_lets_another_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    open_breaker(breaker)
+    breaker.opened_at = time.monotonic() - 30
+
+    breaker.before_call()
+    breaker.record_abandoned()
+    breaker.before_call()
+    assert breaker.state == "half_open"
+
+
+def test_retries_transient_errors_until_success(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_RETRY_BASE_DELAY", 0.001)
+    breaker = CircuitBreaker(failure_threshold=10, reset_timeout=30)
+    attempts = 0
+
+    async def flaky():
+        nonlocal attempts
+        attempts += 1
+        if attempts < 3:
+            raise FakeUpstreamError(503)
+        return "ok"
+
+    assert asyncio.run(call_with_retries(flaky, breaker, max_retries=3)) == "ok"
+    assert attempts == 3
+    assert breaker.state == "closed"
+
+
+def test_client_errors_are_not_retried():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    attempts = 0
+
+    async def bad_request():
+        nonlocal attempts
+        attempts += 1
+        raise FakeUpstreamError(400)
+
+    with pytest.raises(FakeUpstreamError):
+        asyncio.run(call_with_retries(bad_request, breaker, max_retries=3))
+    assert attempts == 1
+    # The upstream answered, so it counts as healthy
+    assert breaker.state == "closed"
+
+
+def test_open_circuit_sheds_calls_without_calling_upstream():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    open_breaker(breaker)
+    attempts = 0
+
+    async def call():
+        nonlocal attempts
+        attempts += 1
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(call_with_retries(call, breaker))
+    assert attempts == 0
@@ -0,0 +1,88 @@
+"""Tests for orjson rendering and unvalidated row responses."""
+
+import json
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from app.api.responses import JSONResponse, dumps, project, rows_response
+from app.models import UserResponse, UserStatus
+
+ROW = {
+    "id": 7,
+    "name": "Ada",
+    "email": "ada@example.com",
+    "age": 36,
+    "status": UserStatus.ACTIVE,
+    "created_at": datetime(2026, 10, 17, 12, 30, tzinfo=timezone.utc),
+    "updated_at": None,
+    "password_hash": "secret",
+}
+
+
+def test_rows_match_what_response_model_validation_would_send():
+    response = rows_response([ROW], UserResponse)
+
+    assert response.status_code == 200
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == [
+        json.loads(UserResponse(**ROW).model_dump_json())
+    ]
+
+
+def test_fields_outside_the_model_are_dropped_in_model_order():
+    projected = project(ROW, UserResponse)
+
+    assert "password_hash" not in projected
+    assert list(projected) == list(UserResponse.model_fields)
+
+
+def test_rows_missing_a_model_field_are_an_error():
+    row = dict(ROW)
+    del row["email"]
+
+    with pytest.raises(KeyError):
+        project([row], UserResponse)
+
+
+def test_status_code_and_headers_are_passed_through():
+    response = rows_response(ROW, UserResponse, status_code=201, headers={"X-A": "1"})
+
+    assert response.status_code == 201
+    assert response.headers["x-a"] == "1"
+
+
+def test_dumps_encodes_the_types_rows_carry():
+    value = {
+        "uuid": uuid.UUID(int=1),
+        "when": datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+        "price": Decimal("1.10"),
+        "vector": np.array([0.5, 1.0], dtype=np.float32),
+        "status": UserStatus.INACTIVE,
+        "model": UserResponse(**ROW),
+        1: "non-string key",
+    }
+
+    assert json.loads(dumps(value)) == {
+        "uuid": "00000000-0000-0000-0000-000000000001",
+        "when": "2026-01-02T03:04:05Z",
+        "price": "1.10",
+        "vector": [0.5, 1.0],
+        "status": "inactive",
+        "model": json.loads(UserResponse(**ROW).model_dump_json()),
+        "1": "non-string key",
+    }
+
+
+def test_unsupported_types_are_an_error():
+    with pytest.raises(TypeError):
+        dumps({"value": object()})
+
+
+def test_default_response_class_uses_the_same_encoding():
+    response = JSONResponse({"price": Decimal("2.5")})
+
+    assert response.body == b'{"price":"2.5"}'
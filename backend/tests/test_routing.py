@@ -0,0 +1,145 @@
+"""Tests for model routing and fallback."""
+
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.textGeneration import client as llm_client
+from app.textGeneration.client import LLMClientManager
+from app.textGeneration.fake import FakeChatModel, FakeUpstreamError
+from app.textGeneration.llm_service import aget_llm_response, upstream_retry_after
+from app.textGeneration.resilience import CircuitOpenError
+from app.textGeneration.routing import (
+    DEFAULT,
+    FALLBACK,
+    FAST,
+    ModelRegistry,
+    ModelSpec,
+    get_model_registry,
+    set_model_registry,
+    should_fall_back,
+)
+
+LONG_QUERY = "Walk me through why my proof fails, step by step. " * 20
+
+
+def open_circuit(manager: LLMClientManager, model: str) -> None:
+    breaker = manager.breaker_for(model)
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+
+class FailingClientManager(LLMClientManager):
+    """Fake models, where the named ones answer every call with an error."""
+
+    def __init__(self, failing: dict):
+        super().__init__("fake")
+        self.failing = failing
+
+    def _create(self, spec):
+        return FakeChatModel(
+            model_name=spec.model, failure_status=self.failing.get(spec.model)
+        )
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_ROUTING_ENABLED", True)
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "RAG_ENABLED", False)
+    monkeypatch.setattr(settings, "LLM_RETRY_BASE_DELAY", 0.001)
+    set_model_registry(None)
+    yield
+    set_model_registry(None)
+
+
+def use_client(monkeypatch, failing: dict) -> LLMClientManager:
+    manager = FailingClientManager(failing)
+    monkeypatch.setattr(llm_client, "_client_manager", manager)
+    return manager
+
+
+def test_registry_roles_come_from_settings():
+    registry = get_model_registry()
+
+    assert registry.default.model == settings.LLM_MODEL
+    assert registry.get(FAST).model == settings.LLM_FAST_MODEL
+    assert registry.get(FALLBACK).model == settings.LLM_FALLBACK_MODEL
+
+
+def test_registry_needs_a_default_model():
+    with pytest.raises(ValueError):
+        ModelRegistry([ModelSpec(FAST, "small", 0.0, 100)])
+
+
+def test_short_queries_with_little_context_go_to_the_fast_model():
+    registry = get_model_registry()
+
+    assert registry.route("When is the midterm?").role == FAST
+    assert registry.route("When is the midterm?", context_tokens=10_000).role == (
+        DEFAULT
+    )
+    assert registry.route(LONG_QUERY).role == DEFAULT
+    assert registry.stats.as_dict() == {"default": 2, "fast": 1, "fallbacks": 0}
+
+
+def test_routing_can_be_disabled(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_ROUTING_ENABLED", False)
+
+    assert get_model_registry().route("When is the midterm?").role == DEFAULT
+
+
+def test_fallback_is_not_the_failing_model():
+    registry = ModelRegistry(
+        [ModelSpec(DEFAULT, "big", 0.0, 100), ModelSpec(FALLBACK, "big", 0.0, 100)]
+    )
+
+    assert registry.fallback_for(registry.default) is None
+
+
+def test_only_busy_upstream_errors_fall_back():
+    assert should_fall_back(asyncio.TimeoutError())
+    assert should_fall_back(CircuitOpenError(5))
+    assert should_fall_back(FakeUpstreamError(429))
+    assert not should_fall_back(FakeUpstreamError(400))
+    assert not should_fall_back(ValueError("bad prompt"))
+
+
+def test_throttled_model_falls_back(monkeypatch):
+    use_client(monkeypatch, {settings.LLM_MODEL: 429})
+
+    response = asyncio.run(aget_llm_response(LONG_QUERY))
+
+    assert response.model == settings.LLM_FALLBACK_MODEL
+    assert response.content.startswith("Echo: ")
+    assert get_model_registry().stats.fallbacks == 1
+
+
+def test_bad_requests_do_not_fall_back(monkeypatch):
+    use_client(monkeypatch, {settings.LLM_MODEL: 400})
+
+    with pytest.raises(FakeUpstreamError):
+        asyncio.run(aget_llm_response(LONG_QUERY))
+    assert get_model_registry().stats.fallbacks == 0
+
+
+def test_without_a_fallback_the_error_is_raised(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_FALLBACK_MODEL", "")
+    use_client(monkeypatch, {settings.LLM_MODEL: 429})
+
+    with pytest.raises(FakeUpstreamError):
+        asyncio.run(aget_llm_response(LONG_QUERY))
+
+
+def test_streams_are_refused_only_when_no_model_can_answer(monkeypatch):
+    manager = use_client(monkeypatch, {})
+    open_circuit(manager, settings.LLM_MODEL)
+
+    # The fast model or the fallback can still answer
+    assert upstream_retry_after("When is the midterm?") is None
+    assert upstream_retry_after(LONG_QUERY) is None
+
+    open_circuit(manager, settings.LLM_FALLBACK_MODEL)
+    assert upstream_retry_after("When is the midterm?") is None
+    assert upstream_retry_after(LONG_QUERY) > 0
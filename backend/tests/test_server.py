@@ -0,0 +1,79 @@
+"""Tests for the pre-forking server's configuration and shutdown."""
+
+import os
+import signal
+import time
+
+import pytest
+
+from app.core import server
+from app.core.config import settings
+
+
+def test_worker_count_defaults_to_the_available_cpus(monkeypatch):
+    monkeypatch.setattr(settings, "SERVER_WORKERS", 3)
+    assert server.worker_count() == 3
+
+    monkeypatch.setattr(settings, "SERVER_WORKERS", 0)
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: {0, 1}, raising=False)
+    assert server.worker_count() == 2
+
+
+def test_missing_accelerators_fall_back_to_uvicorns_choice():
+    assert server._optional("json", "parser") == "json"
+    assert server._optional("no_such_accelerator", "parser") == "auto"
+
+
+def test_config_comes_from_settings(monkeypatch):
+    monkeypatch.setattr(settings, "SERVER_BACKLOG", 512)
+    monkeypatch.setattr(settings, "SERVER_GRACEFUL_TIMEOUT", 7.5)
+
+    config = server.build_config("main:app")
+
+    assert (config.host, config.port) == (settings.HOST, settings.PORT)
+    assert config.backlog == 512
+    assert config.timeout_graceful_shutdown == 7
+    assert config.lifespan == "on"
+    assert config.proxy_headers
+
+
+def test_preload_imports_the_deferred_modules(monkeypatch):
+    imported = []
+    monkeypatch.setattr(server.importlib, "import_module", imported.append)
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "groq")
+
+    server.preload()
+
+    assert imported == [*server.PRELOAD_MODULES, "langchain_groq"]
+
+
+def fork_child(ignore_sigterm: bool) -> int:
+    """Fork a child that sleeps, once it is ready for signals."""
+    ready, notify = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(ready)
+        if ignore_sigterm:
+            signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        os.write(notify, b"x")
+        time.sleep(30)
+        os._exit(0)
+    os.close(notify)
+    os.read(ready, 1)
+    os.close(ready)
+    return pid
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_drain_stops_workers_and_kills_stragglers(monkeypatch):
+    monkeypatch.setattr(settings, "SERVER_GRACEFUL_TIMEOUT", 0.2)
+    monkeypatch.setattr(server, "SERVER_SHUTDOWN_GRACE", 0.0)
+    polite, stubborn = fork_child(False), fork_child(True)
+
+    start = time.monotonic()
+    server._drain({polite: start, stubborn: start})
+
+    assert time.monotonic() - start < 5
+    for pid in (polite, stubborn):
+        with pytest.raises(ChildProcessError):
+            os.waitpid(pid, os.WNOHANG)
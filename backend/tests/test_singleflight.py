@@ -0,0 +1,161 @@
+"""Tests for single-flight coalescing of LLM calls and streams."""
+
+import asyncio
+
+import pytest
+
+from app.textGeneration.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    async def main():
+        return await asyncio.gather(*(flights.do("key", fetch) for _ in range(10)))
+
+    assert asyncio.run(main()) == ["answer"] * 10
+    assert calls == 1
+    assert flights.stats.as_dict() == {"leaders": 1, "followers": 9}
+
+
+def test_different_keys_do_not_coalesce():
+    flights = SingleFlight()
+
+    async def main():
+        return await asyncio.gather(
+            flights.do("a", lambda: asyncio.sleep(0.01, result="a")),
+            flights.do("b", lambda: asyncio.sleep(0.01, result="b")),
+        )
+
+    assert asyncio.run(main()) == ["a", "b"]
+    assert flights.stats.leaders == 2
+
+
+def test_finished_call_is_not_reused():
+    flights = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    async def main():
+        return [await flights.do("key", fetch), await flights.do("key", fetch)]
+
+    assert asyncio.run(main()) == [1, 2]
+
+
+def test_error_reaches_every_waiter():
+    flights = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def main():
+        return await asyncio.gather(
+            flights.do("key", fail), flights.do("key", fail), return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+
+
+def test_call_survives_while_a_waiter_remains():
+    flights = SingleFlight()
+
+    async def main():
+        first = asyncio.create_task(
+            flights.do("key", lambda: asyncio.sleep(0.05, result="answer"))
+        )
+        second = asyncio.create_task(flights.do("key", lambda: None))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "answer"
+
+
+def test_call_is_cancelled_when_the_last_waiter_leaves():
+    flights = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def fetch():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def main():
+        waiters = [asyncio.create_task(flights.do("key", fetch)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.wait_for(cancelled.wait(), 1)
+        # A new caller starts a fresh call rather than joining the dead one
+        return await flights.do("key", lambda: asyncio.sleep(0, result="fresh"))
+
+    assert asyncio.run(main()) == "fresh"
+    assert cancelled.is_set()
+
+
+def test_stream_is_shared_and_replayed_to_late_joiners():
+    flights = SingleFlight()
+    started = 0
+
+    async def source():
+        nonlocal started
+        started += 1
+        for fragment in ("a", "b", "c"):
+            await asyncio.sleep(0.01)
+            yield fragment
+
+    async def consume():
+        return [fragment async for fragment in flights.stream("key", source)]
+
+    async def main():
+        first = asyncio.create_task(consume())
+        await asyncio.sleep(0.015)
+        second = asyncio.create_task(consume())
+        return await asyncio.gather(first, second)
+
+    assert asyncio.run(main()) == [["a", "b", "c"], ["a", "b", "c"]]
+    assert started == 1
+
+
+def test_stream_is_closed_when_the_last_subscriber_leaves():
+    flights = SingleFlight()
+    closed = asyncio.Event()
+
+    async def source():
+        try:
+            while True:
+                await asyncio.sleep(0.01)
+                yield "token"
+        finally:
+            closed.set()
+
+    async def consume_one():
+        stream = flights.stream("key", source)
+        async for fragment in stream:
+            await stream.aclose()
+            return fragment
+
+    async def main():
+        await asyncio.gather(consume_one(), consume_one())
+        await asyncio.wait_for(closed.wait(), 1)
+
+    asyncio.run(main())
+    assert closed.is_set()
@@ -0,0 +1,103 @@
+"""Tests for streamed result sets and keyset-paginated user lists."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.api.endpoints import example
+from app.api.streaming import NDJSON_MEDIA_TYPE, stream_rows
+from app.core.config import settings
+from app.users import repository as user_repository
+from app.users.repository import InMemoryUserRepository
+
+
+def body(response) -> bytes:
+    async def main():
+        return b"".join([chunk async for chunk in response.body_iterator])
+
+    return asyncio.run(main())
+
+
+async def async_batches(batches):
+    for batch in batches:
+        await asyncio.sleep(0)
+        yield batch
+
+
+BATCHES = [[{"id": 1}, {"id": 2}], [], [{"id": 3}]]
+
+
+@pytest.mark.parametrize("make", [iter, async_batches])
+def test_json_arrays_are_framed_across_batches(make):
+    response = stream_rows(make(BATCHES), fmt="json")
+
+    assert response.media_type == "application/json"
+    assert json.loads(body(response)) == [{"id": 1}, {"id": 2}, {"id": 3}]
+
+
+@pytest.mark.parametrize("make", [iter, async_batches])
+def test_no_rows_stream_as_an_empty_array(make):
+    assert body(stream_rows(make([[], []]), fmt="json")) == b"[]"
+
+
+@pytest.mark.parametrize("make", [iter, async_batches])
+def test_ndjson_is_one_row_per_line(make):
+    response = stream_rows(make(BATCHES))
+
+    assert response.media_type == NDJSON_MEDIA_TYPE
+    assert body(response) == b'{"id":1}\n{"id":2}\n{"id":3}\n'
+
+
+def test_unknown_stream_format_is_rejected():
+    with pytest.raises(ValueError):
+        stream_rows(iter([]), fmt="csv")
+
+
+@pytest.fixture
+def users(monkeypatch):
+    repository = InMemoryUserRepository()
+    for n in range(5):
+        repository.create(f"User {n}", f"user{n}@example.com", 20 + n)
+    monkeypatch.setattr(user_repository, "_user_repository", repository)
+    return repository
+
+
+def get(path: str, params: dict = None) -> httpx.Response:
+    from main import app
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            return await c.get(f"{settings.API_PREFIX}/example{path}", params=params)
+
+    return asyncio.run(main())
+
+
+def test_users_are_paged_by_keyset(users):
+    first = get("/users", {"limit": 2}).json()
+    second = get("/users", {"limit": 2, "after_id": first[-1]["id"]}).json()
+    last = get("/users", {"limit": 2, "after_id": 4}).json()
+
+    assert [user["id"] for user in first] == [1, 2]
+    assert [user["id"] for user in second] == [3, 4]
+    assert [user["id"] for user in last] == [5]
+
+
+def test_page_size_is_bounded(users):
+    assert get("/users", {"limit": 0}).status_code == 422
+    assert get("/users", {"limit": example.MAX_PAGE_SIZE + 1}).status_code == 422
+
+
+def test_export_reads_every_page(monkeypatch, users):
+    monkeypatch.setattr(example, "MAX_PAGE_SIZE", 2)
+
+    ndjson = get("/users/export")
+    array = get("/users/export", {"format": "json"})
+
+    assert ndjson.headers["content-type"] == NDJSON_MEDIA_TYPE
+    lines = [json.loads(line) for line in ndjson.text.splitlines()]
+    assert [user["id"] for user in lines] == [1, 2, 3, 4, 5]
+    assert array.json() == lines
+    assert get("/users/export", {"format": "csv"}).status_code == 422
@@ -0,0 +1,224 @@
+"""Tests for precomputed summaries and the summary endpoint."""
+
+import asyncio
+import uuid
+
+import httpx
+import pytest
+
+from app import jobs
+from app.api.endpoints import llm
+from app.core.config import settings
+from app.retrieval.vector import RetrievedChunk
+from app.textGeneration.summary import (
+    InMemorySummaryStore,
+    SummaryService,
+    build_summary_prompt,
+)
+
+THREAD = str(uuid.uuid4())
+POST = str(uuid.uuid4())
+
+
+def chunk(source_id: str, text: str, token_count: int = 10) -> RetrievedChunk:
+    return RetrievedChunk(
+        source_type="post_chunk",
+        source_id=source_id,
+        thread_id=THREAD,
+        text=text,
+        token_count=token_count,
+        score=0.0,
+    )
+
+
+class Summarizer:
+    """Summarizes by counting calls; fails while `failing` is set."""
+
+    def __init__(self):
+        self.prompts = []
+        self.failing = False
+
+    async def __call__(self, prompt):
+        if self.failing:
+            raise ConnectionError("LLM is down")
+        self.prompts.append(prompt)
+        return f"summary {len(self.prompts)}"
+
+
+@pytest.fixture(autouse=True)
+def local_refreshes(monkeypatch):
+    monkeypatch.setattr(settings, "JOB_QUEUE_BACKEND", "memory")
+
+
+@pytest.fixture
+def store():
+    store = InMemorySummaryStore()
+    store.put_chunk(chunk("c1", "How do I free a linked list?"), POST)
+    store.put_chunk(chunk("c2", "Walk it and free each node."), POST)
+    return store
+
+
+async def settle(service: SummaryService) -> None:
+    """Wait for the queued refreshes to finish, then stop the workers."""
+    for _ in range(200):
+        if not service._scheduled:
+            break
+        await asyncio.sleep(0.01)
+    await service.close()
+
+
+def test_missing_summary_is_scheduled_then_served_fresh(store):
+    summarizer = Summarizer()
+
+    async def main():
+        service = SummaryService(store, summarizer, workers=1)
+        first = await service.get(THREAD, POST)
+        await settle(service)
+        return service, first, await service.get(THREAD, POST)
+
+    service, first, second = asyncio.run(main())
+    assert first is None
+    assert (second.text, second.stale) == ("summary 1", False)
+    assert [s["source_id"] for s in second.source_chunks] == ["c1", "c2"]
+    assert "free each node" in summarizer.prompts[0]
+    assert service.stats.misses == 1
+    assert service.stats.fresh_hits == 1
+    assert service.stats.refreshed == 1
+
+
+def test_edited_or_deleted_sources_make_a_summary_stale(store):
+    async def main():
+        service = SummaryService(store, Summarizer())
+        await service.refresh(THREAD, POST)
+        fresh = await store.get(THREAD, POST)
+        store.put_chunk(chunk("c2", "Walk it, freeing each node."), POST)
+        edited = await store.get(THREAD, POST)
+        await service.refresh(THREAD, POST)
+        store.remove_chunk("c1")
+        deleted = await store.get(THREAD, POST)
+        return fresh, edited, deleted
+
+    fresh, edited, deleted = asyncio.run(main())
+    assert not fresh.stale
+    assert edited.stale
+    assert deleted.stale
+
+
+def test_stale_summary_is_served_while_it_refreshes(store):
+    async def main():
+        service = SummaryService(store, Summarizer(), workers=1)
+        await service.refresh(THREAD, POST)
+        store.put_chunk(chunk("c3", "Or use a loop."), POST)
+        stale = await service.get(THREAD, POST)
+        await settle(service)
+        return service, stale, await service.get(THREAD, POST)
+
+    service, stale, refreshed = asyncio.run(main())
+    assert (stale.text, stale.stale) == ("summary 1", True)
+    assert (refreshed.text, refreshed.stale) == ("summary 2", False)
+    assert service.stats.stale_hits == 1
+
+
+def test_a_summary_is_scheduled_once_at_a_time(store):
+    async def main():
+        service = SummaryService(store, Summarizer(), workers=1)
+        scheduled = [service.schedule(THREAD, POST) for _ in range(3)]
+        await service.close()
+        return scheduled
+
+    assert asyncio.run(main()) == [True, False, False]
+
+
+def test_failed_refreshes_are_not_retried_right_away(store):
+    summarizer = Summarizer()
+    summarizer.failing = True
+
+    async def main():
+        service = SummaryService(store, summarizer, workers=1, retry_seconds=60)
+        service.schedule(THREAD, POST)
+        await settle(service)
+        return service, service.schedule(THREAD, POST)
+
+    service, retried = asyncio.run(main())
+    assert service.stats.failed == 1
+    assert retried is False
+
+
+def test_refreshes_go_to_the_job_queue_with_the_postgres_backend(monkeypatch, store):
+    monkeypatch.setattr(settings, "JOB_QUEUE_BACKEND", "postgres")
+    enqueued = []
+
+    def enqueue(kind, payload, **options):
+        enqueued.append((kind, payload, options["dedupe_key"]))
+        return "job-1"
+
+    monkeypatch.setattr(jobs, "enqueue", enqueue)
+
+    async def main():
+        service = SummaryService(store, Summarizer(), workers=1)
+        await service.get(THREAD)
+        await settle(service)
+        return service
+
+    service = asyncio.run(main())
+    assert enqueued == [
+        (
+            "refresh_summary",
+            {"thread_id": THREAD, "post_id": None},
+            f"refresh_summary:{THREAD}:",
+        )
+    ]
+    assert service.stats.enqueued == 1
+    assert service.stats.refreshed == 0
+
+
+def test_prompt_keeps_the_chunks_that_fit_the_budget():
+    chunks = [chunk(f"c{n}", f"part {n}", token_count=100) for n in range(5)]
+
+    prompt, included = build_summary_prompt(chunks, budget_tokens=250)
+
+    assert [c.source_id for c in included] == ["c0", "c1"]
+    assert "part 1" in prompt
+    assert "part 2" not in prompt
+
+
+def test_summary_endpoint_answers_202_until_a_summary_exists(monkeypatch, store):
+    from main import app
+
+    async def main():
+        service = SummaryService(store, Summarizer(), workers=1)
+        monkeypatch.setattr(llm, "get_summary_service", lambda: service)
+        path = f"{settings.API_PREFIX}/llm/summary/{THREAD}?post_id={POST}"
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            pending = await c.get(path)
+            await settle(service)
+            ready = await c.get(path)
+        return pending, ready
+
+    pending, ready = asyncio.run(main())
+    assert pending.status_code == 202
+    assert pending.json() == {
+        "thread_id": THREAD,
+        "post_id": POST,
+        "status": "pending",
+        "summary": None,
+        "computed_at": None,
+        "sources": [],
+    }
+    assert ready.status_code == 200
+    assert ready.json()["status"] == "fresh"
+    assert ready.json()["summary"] == "summary 1"
+    assert ready.json()["computed_at"].endswith("Z")
+
+
+def test_summary_endpoint_documents_the_202():
+    from main import app
+
+    responses = app.openapi()["paths"][
+        f"{settings.API_PREFIX}/llm/summary/{{thread_id}}"
+    ]["get"]["responses"]
+
+    assert responses["202"]["content"]["application/json"]["schema"] == {
+        "$ref": "#/components/schemas/SummaryResponse"
+    }
@@ -0,0 +1,109 @@
+"""Tests for the in-memory user repository and its indexes."""
+
+import pytest
+
+from app.models import UserStatus
+from app.users.repository import EmailTakenError, InMemoryUserRepository
+
+
+@pytest.fixture
+def repository():
+    repository = InMemoryUserRepository()
+    repository.create("Ada", "ada@example.com", 36)
+    repository.create("Grace", "grace@example.com", 45)
+    repository.create("Alan", "alan@example.com", 41, UserStatus.INACTIVE)
+    repository.create("Barbara", "barbara@example.com")
+    return repository
+
+
+def ids(users):
+    return [user["id"] for user in users]
+
+
+def test_lookups_by_id_and_email(repository):
+    assert repository.get(2)["name"] == "Grace"
+    assert repository.get_by_email("alan@example.com")["id"] == 3
+    assert repository.get(99) is None
+    assert repository.get_by_email("nobody@example.com") is None
+
+
+def test_returned_users_are_copies(repository):
+    repository.get(1)["name"] = "Changed"
+
+    assert repository.get(1)["name"] == "Ada"
+
+
+def test_duplicate_email_is_rejected(repository):
+    with pytest.raises(EmailTakenError):
+        repository.create("Ada Again", "ada@example.com")
+
+
+def test_search_pages_by_keyset(repository):
+    first = repository.search(limit=2)
+    second = repository.search(after_id=first[-1]["id"], limit=2)
+
+    assert ids(first) == [1, 2]
+    assert ids(second) == [3, 4]
+
+
+def test_search_filters(repository):
+    assert ids(repository.search(min_age=40)) == [2, 3]
+    assert ids(repository.search(min_age=40, max_age=44)) == [3]
+    assert ids(repository.search(name="a", status=UserStatus.ACTIVE)) == [1, 2, 4]
+    assert ids(repository.search(min_age=30, after_id=1, limit=1)) == [2]
+
+
+def test_update_moves_the_email_index(repository):
+    repository.update(1, {"email": "lovelace@example.com"})
+
+    assert repository.get_by_email("ada@example.com") is None
+    assert repository.get_by_email("lovelace@example.com")["id"] == 1
+    # The old address is free again
+    assert repository.create("Another Ada", "ada@example.com")["id"] == 5
+
+
+def test_update_to_a_taken_email_changes_nothing(repository):
+    with pytest.raises(EmailTakenError):
+        repository.update(1, {"email": "grace@example.com", "name": "Grace?"})
+
+    assert repository.get(1)["name"] == "Ada"
+    assert repository.get_by_email("ada@example.com")["id"] == 1
+    assert repository.get_by_email("grace@example.com")["id"] == 2
+
+
+def test_update_moves_the_age_index(repository):
+    repository.update(1, {"age": 50})
+    repository.update(2, {"age": None})
+    repository.update(4, {"age": 30})
+
+    assert ids(repository.search(min_age=40)) == [1, 3]
+    assert ids(repository.search(max_age=35)) == [4]
+    assert repository.get(1)["updated_at"] is not None
+
+
+def test_update_ignores_unknown_fields(repository):
+    user = repository.update(1, {"id": 99, "created_at": None, "name": "Ada L."})
+
+    assert user["id"] == 1
+    assert user["created_at"] is not None
+    assert user["name"] == "Ada L."
+    assert repository.update(99, {"name": "Nobody"}) is None
+
+
+def test_delete_removes_the_user_from_every_index(repository):
+    deleted = repository.delete(2)
+
+    assert deleted["name"] == "Grace"
+    assert len(repository) == 3
+    assert repository.get(2) is None
+    assert repository.get_by_email("grace@example.com") is None
+    assert ids(repository.search()) == [1, 3, 4]
+    assert ids(repository.search(min_age=40)) == [3]
+    assert repository.delete(2) is None
+
+
+def test_ids_are_not_reused_after_delete(repository):
+    repository.delete(4)
+
+    assert repository.create("Edsger", "edsger@example.com", 40)["id"] == 5
+    assert ids(repository.search(min_age=40)) == [2, 3, 5]
@@ -0,0 +1,96 @@
+"""Tests for thread-scoped vector retrieval."""
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.retrieval import vector
+from app.retrieval.vector import (
+    InMemoryVectorEngine,
+    RetrievedChunk,
+    get_vector_engine,
+    set_vector_engine,
+    to_pgvector,
+)
+
+
+def chunk(
+    source_id: str, thread_id: str = "t1", source_type: str = "post_chunk"
+) -> RetrievedChunk:
+    return RetrievedChunk(
+        source_type=source_type,
+        source_id=source_id,
+        thread_id=thread_id,
+        text=f"text of {source_id}",
+        token_count=None,
+        score=0.0,
+    )
+
+
+@pytest.fixture
+def engine():
+    engine = InMemoryVectorEngine(dimensions=3)
+    engine.add(
+        [chunk("x"), chunk("y"), chunk("xy", source_type="doc_chunk")],
+        np.array([[1, 0, 0], [0, 1, 0], [1, 1, 0]]),
+    )
+    engine.add([chunk("other", thread_id="t2")], np.array([[1, 0, 0]]))
+    return engine
+
+
+def ids(results):
+    return [result.source_id for result in results]
+
+
+def test_results_are_ranked_by_cosine_similarity(engine):
+    results = engine.search([2, 0, 0], "t1", k=3)
+
+    assert ids(results) == ["x", "xy", "y"]
+    assert [r.score for r in results] == pytest.approx([1.0, 2**-0.5, 0.0])
+
+
+def test_search_is_scoped_to_the_thread(engine):
+    assert ids(engine.search([1, 0, 0], "t2")) == ["other"]
+    assert engine.search([1, 0, 0], "t3") == []
+
+
+def test_k_and_source_types_limit_the_results(engine):
+    assert ids(engine.search([1, 0, 0], "t1", k=1)) == ["x"]
+    assert ids(engine.search([1, 0, 0], "t1", source_types=["doc_chunk"])) == ["xy"]
+
+
+def test_added_and_removed_chunks_are_searched_accordingly(engine):
+    engine.add([chunk("z")], np.array([[0, 0, 5]]))
+    engine.remove(["x", "other"])
+
+    assert ids(engine.search([0, 0, 1], "t1", k=1)) == ["z"]
+    assert ids(engine.search([1, 0, 0], "t1")) == ["xy", "y", "z"]
+    assert engine.search([1, 0, 0], "t2") == []
+    assert len(engine) == 3
+
+
+def test_results_are_copies_carrying_their_score(engine):
+    result = engine.search([0, 1, 0], "t1", k=1)[0]
+
+    assert result.score == pytest.approx(1.0)
+    assert engine._threads["t1"].chunks[1].score == 0.0
+    assert result.as_result() == {
+        "source_type": "post_chunk",
+        "source_id": "y",
+        "score": 1.0,
+    }
+
+
+def test_pgvector_literal():
+    assert to_pgvector([0.5, 1, -2.25]) == "[0.5,1,-2.25]"
+
+
+def test_engine_is_chosen_by_settings(monkeypatch):
+    monkeypatch.setattr(vector, "_vector_engine", None)
+    monkeypatch.setattr(settings, "VECTOR_ENGINE", "memory")
+    assert isinstance(get_vector_engine(), InMemoryVectorEngine)
+
+    set_vector_engine(None)
+    monkeypatch.setattr(settings, "VECTOR_ENGINE", "faiss")
+    with pytest.raises(ValueError):
+        get_vector_engine()
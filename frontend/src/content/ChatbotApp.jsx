@@ -12,6 +12,12 @@ function ChatbotApp() {
   const [isLoading, setIsLoading] = useState(false);
   const chatRef = useRef(null);
   const messagesEndRef = useRef(null);
+  const abortControllerRef = useRef(null);
+
+  // Cancel any in-flight response stream when the chat unmounts
+  useEffect(() => {
+    return () => abortControllerRef.current?.abort();
+  }, []);
 
   // Handle clicking outside (works with Shadow DOM)
   useEffect(() => {
@@ -83,47 +89,75 @@ function ChatbotApp() {
     setIsLoading(true);
 
     try {
-      // Call the backend API
+      // Call the streaming backend API
       const API_ENDPOINT =
         process.env.API_ENDPOINT || "http://localhost:8000/api/v1";
-      const response = await fetch(`${API_ENDPOINT}/llm/query`, {
+      const controller = new AbortController();
+      abortControllerRef.current = controller;
+      const response = await fetch(`${API_ENDPOINT}/llm/query/stream`, {
         method: "POST",
         headers: {
           "Content-Type": "application/json",
         },
         body: JSON.stringify({ query: userMessage }),
+        signal: controller.signal,
       });
 
       if (!response.ok) {
         throw new Error(`API error: ${response.status}`);
       }
 
-      const data = await response.json();
+      // Add an empty AI response and fill it in as tokens arrive
+      setMessages((prev) => [...prev, { role: "assistant", content: "" }]);
 
-      // Convert LaTeX notation and add AI response
-      const convertedContent = convertLatexToMarkdown(data.response);
-      console.log("Original:", data.response);
-      console.log("Converted:", convertedContent);
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      let rawContent = "";
 
-      setMessages((prev) => [
-        ...prev,
-        {
-          role: "assistant",
-          content: convertedContent,
-        },
-      ]);
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split("\n\n");
+        buffer = events.pop();
+
+        for (const event of events) {
+          const dataLine = event
+            .split("\n")
+            .find((line) => line.startsWith("data: "));
+          if (!dataLine) continue;
+
+          const data = JSON.parse(dataLine.slice("data: ".length));
+          if (event.startsWith("event: error")) {
+            throw new Error(data.detail);
+          }
+          if (data.token) {
+            rawContent += data.token;
+            // Convert LaTeX notation on the accumulated response
+            const convertedContent = convertLatexToMarkdown(rawContent);
+            setMessages((prev) => [
+              ...prev.slice(0, -1),
+              { role: "assistant", content: convertedContent },
+            ]);
+          }
+        }
+      }
     } catch (error) {
+      if (error.name === "AbortError") return;
       console.error("Failed to get AI response:", error);
 
-      // Add error message
+      // Add error message, replacing an empty streamed response
       setMessages((prev) => [
-        ...prev,
+        ...(prev[prev.length - 1]?.content === "" ? prev.slice(0, -1) : prev),
         {
           role: "assistant",
           content: "Sorry, I encountered an error. Please try again later.",
         },
       ]);
     } finally {
+      abortControllerRef.current = null;
       setIsLoading(false);
     }
   };
@@ -288,15 +322,16 @@ function ChatbotApp() {
                 </div>
               ))
             )}
-            {isLoading && (
-              <div className="flex justify-start mb-2">
-                <div className="bg-white px-3.5 py-3 rounded-2xl rounded-bl-sm shadow-sm flex gap-1">
-                  <span className="w-2 h-2 bg-gray-400 rounded-full animate-bounceDot [animation-delay:-0.32s]"></span>
-                  <span className="w-2 h-2 bg-gray-400 rounded-full animate-bounceDot [animation-delay:-0.16s]"></span>
-                  <span className="w-2 h-2 bg-gray-400 rounded-full animate-bounceDot"></span>
+            {isLoading &&
+              messages[messages.length - 1]?.role === "user" && (
+                <div className="flex justify-start mb-2">
+                  <div className="bg-white px-3.5 py-3 rounded-2xl rounded-bl-sm shadow-sm flex gap-1">
+                    <span className="w-2 h-2 bg-gray-400 rounded-full animate-bounceDot [animation-delay:-0.32s]"></span>
+                    <span className="w-2 h-2 bg-gray-400 rounded-full animate-bounceDot [animation-delay:-0.16s]"></span>
+                    <span className="w-2 h-2 bg-gray-400 rounded-full animate-bounceDot"></span>
+                  </div>
                 </div>
-              </div>
-            )}
+              )}
             <div ref={messagesEndRef} />
           </div>
 
@@ -0,0 +1,12 @@
+-- Normalized query hash so answered questions can be served from query_logs
+-- as the persistent tier of the LLM response cache
+ALTER TABLE query_logs ADD COLUMN query_hash VARCHAR(64);
+
+-- Model that produced the answer, reported on persistent cache hits
+ALTER TABLE query_logs ADD COLUMN model VARCHAR(255);
+
+-- Cache hits are logged too; only generated answers are served from the log
+ALTER TABLE query_logs ADD COLUMN cached BOOLEAN NOT NULL DEFAULT FALSE;
+
+CREATE INDEX idx_query_logs_cache_lookup
+    ON query_logs (thread_id, query_hash, created_at DESC) WHERE NOT cached;
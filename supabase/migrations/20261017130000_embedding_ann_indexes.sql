@@ -0,0 +1,20 @@
+-- Fix the embedding dimension so pgvector can build ANN indexes.
+-- Must match EMBEDDING_DIMENSIONS in the backend settings.
+ALTER TABLE embeddings ALTER COLUMN embedding TYPE VECTOR(384);
+
+-- Thread filter used by every retrieval query
+CREATE INDEX idx_embeddings_thread_id ON embeddings (thread_id);
+
+-- HNSW indexes per partition (cosine distance, matching the `<=>` operator).
+-- HNSW gives better recall/latency than IVFFlat and needs no training data,
+-- so it can be built while partitions are still empty.
+CREATE INDEX idx_embeddings_post_chunks_hnsw
+    ON embeddings_post_chunks USING hnsw (embedding vector_cosine_ops)
+    WITH (m = 16, ef_construction = 64);
+
+CREATE INDEX idx_embeddings_doc_chunks_hnsw
+    ON embeddings_doc_chunks USING hnsw (embedding vector_cosine_ops)
+    WITH (m = 16, ef_construction = 64);
+
+-- Lookups from chunk back to its embedding (re-indexing, deletes)
+CREATE INDEX idx_embeddings_source_id ON embeddings (source_id);
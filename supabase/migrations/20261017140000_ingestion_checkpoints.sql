@@ -0,0 +1,15 @@
+-- Progress markers for resumable ingestion runs, written in the same
+-- transaction as each batch of chunks
+CREATE TABLE ingestion_checkpoints (
+    pipeline VARCHAR(64) NOT NULL,
+    scope VARCHAR(255) NOT NULL,
+    last_key VARCHAR(255),
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (pipeline, scope)
+);
+
+-- Keyset pagination over a thread's posts
+CREATE INDEX idx_posts_thread_id_id ON posts (thread_id, id);
+
+-- Replacing a post's chunks on re-ingestion
+CREATE INDEX idx_post_chunks_post_id ON post_chunks (post_id);
@@ -0,0 +1,17 @@
+-- Full-text search over chunk text for hybrid (lexical + vector) retrieval.
+-- Generated columns keep the tsvector in sync on insert and update, so the
+-- ingestion pipeline does not need to compute it.
+ALTER TABLE post_chunks
+    ADD COLUMN text_tsv TSVECTOR
+    GENERATED ALWAYS AS (to_tsvector('english', text_chunk)) STORED;
+
+ALTER TABLE document_chunks
+    ADD COLUMN text_tsv TSVECTOR
+    GENERATED ALWAYS AS (to_tsvector('english', text_chunk)) STORED;
+
+CREATE INDEX idx_post_chunks_text_tsv ON post_chunks USING GIN (text_tsv);
+CREATE INDEX idx_document_chunks_text_tsv ON document_chunks USING GIN (text_tsv);
+
+-- Thread filter applied alongside the text match
+CREATE INDEX idx_post_chunks_thread_id ON post_chunks (thread_id);
+CREATE INDEX idx_document_chunks_thread_id ON document_chunks (thread_id);
@@ -0,0 +1,9 @@
+-- Token buckets shared by all backend workers when RATE_LIMIT_STORE=postgres.
+-- UNLOGGED: bucket state is cheap to lose on a crash (buckets reset to full)
+-- and skipping WAL keeps the per-request upsert fast.
+CREATE UNLOGGED TABLE rate_limit_buckets (
+    key VARCHAR(255) PRIMARY KEY,
+    tokens DOUBLE PRECISION NOT NULL,
+    granted BOOLEAN NOT NULL DEFAULT TRUE,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT clock_timestamp()
+);
@@ -0,0 +1,12 @@
+-- One summary per post, and one per thread (post_id IS NULL), so refreshes
+-- can upsert. NULLS NOT DISTINCT makes thread summaries conflict too.
+CREATE UNIQUE INDEX idx_summary_cache_thread_post
+    ON summary_cache (thread_id, post_id) NULLS NOT DISTINCT;
+
+-- Staleness checks look for chunks updated after a summary was computed
+CREATE INDEX idx_post_chunks_post_updated ON post_chunks (post_id, updated_at);
+CREATE INDEX idx_post_chunks_thread_updated ON post_chunks (thread_id, updated_at);
+
+-- Summaries are stored before they are validated against their sources;
+-- NULL means not validated yet
+ALTER TABLE summary_cache ALTER COLUMN validation_label DROP NOT NULL;
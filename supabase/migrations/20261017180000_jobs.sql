@@ -0,0 +1,37 @@
+-- Background job queue (indexing, summarization). Workers claim jobs with
+-- SELECT ... FOR UPDATE SKIP LOCKED, so any number of worker processes on any
+-- number of hosts can poll the same table without blocking each other.
+CREATE TYPE job_status_enum AS ENUM ('queued', 'running', 'succeeded', 'failed');
+
+CREATE TABLE jobs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    queue VARCHAR(64) NOT NULL DEFAULT 'default',
+    kind VARCHAR(128) NOT NULL,
+    payload JSONB NOT NULL DEFAULT '{}',
+    priority INTEGER NOT NULL DEFAULT 0,
+    status job_status_enum NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 5,
+    run_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    locked_by VARCHAR(255),
+    locked_at TIMESTAMPTZ,
+    last_error TEXT,
+    dedupe_key VARCHAR(255),
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Claim order; partial so finished jobs do not bloat the index
+CREATE INDEX idx_jobs_claim ON jobs (queue, priority DESC, run_at)
+    WHERE status = 'queued';
+
+-- Finding jobs whose worker died
+CREATE INDEX idx_jobs_running ON jobs (locked_at) WHERE status = 'running';
+
+-- At most one queued job per dedupe key
+CREATE UNIQUE INDEX idx_jobs_dedupe ON jobs (dedupe_key) WHERE status = 'queued';
+
+CREATE TRIGGER set_updated_at_jobs
+BEFORE UPDATE ON jobs
+FOR EACH ROW
+EXECUTE FUNCTION update_updated_at_column();
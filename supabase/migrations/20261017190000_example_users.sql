@@ -0,0 +1,30 @@
+-- Storage for the example users API (EXAMPLE_USER_STORE=postgres). Every
+-- query it serves is an index lookup or an index range scan:
+--   by id          primary key
+--   by email       unique index (also enforces one user per email)
+--   pages          keyset on id: WHERE id > $cursor ORDER BY id LIMIT n
+--   age ranges     (age, id)
+--   status filter  (status, id)
+--   name contains  trigram index for ILIKE '%...%'
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE TABLE example_users (
+    id BIGSERIAL PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    email VARCHAR(255) NOT NULL,
+    age INTEGER CHECK (age BETWEEN 0 AND 150),
+    status VARCHAR(16) NOT NULL DEFAULT 'active'
+        CHECK (status IN ('active', 'inactive', 'suspended')),
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ
+);
+
+CREATE UNIQUE INDEX idx_example_users_email ON example_users (email);
+
+CREATE INDEX idx_example_users_age ON example_users (age, id)
+    WHERE age IS NOT NULL;
+
+CREATE INDEX idx_example_users_status ON example_users (status, id);
+
+CREATE INDEX idx_example_users_name_trgm ON example_users
+    USING gin (name gin_trgm_ops);